@@ -0,0 +1,52 @@
+"""
+    ベンチマーク.
+
+    各モジュールは src/main と同じ構成で配置し, 以下のように実行する.
+
+        python -m src.benchmark.utils.bench_files
+"""
+
+import time
+
+
+def measure(function, *, repeat=5):
+    """
+        関数の実行時間を計測する.
+
+        Arguments
+        ---------
+        function : callable
+            計測する関数. 引数なしで呼び出す.
+        repeat : int
+            計測する回数.
+
+        Returns
+        -------
+        seconds : float
+            最も速かった回の実行時間 (秒).
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return min(durations)
+
+
+def report(name, seconds, *, baseline=None):
+    """
+        計測結果を表示する.
+
+        Arguments
+        ---------
+        name : str
+            計測対象の名前.
+        seconds : float
+            実行時間 (秒).
+        baseline : float|None
+            比較対象の実行時間 (秒). 指定した場合は速度比も表示する.
+    """
+    if baseline is None:
+        print("{:<48} {:>10.3f} ms".format(name, seconds * 1000))
+    else:
+        print("{:<48} {:>10.3f} ms {:>7.2f}x".format(name, seconds * 1000, baseline / seconds))
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.benchmark import measure
+from src.benchmark import report
+
+
+FIRST_REQUEST_SCRIPT = """
+import wsgiref.util
+
+import myapp.webapi.main
+
+environ = {}
+wsgiref.util.setup_testing_defaults(environ)
+b"".join(myapp.webapi.main.application(environ, lambda status, headers: None))
+"""
+"""新しいワーカーが最初のリクエストに応答するまでの処理."""
+
+
+def measure_first_response(pycache_prefix):
+    """
+        新しいプロセスで最初のリクエストに応答するまでの時間を計測する.
+
+        計測中に .pyc を書き込まないため, 何度計測しても同じ状態から始まる.
+    """
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix, PYTHONDONTWRITEBYTECODE="1")
+    return measure(
+        lambda: subprocess.run([sys.executable, "-c", FIRST_REQUEST_SCRIPT], env=env, check=True),
+        repeat=10)
+
+
+def build_bytecode(pycache_prefix, *options):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix)
+    subprocess.run(["invoke", "build.bytecode", *options], env=env, stdout=subprocess.DEVNULL, check=True)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        baseline = measure_first_response(pycache_prefix)
+        report("no bytecode", baseline)
+
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        build_bytecode(pycache_prefix, "--no-dependencies")
+        report("build.bytecode --no-dependencies", measure_first_response(pycache_prefix), baseline=baseline)
+
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        build_bytecode(pycache_prefix)
+        report("build.bytecode", measure_first_response(pycache_prefix), baseline=baseline)
+
+
+if __name__ == "__main__":
+    main()
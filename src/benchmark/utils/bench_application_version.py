@@ -0,0 +1,211 @@
+import bisect
+import os
+import random
+import tempfile
+
+from src.benchmark import measure
+from src.benchmark import report
+from utils.application_version import ApplicationVersion
+from utils.application_version import VersionIndex
+from utils.application_version import argsort_version_columns
+from utils.application_version import build_version_string
+from utils.application_version import clear_intern_cache
+from utils.application_version import from_cached_file
+from utils.application_version import from_file
+from utils.application_version import from_string
+from utils.application_version import intern_cache_info
+from utils.application_version import parse_constraint
+from utils.application_version import parse_version_string
+from utils.application_version import parse_version_strings
+from utils.application_version import to_compare_key
+from utils.comparable import sort_key
+
+
+def make_version_strings(count, *, distinct=20):
+    """
+        ベンチマーク用のバージョン文字列を作成する. 同じ文字列を繰り返し含む.
+    """
+    random.seed(0)
+    candidates = [
+        "{}.{}.{}{}".format(
+            random.randrange(3),
+            random.randrange(10),
+            random.randrange(10),
+            random.choice(["", "-SNAPSHOT"]))
+        for _ in range(distinct)
+    ]
+    return [random.choice(candidates) for _ in range(count)]
+
+
+def bench_from_string(version_strings):
+    print("from_string: {} strings".format(len(version_strings)))
+    baseline = measure(
+        lambda: [ApplicationVersion(*parse_version_string(version_string)) for version_string in version_strings],
+        repeat=3)
+    report("ApplicationVersion(*parse_version_string(...))", baseline)
+
+    clear_intern_cache()
+    report(
+        "from_string",
+        measure(lambda: [from_string(version_string) for version_string in version_strings], repeat=3),
+        baseline=baseline)
+    print("hit rate: {:.4f}".format(intern_cache_info()["strings"].hit_rate))
+
+
+def bench_compare_keys(version_strings):
+    versions = [ApplicationVersion(*parse_version_string(version_string)) for version_string in version_strings]
+    tuple_keys = [to_compare_key(version) for version in versions]
+    packed_keys = [sort_key(ApplicationVersion)(version) for version in versions]
+
+    print("compare keys: {} versions".format(len(versions)))
+    baseline = measure(lambda: sorted(tuple_keys), repeat=3)
+    report("sorted (to_compare_key)", baseline)
+    report("sorted (pack_compare_key)", measure(lambda: sorted(packed_keys), repeat=3), baseline=baseline)
+
+    baseline = measure(lambda: set(tuple_keys), repeat=3)
+    report("set (to_compare_key)", baseline)
+    report("set (pack_compare_key)", measure(lambda: set(packed_keys), repeat=3), baseline=baseline)
+
+
+def bench_parse_version_strings(version_strings):
+    buffer = "\n".join(version_strings).encode("ascii")
+
+    print("parse_version_strings: {} strings".format(len(version_strings)))
+    baseline = measure(
+        lambda: [parse_version_string(line) for line in buffer.decode("ascii").splitlines()],
+        repeat=3)
+    report("parse_version_string (per line)", baseline)
+    report("parse_version_strings (buffer)", measure(lambda: parse_version_strings(buffer), repeat=3), baseline=baseline)
+
+    # パースしてから並べるまでの時間を比べる.
+    baseline = measure(
+        lambda: sorted(
+            (ApplicationVersion(*parse_version_string(line)) for line in buffer.decode("ascii").splitlines()),
+            key=sort_key(ApplicationVersion)),
+        repeat=3)
+    report("sorted (ApplicationVersion)", baseline)
+    report(
+        "argsort_version_columns",
+        measure(lambda: argsort_version_columns(parse_version_strings(buffer)), repeat=3),
+        baseline=baseline)
+
+
+def bench_constraint(version_strings):
+    versions = sorted(
+        (ApplicationVersion(*parse_version_string(version_string)) for version_string in version_strings),
+        key=sort_key(ApplicationVersion))
+    lower = ApplicationVersion(1, 2, 0)
+    upper = ApplicationVersion(2, 0, 0, "SNAPSHOT")
+    constraint = parse_constraint(">={},<{}".format(lower, upper))
+
+    print("constraint: {} versions".format(len(versions)))
+    baseline = measure(lambda: [version for version in versions if lower <= version < upper], repeat=3)
+    report("comparison (per version)", baseline)
+    report("VersionConstraint.__contains__", measure(
+        lambda: [version for version in versions if version in constraint],
+        repeat=3), baseline=baseline)
+    report("VersionConstraint.filter", measure(lambda: constraint.filter(versions), repeat=3), baseline=baseline)
+
+
+def bench_version_index(count):
+    random.seed(0)
+    versions = [
+        ApplicationVersion(
+            random.randrange(100),
+            random.randrange(100),
+            random.randrange(100),
+            random.choice([None, "SNAPSHOT"]))
+        for _ in range(count)
+    ]
+    key = sort_key(ApplicationVersion)
+    queries = random.sample(versions, 10000)
+
+    print("VersionIndex: {} versions".format(count))
+    report("VersionIndex (build)", measure(lambda: list(VersionIndex(versions)), repeat=3))
+
+    # batch 個ずつ追加しては検索する.
+    def insort_list(batch):
+        sorted_versions = sorted(versions, key=key)
+        for start in range(0, len(queries), batch):
+            for version in queries[start:start + batch]:
+                bisect.insort(sorted_versions, version, key=key)
+            bisect.bisect_right(sorted_versions, queries[start]._packed_key, key=key)
+
+    def add_index(batch):
+        index = VersionIndex(versions)
+        index.floor(queries[0])
+        for start in range(0, len(queries), batch):
+            index.update(queries[start:start + batch])
+            index.floor(queries[start])
+
+    for batch in (1, 1000):
+        baseline = measure(lambda: insort_list(batch), repeat=3)
+        report("bisect.insort (add {} + floor)".format(batch), baseline)
+        report("VersionIndex (add {} + floor)".format(batch), measure(lambda: add_index(batch), repeat=3), baseline=baseline)
+
+    index = VersionIndex(versions)
+    index.latest()
+    baseline = measure(
+        lambda: [
+            max((version for version in versions if version.major == major and version.suffix is None), key=key)
+            for major in range(10)
+        ],
+        repeat=3)
+    report("max (latest release)", baseline)
+    report(
+        "VersionIndex.latest",
+        measure(lambda: [index.latest(major, release=True) for major in range(10)], repeat=3),
+        baseline=baseline)
+
+
+def bench_str_and_bump(version_strings):
+    versions = [ApplicationVersion(*parse_version_string(version_string)) for version_string in version_strings]
+
+    print("str and bump: {} versions".format(len(versions)))
+    # 文字列表現を保持する前と同じく, 構築して検証する.
+    baseline = measure(lambda: [build_version_string(*version.components) for version in versions], repeat=3)
+    report("build_version_string", baseline)
+    report("str", measure(lambda: [str(version) for version in versions], repeat=3), baseline=baseline)
+
+    baseline = measure(
+        lambda: [ApplicationVersion(version.major, version.minor, version.patch + 1, version.suffix) for version in versions],
+        repeat=3)
+    report("ApplicationVersion (patch + 1)", baseline)
+    report("bump_patch", measure(lambda: [version.bump_patch() for version in versions], repeat=3), baseline=baseline)
+    report(
+        "str(bump_patch())",
+        measure(lambda: [str(version.bump_patch()) for version in versions], repeat=3),
+        baseline=baseline)
+
+
+def bench_from_cached_file(count):
+    with tempfile.TemporaryDirectory() as directory_path:
+        file_path = os.path.join(directory_path, "VERSION")
+        ApplicationVersion(1, 2, 3, "SNAPSHOT").save(file_path)
+
+        # リクエストごとにバージョンを読み込む場合を想定する.
+        print("from_cached_file: {} calls".format(count))
+        baseline = measure(lambda: [from_file(file_path) for _ in range(count)], repeat=3)
+        report("from_file", baseline)
+        report(
+            "from_cached_file (check every call)",
+            measure(lambda: [from_cached_file(file_path, check_interval=0) for _ in range(count)], repeat=3),
+            baseline=baseline)
+        report(
+            "from_cached_file",
+            measure(lambda: [from_cached_file(file_path) for _ in range(count)], repeat=3),
+            baseline=baseline)
+
+
+def main():
+    bench_from_string(make_version_strings(1000000))
+    bench_compare_keys(make_version_strings(200000, distinct=100000))
+    bench_parse_version_strings(make_version_strings(1000000, distinct=100000))
+    bench_constraint(make_version_strings(1000000, distinct=100000))
+    bench_version_index(1000000)
+    bench_str_and_bump(make_version_strings(1000000, distinct=100000))
+    bench_from_cached_file(100000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import bisect
+import random
+
+from src.benchmark import measure
+from src.benchmark import report
+from utils.application_version import ApplicationVersion
+from utils.application_version import to_compare_key
+from utils.comparable import Comparable
+from utils.comparable import comparable
+from utils.comparable import sort_key
+
+
+def lambda_comparable(target_class):
+    """
+        ラムダ式で比較演算子を生成するデコレータ. 変更前の comparable と同じ.
+    """
+    compare = lambda self, other: self.compare(other)
+    target_class.__eq__ = lambda self, other: compare(self, other) == 0
+    target_class.__ne__ = lambda self, other: compare(self, other) != 0
+    target_class.__lt__ = lambda self, other: compare(self, other) < 0
+    target_class.__le__ = lambda self, other: compare(self, other) <= 0
+    target_class.__gt__ = lambda self, other: compare(self, other) > 0
+    target_class.__ge__ = lambda self, other: compare(self, other) >= 0
+    return target_class
+
+
+class CompareVersion(object):
+    """
+        compare メソッドで比較するバージョン. 変更前の ApplicationVersion と同じ比較をする.
+    """
+
+    __slots__ = ("components", )
+
+    def __init__(self, *components):
+        self.components = components
+
+    def compare(self, other):
+        self_compare_key = to_compare_key(self)
+        other_compare_key = to_compare_key(other)
+        if self_compare_key < other_compare_key:
+            return -1
+        if self_compare_key > other_compare_key:
+            return +1
+        return 0
+
+
+@lambda_comparable
+class LambdaVersion(CompareVersion):
+    __slots__ = ()
+
+
+@comparable
+class GeneratedVersion(CompareVersion):
+    __slots__ = ()
+
+
+class MetaclassVersion(CompareVersion, metaclass=Comparable):
+    __slots__ = ()
+
+
+def make_components(count):
+    """
+        ベンチマーク用のバージョンの構成要素を作成する.
+    """
+    random.seed(0)
+    return [
+        (
+            random.randrange(10),
+            random.randrange(100),
+            random.randrange(1000),
+            random.choice([None, "SNAPSHOT", "Alpha", "Beta"]))
+        for _ in range(count)
+    ]
+
+
+def bench_sort(components):
+    print("sort: {} versions".format(len(components)))
+    versions = [LambdaVersion(*version_components) for version_components in components]
+    baseline = measure(lambda: sorted(versions), repeat=3)
+    report("sorted (lambda comparable)", baseline)
+
+    for version_class in (GeneratedVersion, MetaclassVersion, ApplicationVersion):
+        versions = [version_class(*version_components) for version_components in components]
+        report(
+            "sorted ({})".format(version_class.__name__),
+            measure(lambda: sorted(versions), repeat=3),
+            baseline=baseline)
+
+    report(
+        "sorted(key=sort_key(ApplicationVersion))",
+        measure(lambda: sorted(versions, key=sort_key(ApplicationVersion)), repeat=3),
+        baseline=baseline)
+
+
+def bench_bisect(components, queries):
+    print("bisect: {} versions, {} queries".format(len(components), len(queries)))
+    baseline = None
+    for version_class in (LambdaVersion, GeneratedVersion, MetaclassVersion, ApplicationVersion):
+        versions = sorted(version_class(*version_components) for version_components in components)
+        targets = [version_class(*version_components) for version_components in queries]
+
+        def search():
+            for target in targets:
+                bisect.bisect_left(versions, target)
+
+        seconds = measure(search, repeat=3)
+        report("bisect_left ({})".format(version_class.__name__), seconds, baseline=baseline)
+        baseline = baseline or seconds
+
+    versions = sorted(ApplicationVersion(*version_components) for version_components in components)
+    keys = [sort_key(ApplicationVersion)(version) for version in versions]
+    targets = [ApplicationVersion(*version_components) for version_components in queries]
+    get_key = sort_key(ApplicationVersion)
+    report(
+        "bisect_left (sort_key)",
+        measure(lambda: [bisect.bisect_left(keys, get_key(target)) for target in targets], repeat=3),
+        baseline=baseline)
+
+    def insort():
+        inserted = []
+        for target in targets:
+            bisect.insort(inserted, target)
+
+    report("insort (ApplicationVersion)", measure(insort, repeat=3))
+
+
+def main():
+    components = make_components(200000)
+    bench_sort(components)
+    bench_bisect(components, make_components(20000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import re
+import sys
+import tempfile
+
+from src.benchmark import measure
+from src.benchmark import report
+from utils.files import generate_entries
+from utils.files import generate_entries_concurrently
+from utils.files import generate_file_paths
+from utils.files import generate_file_paths_async
+from utils.files import grep_file
+
+
+def make_tree(root_path, *, depth=3, directories=8, files=32):
+    """
+        ベンチマーク用のディレクトリを作成する.
+    """
+    if depth == 0:
+        return
+    for index in range(files):
+        open(os.path.join(root_path, "file{}.txt".format(index)), "w").close()
+    for index in range(directories):
+        directory_path = os.path.join(root_path, "directory{}".format(index))
+        os.mkdir(directory_path)
+        make_tree(directory_path, depth=depth - 1, directories=directories, files=files)
+
+
+def bench(root_path):
+    consume = lambda iterable: sum(1 for _ in iterable)
+
+    print("entries: {}".format(consume(generate_entries(root_path))))
+    baseline = measure(lambda: consume(generate_file_paths(root_path)))
+    report("generate_file_paths", baseline)
+    report(
+        "generate_entries",
+        measure(lambda: consume(generate_entries(root_path))),
+        baseline=baseline)
+
+    async def consume_async(generator):
+        return sum([1 async for _ in generator])
+
+    report(
+        "generate_file_paths_async",
+        measure(lambda: asyncio.run(consume_async(generate_file_paths_async(root_path)))),
+        baseline=baseline)
+
+    for ordered in (False, True):
+        for max_workers in (1, 2, 4, 8, 16, 32):
+            report(
+                "generate_entries_concurrently({}, ordered={})".format(max_workers, ordered),
+                measure(lambda: consume(generate_entries_concurrently(
+                    root_path,
+                    max_workers=max_workers,
+                    ordered=ordered))),
+                baseline=baseline)
+
+
+def make_log_file(file_path, *, lines=1000000):
+    """
+        ベンチマーク用のログファイルを作成する.
+    """
+    with open(file_path, "w") as file:
+        for index in range(lines):
+            level = "ERROR" if index % 1000 == 0 else "INFO"
+            file.write("2000-01-01 00:00:00 {} request {} completed\n".format(level, index))
+
+
+def bench_grep(file_path):
+    pattern = re.compile(r" ERROR ")
+
+    def grep_lines():
+        with open(file_path) as file:
+            return sum(1 for line in file if pattern.search(line))
+
+    print("size: {} bytes".format(os.path.getsize(file_path)))
+    baseline = measure(grep_lines, repeat=3)
+    report("for line in open(...)", baseline)
+    report(
+        "grep_file(use_threads=True)",
+        measure(lambda: sum(1 for _ in grep_file(file_path, pattern, use_threads=True)), repeat=3),
+        baseline=baseline)
+    report(
+        "grep_file",
+        measure(lambda: sum(1 for _ in grep_file(file_path, pattern, chunk_size=1 << 22)), repeat=3),
+        baseline=baseline)
+
+
+def main():
+    # 引数でディレクトリを指定した場合は, そのディレクトリをスキャンする.
+    if len(sys.argv) > 1:
+        bench(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as root_path:
+            make_tree(root_path)
+            bench(root_path)
+
+    with tempfile.TemporaryDirectory() as root_path:
+        file_path = os.path.join(root_path, "bench.log")
+        make_log_file(file_path)
+        bench_grep(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+from src.benchmark import measure
+from src.benchmark import report
+
+
+STARTUP_BUDGET_SECONDS = 0.3
+"""invoke -l の起動時間の上限 (秒). 超えた場合はベンチマークを失敗させる."""
+
+
+def run(*command):
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+
+
+def main():
+    baseline = measure(lambda: run(
+        sys.executable, "-c",
+        "import invoke.main; "
+        "from invoke import Collection; "
+        "from utils.modules import import_modules; "
+        "Collection(*import_modules('src/tasks'))"), repeat=10)
+    report("import_modules (eager)", baseline)
+
+    # 1 回目はマニフェストを作成するため, 計測から除く.
+    run("invoke", "-l")
+    seconds = measure(lambda: run("invoke", "-l"), repeat=10)
+    report("invoke -l (lazy)", seconds, baseline=baseline)
+    report(
+        "import invoke.main",
+        measure(lambda: run(sys.executable, "-c", "import invoke.main"), repeat=10),
+        baseline=baseline)
+
+    if seconds > STARTUP_BUDGET_SECONDS:
+        sys.exit("invoke -l exceeded the startup budget: {:.3f} s > {:.3f} s".format(
+            seconds,
+            STARTUP_BUDGET_SECONDS))
+
+
+if __name__ == "__main__":
+    main()
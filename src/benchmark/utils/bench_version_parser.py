@@ -0,0 +1,39 @@
+from src.benchmark import measure
+from src.benchmark import report
+from src.benchmark.utils.bench_application_version import make_version_strings
+from utils.version_parser import VERSION_STRING_PATTERN
+from utils.version_parser import scan_version
+
+
+def parse_with_pattern(version_string):
+    matched = VERSION_STRING_PATTERN.match(version_string)
+    if matched is None:
+        return None
+    return (int(matched[1]), int(matched[2]), int(matched[3]), matched[4])
+
+
+def main():
+    version_strings = make_version_strings(1000000, distinct=100000)
+    encoded_version_strings = [version_string.encode("ascii") for version_string in version_strings]
+
+    print("scan_version: {} strings".format(len(version_strings)))
+    baseline = measure(lambda: [parse_with_pattern(version_string) for version_string in version_strings], repeat=3)
+    report("VERSION_STRING_PATTERN (str)", baseline)
+    report(
+        "scan_version (str)",
+        measure(lambda: [scan_version(version_string) for version_string in version_strings], repeat=3),
+        baseline=baseline)
+    report(
+        "VERSION_STRING_PATTERN (bytes.decode)",
+        measure(
+            lambda: [parse_with_pattern(version_string.decode("ascii")) for version_string in encoded_version_strings],
+            repeat=3),
+        baseline=baseline)
+    report(
+        "scan_version (bytes)",
+        measure(lambda: [scan_version(version_string) for version_string in encoded_version_strings], repeat=3),
+        baseline=baseline)
+
+
+if __name__ == "__main__":
+    main()
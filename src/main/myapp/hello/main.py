@@ -1,10 +1,12 @@
-import mysql.connector
-
 from myapp.utilities.config import load_config
+from utils.modules import lazy_import
+
+
+mysql_connector = lazy_import("mysql.connector")
 
 
 def connect(**connection_parameters):
-    return mysql.connector.connect(**connection_parameters)
+    return mysql_connector.connect(**connection_parameters)
 
 
 def print_columns(connection):
@@ -1,6 +1,8 @@
-import yaml
+from utils.modules import lazy_import
 
-import box
+
+yaml = lazy_import("yaml")
+box = lazy_import("box")
 
 
 def _load_yaml_file(file_path):
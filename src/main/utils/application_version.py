@@ -40,14 +40,21 @@
         print(version) # => "1.2.3"
 
         # バージョン文字列からインスタンスを生成する.
+        # 同じ文字列に対しては同じインスタンスを返す.
         version = from_string("1.2.3")
         print(version) # => "1.2.3"
+        print(version is from_string("1.2.3")) # => True
+        print(intern_cache_info()["strings"].hit_rate) # => 0.5
 
         # バージョン文字列が保存されたファイルからインスタンスを生成する.
         version_file_path = ...
         version = from_file(version_file_path)
         print(version) # => "1.2.3"
 
+        # ファイルが更新されるまで, 読み込んだインスタンスを再利用する.
+        version = from_cached_file(version_file_path)
+        print(version is from_cached_file(version_file_path)) # => True
+
         # バージョンを変更する.
         version = from_string("1.2.3-SNAPSHOT")
         print(version)                   # => "1.2.3-SNAPSHOT"
@@ -55,17 +62,95 @@
         print(version.bump_minor())      # => "1.3.0-SNAPSHOT"
         print(version.bump_patch())      # => "1.2.4-SNAPSHOT"
         print(version.bump_to_release()) # => "1.2.3"
+
+        # 複数のバージョン文字列をまとめてパースし, 列ごとの配列で扱う.
+        columns = parse_version_strings("1.2.3\n1.2.3-SNAPSHOT\ninvalid\n")
+        print(columns.invalid)                   # => array('B', [0, 0, 1])
+        print(argsort_version_columns(columns))  # => array('L', [1, 0, 2])
+
+        # バージョンの制約を満たすか調べる.
+        constraint = parse_constraint(">=1.2.0,<2.0.0-SNAPSHOT || ==3.0.0")
+        print(from_string("1.5.0") in constraint) # => True
+        print(from_string("2.0.0") in constraint) # => False
+
+        # バージョンを昇順に保持し, 二分探索で検索する.
+        index = VersionIndex(map(from_string, ["1.2.3", "1.3.0-SNAPSHOT", "2.0.0"]))
+        print(index.latest(major=1))               # => "1.3.0-SNAPSHOT"
+        print(index.latest(major=1, release=True)) # => "1.2.3"
+        print(index.higher(from_string("1.2.3")))  # => "1.3.0-SNAPSHOT"
 """
 
+import array
+import bisect
+import collections
+import functools
+import itertools
+import operator
+import os
 import re
+import struct
 import typing
+import utils.cached_files
 import utils.comparable
+import utils.files
+import utils.version_parser
+
+
+VERSION_STRING_PATTERN = utils.version_parser.VERSION_STRING_PATTERN
+"""バージョン文字列にマッチする正規表現. パースには utils.version_parser.scan_version を使う."""
 
+_CONSTRAINT_TERM_PATTERN = re.compile(r"(==|!=|>=|<=|>|<|=)?\s*(.*)", re.DOTALL)
+"""バージョンの制約の条件 (比較演算子とバージョン文字列) にマッチする正規表現."""
 
-VERSION_STRING_PATTERN = re.compile(
-    r"\A(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)(?:-([a-zA-Z0-9]+))?\Z",
-    re.MULTILINE)
-"""バージョン文字列にマッチする正規表現."""
+_INDEX_INSORT_LIMIT = 128
+"""
+    VersionIndex に追加したバージョンを 1 つずつ挿入する数の上限.
+    これより多い場合は, 並べ済みのリストを切り出しながら新しいリストを作る.
+"""
+
+_MAX_COLUMN_NUMBER = 2 ** (array.array("L").itemsize * 8) - 1
+"""VersionColumns に格納できる番号の最大値."""
+
+INTERN_CACHE_SIZE = 4096
+"""from_string, from_components が共有するインスタンスの数の上限 (それぞれ)."""
+
+InternCacheInfo = collections.namedtuple(
+    "InternCacheInfo",
+    ["hits", "misses", "maxsize", "currsize", "hit_rate"])
+"""
+    from_string, from_components が共有するインスタンスのキャッシュの統計.
+
+    Attributes
+    ----------
+    hits : int
+        キャッシュしたインスタンスを返した回数.
+    misses : int
+        インスタンスを生成した回数.
+    maxsize : int
+        キャッシュするインスタンスの数の上限.
+    currsize : int
+        キャッシュしているインスタンスの数.
+    hit_rate : float
+        hits / (hits + misses). 一度も呼び出されていない場合は 0.0.
+"""
+
+VersionColumns = collections.namedtuple(
+    "VersionColumns",
+    ["major", "minor", "patch", "suffix_codes", "suffixes", "invalid"])
+"""
+    列ごとに配列に格納した, 複数のバージョン.
+
+    Attributes
+    ----------
+    major, minor, patch : array.array("L")
+        メジャーバージョン, マイナーバージョン, パッチバージョン. 無効な行は 0.
+    suffix_codes : array.array("l")
+        サフィックスの suffixes でのインデックス. サフィックスがない行と無効な行は -1.
+    suffixes : tuple(str)
+        サフィックスの辞書. 昇順に並ぶため, インデックスの順序はサフィックスの順序と同じ.
+    invalid : array.array("B")
+        無効な行は 1, 有効な行は 0.
+"""
 
 
 class InvalidVersion(ValueError):
@@ -74,13 +159,24 @@ class InvalidVersion(ValueError):
     """
 
 
-@utils.comparable.comparable
+class InvalidConstraint(ValueError):
+    """
+        無効なバージョンの制約であることを表す例外.
+    """
+
+
+@utils.comparable.comparable(key="_packed_key")
 class ApplicationVersion(object):
     """
         アプリケーションのバージョン.
+
+        比較演算子と __hash__ は, 初期化時に計算した比較用のキー (pack_compare_key) を比較する.
+        ソートする場合は sorted(versions, key=utils.comparable.sort_key(ApplicationVersion)) とすると速い.
+
+        文字列表現は初期化時の検証で構築した文字列を保持し, str() のたびに構築しない.
     """
 
-    __slots__ = ("_major", "_minor", "_patch", "_suffix")
+    __slots__ = ("_major", "_minor", "_patch", "_suffix", "_packed_key", "_string")
 
     def __init__(
             self: "ApplicationVersion",
@@ -109,12 +205,62 @@ class ApplicationVersion(object):
                 引数から有効なバージョンを構成できない場合.
         """
         # 無効なバージョンの場合は InvalidVersion が発生する.
-        build_version_string(major, minor, patch, suffix)
+        self._string = build_version_string(major, minor, patch, suffix)
 
         self._major = major
         self._minor = minor
         self._patch = patch
         self._suffix = suffix
+        self._packed_key = pack_compare_key(major, minor, patch, suffix)
+
+    @classmethod
+    def _from_trusted_components(
+            cls: typing.Type["ApplicationVersion"],
+            major: int,
+            minor: int,
+            patch: int,
+            suffix: typing.Optional[str]=None
+            ) -> "ApplicationVersion":
+        """
+            有効であることが分かっている構成要素から, 検証せずにインスタンスを生成する.
+
+            有効なバージョンの番号を変更したバージョンや, サフィックスを既知の値に変更したバージョンは
+            必ず有効であるため, バージョン文字列の構築と正規表現による検証を省く.
+            文字列表現は最初に str() を呼び出した時に構築する.
+            サブクラスの __init__ は検証や状態の追加を行う可能性があるため, サブクラスの場合は通常どおり生成する.
+
+            Arguments
+            ---------
+            major : int
+                メジャーバージョン.
+            minor : int
+                マイナーバージョン.
+            patch : int
+                パッチバージョン.
+            suffix : str|None
+                サフィックス. 有効なサフィックスである必要がある.
+
+            Returns
+            -------
+            ApplicationVersion
+                新しいインスタンス.
+
+            Raises
+            ------
+            InvalidVersion
+                番号が比較用のキーで表せないほど大きい場合.
+        """
+        if cls is not ApplicationVersion:
+            return cls(major, minor, patch, suffix)
+
+        version = cls.__new__(cls)
+        version._major = major
+        version._minor = minor
+        version._patch = patch
+        version._suffix = suffix
+        version._packed_key = pack_compare_key(major, minor, patch, suffix)
+        version._string = None
+        return version
 
     def __str__(self: "ApplicationVersion") -> str:
         """
@@ -125,7 +271,10 @@ class ApplicationVersion(object):
             version_string : str
                 バージョンの文字列表現.
         """
-        return build_version_string(*self.components)
+        string = self._string
+        if string is None:
+            string = self._string = _format_version_string(self._major, self._minor, self._patch, self._suffix)
+        return string
 
     @property
     def components(
@@ -205,11 +354,9 @@ class ApplicationVersion(object):
                 other と等しい場合は 0.
                 other より大きい場合は正数.
         """
-        self_compare_key = to_compare_key(self)
-        other_compare_key = to_compare_key(other)
-        if self_compare_key < other_compare_key:
+        if self._packed_key < other._packed_key:
             return -1
-        if self_compare_key > other_compare_key:
+        if self._packed_key > other._packed_key:
             return +1
         return 0
 
@@ -222,7 +369,7 @@ class ApplicationVersion(object):
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
         """
-        return self.__class__(self._major + 1, 0, 0, self._suffix)
+        return self._from_trusted_components(self._major + 1, 0, 0, self._suffix)
 
     def bump_minor(self: "ApplicationVersion") -> "ApplicationVersion":
         """
@@ -233,7 +380,7 @@ class ApplicationVersion(object):
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
         """
-        return self.__class__(self._major, self._minor + 1, 0, self._suffix)
+        return self._from_trusted_components(self._major, self._minor + 1, 0, self._suffix)
 
     def bump_patch(self: "ApplicationVersion") -> "ApplicationVersion":
         """
@@ -244,7 +391,7 @@ class ApplicationVersion(object):
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
         """
-        return self.__class__(self._major, self._minor, self._patch + 1, self._suffix)
+        return self._from_trusted_components(self._major, self._minor, self._patch + 1, self._suffix)
 
     def bump_suffix(
             self: "ApplicationVersion",
@@ -257,6 +404,11 @@ class ApplicationVersion(object):
             -------
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
+
+            Raises
+            ------
+            InvalidVersion
+                無効なサフィックスの場合.
         """
         return self.__class__(self._major, self._minor, self._patch, suffix)
 
@@ -271,7 +423,7 @@ class ApplicationVersion(object):
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
         """
-        return self.bump_suffix(None)
+        return self._from_trusted_components(self._major, self._minor, self._patch, None)
 
     def bump_to_snapshot(
             self: "ApplicationVersion"
@@ -284,7 +436,7 @@ class ApplicationVersion(object):
             ApplicationVersion
                 新しいバージョンを表すインスタンス.
         """
-        return self.bump_suffix("SNAPSHOT")
+        return self._from_trusted_components(self._major, self._minor, self._patch, "SNAPSHOT")
 
     def save(
             self: "ApplicationVersion",
@@ -293,16 +445,19 @@ class ApplicationVersion(object):
         """
             ファイルに保存する.
 
+            一時ファイルに書き込んでから置き換えるため, 同時に読み込む他のスレッドやプロセスが
+            書き込み途中の内容を読み込むことはない.
+            file_path がシンボリックリンクの場合は, リンクを置き換えずにリンク先のファイルに書き込む.
+
             Arguments
             ---------
             file_path : str
                 保存先ファイルのパス.
         """
-        with open(file_path, "w") as file:
-            file.write(str(self))
+        utils.files.write_file_atomically(os.path.realpath(file_path), str(self))
 
 
-def from_file(file_path: str) -> None:
+def from_file(file_path: str) -> "ApplicationVersion":
     """
         バージョン文字列が保存されたファイルから ApplicationVersion を生成する.
 
@@ -316,15 +471,54 @@ def from_file(file_path: str) -> None:
         ApplicationVersion
             ファイルで指定されたバージョンを表す ApplicationVersion.
     """
-    with open(file_path, "r") as file:
+    # デコードせずに bytes のままパースする.
+    with open(file_path, "rb") as file:
         version_string = file.read().strip()
-        return from_string(version_string)
+    return from_components(*parse_version_string(version_string))
 
 
+def from_cached_file(
+        file_path: str,
+        *,
+        check_interval: float=utils.cached_files.CHECK_INTERVAL
+        ) -> "ApplicationVersion":
+    """
+        バージョン文字列が保存されたファイルから ApplicationVersion を生成する.
+
+        ファイルの mtime, inode 等が変わるまで, 前回と同じインスタンスを返す.
+        ファイルの更新は最大で check_interval 秒に 1 回だけ確認するため,
+        リクエストごとに呼び出すような長時間動作するプロセスで使う.
+        スレッドセーフ.
+
+        Arguments
+        ---------
+        file_path : str
+            バージョン文字列が保存されたファイルのパス.
+        check_interval : float
+            ファイルの更新を確認する間隔 (秒).
+
+        Returns
+        -------
+        ApplicationVersion
+            ファイルで指定されたバージョンを表す ApplicationVersion.
+
+        Raises
+        ------
+        InvalidVersion
+            ファイルの内容が有効なバージョン文字列ではない場合. 例外はキャッシュしない.
+    """
+    return utils.cached_files.load_cached(file_path, from_file, check_interval=check_interval)
+
+
+@functools.lru_cache(maxsize=INTERN_CACHE_SIZE, typed=True)
 def from_string(version_string: str) -> "ApplicationVersion":
     """
         バージョン文字列から ApplicationVersion を生成する.
 
+        同じバージョン文字列に対しては, 最近使われた INTERN_CACHE_SIZE 個まで同じインスタンスを返す.
+        ApplicationVersion は不変であるため, インスタンスを共有しても問題ない.
+        スレッドセーフだが, 複数のスレッドで同時に初めて呼び出した場合は別のインスタンスを返すことがある.
+
         Arguments
         ---------
         version_string : str
@@ -335,21 +529,97 @@ def from_string(version_string: str) -> "ApplicationVersion":
         -------
         ApplicationVersion
             文字列で指定されたバージョンを表す ApplicationVersion.
+
+        Raises
+        ------
+        InvalidVersion
+            version_string が有効な形式ではない場合. 例外はキャッシュしない.
     """
     versions = parse_version_string(version_string)
-    return ApplicationVersion(*versions)
+    return from_components(*versions)
+
+
+@functools.lru_cache(maxsize=INTERN_CACHE_SIZE, typed=True)
+def from_components(
+        major: int,
+        minor: int,
+        patch: int,
+        suffix: typing.Optional[str]=None
+        ) -> "ApplicationVersion":
+    """
+        バージョンの構成要素から ApplicationVersion を生成する.
+
+        同じ構成要素に対しては, from_string と同じく同じインスタンスを返す.
+        True と 1, 1.0 と 1 のように等しくても型が異なる引数は別にキャッシュするため,
+        キャッシュの状態によらず同じように検証する.
+
+        Arguments
+        ---------
+        major : int
+            メジャーバージョン.
+        minor : int
+            マイナーバージョン.
+        patch : int
+            パッチバージョン.
+        suffix : str|None
+            サフィックス.
+
+        Returns
+        -------
+        ApplicationVersion
+            構成要素で指定されたバージョンを表す ApplicationVersion.
+
+        Raises
+        ------
+        InvalidVersion
+            引数から有効なバージョンを構成できない場合.
+    """
+    return ApplicationVersion(major, minor, patch, suffix)
+
+
+def intern_cache_info() -> typing.Dict[str, InternCacheInfo]:
+    """
+        from_string, from_components が共有するインスタンスのキャッシュの統計を返す.
+
+        Returns
+        -------
+        dict(str, InternCacheInfo)
+            "strings" に from_string, "components" に from_components の統計を持つ dict.
+    """
+    return {
+        "strings": _to_intern_cache_info(from_string.cache_info()),
+        "components": _to_intern_cache_info(from_components.cache_info()),
+    }
+
+
+def clear_intern_cache() -> None:
+    """
+        from_string, from_components が共有するインスタンスと統計を破棄する.
+    """
+    from_string.cache_clear()
+    from_components.cache_clear()
+
+
+def _to_intern_cache_info(cache_info: typing.Any) -> InternCacheInfo:
+    calls = cache_info.hits + cache_info.misses
+    return InternCacheInfo(
+        cache_info.hits,
+        cache_info.misses,
+        cache_info.maxsize,
+        cache_info.currsize,
+        cache_info.hits / calls if calls else 0.0)
 
 
 def parse_version_string(
-        version_string: str
+        version_string: typing.Union[str, bytes, memoryview]
         ) -> typing.Tuple[int, int, int, typing.Optional[str]]:
     """
         バージョン文字列をパースする.
 
         Arguments
         ---------
-        version_string : str
-            バージョン文字列.
+        version_string : str|bytes|memoryview
+            バージョン文字列. bytes と memoryview はデコードせずにパースする.
             Ex. "1.2.3-SNAPSHOT".
 
         Returns
@@ -366,10 +636,10 @@ def parse_version_string(
         InvalidVersion
             version_string が有効な形式ではない場合.
     """
-    matched = VERSION_STRING_PATTERN.match(version_string)
-    if not matched:
+    components = utils.version_parser.scan_version(version_string)
+    if components is None:
         raise InvalidVersion(version_string)
-    return (int(matched[1]), int(matched[2]), int(matched[3]), matched[4])
+    return components
 
 
 def build_version_string(
@@ -397,17 +667,29 @@ def build_version_string(
         str
             引数から構築したバージョン文字列.
     """
-    if suffix is None:
-        version_string = "{}.{}.{}".format(major, minor, patch)
-    else:
-        version_string = "{}.{}.{}-{}".format(major, minor, patch, suffix)
+    version_string = _format_version_string(major, minor, patch, suffix)
 
-    if not VERSION_STRING_PATTERN.match(version_string):
+    if utils.version_parser.scan_version(version_string) is None:
         raise InvalidVersion(version_string)
 
     return version_string
 
 
+def _format_version_string(
+        major: int,
+        minor: int,
+        patch: int,
+        suffix: typing.Optional[str]
+        ) -> str:
+    """
+        検証せずにバージョン文字列を構築する.
+    """
+    if suffix is None:
+        return "{}.{}.{}".format(major, minor, patch)
+    else:
+        return "{}.{}.{}-{}".format(major, minor, patch, suffix)
+
+
 def to_compare_key(
         version: "ApplicationVersion"
         ) -> typing.Tuple[int, int, int, bool, str]:
@@ -427,3 +709,937 @@ def to_compare_key(
     major, minor, patch, suffix = version.components
     return (major, minor, patch, suffix is None, str(suffix))
 
+
+def pack_compare_key(
+        major: int,
+        minor: int,
+        patch: int,
+        suffix: typing.Optional[str]=None
+        ) -> bytes:
+    """
+        バージョンの構成要素を, to_compare_key と同じ順序になる bytes に変換する.
+
+        bytes の比較とハッシュ値の計算は C で実装された 1 回の操作で済み,
+        ハッシュ値は bytes に保存されるため, tuple を比較用のキーとするより速い.
+
+        以下を連結する.
+
+            * major, minor, patch ごとに, バイト数 (1 バイト) とビッグエンディアンの値.
+              値が大きいほどバイト数が多いか, バイト数が同じで辞書順で後になる.
+            * サフィックスがある場合は 0, ない場合は 1 (1 バイト).
+              リリースバージョンは同じ番号のサフィックス付きのバージョンより後になる.
+            * サフィックスの ASCII 文字列. 末尾にあるため, 長さが異なっても辞書順になる.
+
+        Arguments
+        ---------
+        major : int
+            メジャーバージョン.
+        minor : int
+            マイナーバージョン.
+        patch : int
+            パッチバージョン.
+        suffix : str|None
+            サフィックス. ASCII の英数字からなる.
+
+        Returns
+        -------
+        bytes
+            比較用のキー.
+
+        Raises
+        ------
+        InvalidVersion
+            番号が 255 バイトで表せない場合.
+    """
+    packed = bytearray()
+    for number in (major, minor, patch):
+        length = (number.bit_length() + 7) // 8
+        if length > 255:
+            raise InvalidVersion(build_version_string(major, minor, patch, suffix))
+        packed.append(length)
+        packed += number.to_bytes(length, "big")
+    if suffix is None:
+        packed.append(1)
+    else:
+        packed.append(0)
+        packed += suffix.encode("ascii")
+    return bytes(packed)
+
+
+def parse_version_strings(
+        version_strings: typing.Union[str, bytes, typing.Iterable[str]]
+        ) -> VersionColumns:
+    """
+        複数のバージョン文字列をまとめてパースし, 列ごとの配列に格納する.
+
+        1 回の正規表現の走査ですべての行をパースし, ApplicationVersion を生成しない.
+        無効な行は例外を発生させず, invalid に記録する.
+
+        Arguments
+        ---------
+        version_strings : str|bytes|iterable(str)
+            改行区切りのバージョン文字列, またはバージョン文字列の iterable.
+            改行区切りの場合, 末尾の改行は無視し, 行末の CR は取り除く.
+
+        Returns
+        -------
+        VersionColumns
+            入力の行と同じ順序で格納したバージョン.
+    """
+    if isinstance(version_strings, (str, bytes)):
+        pattern = utils.version_parser.VERSION_LINES_PATTERNS[type(version_strings)]
+        rows = pattern.findall(version_strings) if version_strings else []
+        if version_strings.endswith(b"\n" if isinstance(version_strings, bytes) else "\n"):
+            # 末尾の改行の後の空の行.
+            rows.pop()
+    else:
+        version_strings = list(version_strings)
+        buffer = "\n".join(version_strings)
+        if buffer.count("\n") != len(version_strings) - 1 or "\r" in buffer:
+            # 改行や CR を含む要素も, parse_version_string と同じく 1 行の無効な値として扱う.
+            # CR をそのまま残すと, 行末の CR として取り除かれて有効な行になる.
+            buffer = "\n".join(
+                version_string.replace("\n", " ").replace("\r", " ") for version_string in version_strings)
+        rows = utils.version_parser.VERSION_LINES_PATTERNS[str].findall(buffer) if version_strings else []
+
+    empty = b"" if isinstance(version_strings, bytes) else ""
+
+    # 行ごとの tuple を展開してから列に分ける. zip(*rows) より速い.
+    fields = list(itertools.chain.from_iterable(rows))
+    majors, minors, patches, suffixes = (fields[index::4] for index in range(4))
+    invalid = array.array("B", map(operator.not_, majors))
+
+    # 同じ番号は何度も現れるため, 異なる文字列ごとに 1 回だけ変換する.
+    numbers = {number: int(number) for number in set(majors).union(minors, patches) if number}
+    numbers[empty] = 0
+    overflowed = {number for number, value in numbers.items() if value > _MAX_COLUMN_NUMBER}
+    if overflowed:
+        # 桁あふれした行は, 他の無効な行と同様に番号とサフィックスを空にする.
+        for index, row in enumerate(rows):
+            if not overflowed.isdisjoint(row[:3]):
+                invalid[index] = 1
+                majors[index] = minors[index] = patches[index] = suffixes[index] = empty
+    columns = [array.array("L", map(numbers.__getitem__, column)) for column in (majors, minors, patches)]
+
+    raw_dictionary = sorted(set(suffixes) - {empty})
+    codes = {suffix: code for code, suffix in enumerate(raw_dictionary)}
+    codes[empty] = -1
+    suffix_codes = array.array("l", map(codes.__getitem__, suffixes))
+    if isinstance(version_strings, bytes):
+        dictionary = tuple(suffix.decode("ascii") for suffix in raw_dictionary)
+    else:
+        dictionary = tuple(raw_dictionary)
+
+    return VersionColumns(columns[0], columns[1], columns[2], suffix_codes, dictionary, invalid)
+
+
+def argsort_version_columns(columns: VersionColumns) -> array.array:
+    """
+        バージョンを昇順に並べた場合の行のインデックスを返す.
+
+        Arguments
+        ---------
+        columns : VersionColumns
+            並べるバージョン.
+
+        Returns
+        -------
+        array.array("L")
+            行のインデックス. 同じバージョンの行は元の順序を保つ. 無効な行は末尾に並ぶ.
+    """
+    keys = _to_packed_keys(columns, range(len(columns.suffixes)))
+    return array.array("L", sorted(range(len(keys)), key=keys.__getitem__))
+
+
+def compare_version_columns(
+        columns: VersionColumns,
+        other: typing.Union[VersionColumns, "ApplicationVersion", typing.Any]
+        ) -> array.array:
+    """
+        バージョンを行ごとに比較する.
+
+        Arguments
+        ---------
+        columns : VersionColumns
+            比較するバージョン.
+        other : VersionColumns|ApplicationVersion
+            比較対象のバージョン. VersionColumns の場合は同じ行数である必要がある.
+            それ以外の場合はバージョン文字列に変換し, すべての行と比較する.
+
+        Returns
+        -------
+        array.array("b")
+            other より小さい行は -1, 等しい行は 0, 大きい行は +1.
+            どちらかが無効な行は 0 であるため, invalid で除外する.
+
+        Raises
+        ------
+        ValueError
+            行数が異なる場合.
+    """
+    if not isinstance(other, VersionColumns):
+        other = parse_version_strings([str(other)])
+        broadcast = True
+    elif len(other.invalid) != len(columns.invalid):
+        raise ValueError("Different number of rows", len(columns.invalid), len(other.invalid))
+    else:
+        broadcast = False
+
+    # 両方のサフィックスの辞書を合わせた順位で比較する.
+    ranks = {suffix: rank for rank, suffix in enumerate(sorted(set(columns.suffixes) | set(other.suffixes)))}
+    keys = _to_packed_keys(columns, [ranks[suffix] for suffix in columns.suffixes])
+    other_keys = _to_packed_keys(other, [ranks[suffix] for suffix in other.suffixes])
+    if broadcast:
+        other_keys = itertools.repeat(other_keys[0])
+
+    results = array.array("b", map(operator.sub, map(operator.gt, keys, other_keys), map(operator.lt, keys, other_keys)))
+    other_invalid = itertools.repeat(other.invalid[0]) if broadcast else other.invalid
+    for index in itertools.compress(itertools.count(), map(operator.or_, columns.invalid, other_invalid)):
+        results[index] = 0
+    return results
+
+
+_PACKED_KEY_STRUCT = struct.Struct(">BQQQQ")
+"""無効か否か, 番号, サフィックスの順位を連結した, 比較用のキーの形式."""
+
+
+def _to_packed_keys(columns: VersionColumns, suffix_ranks: typing.Sequence[int]) -> typing.List[bytes]:
+    """
+        行ごとに, バージョンの順序と同じ順序になる bytes に変換する.
+
+        番号とサフィックスの順位は固定長であるため, 連結した bytes の順序はバージョンの順序と同じになる.
+        行ごとの変換は map と struct で行い, Python の関数を呼び出さない.
+
+        Arguments
+        ---------
+        columns : VersionColumns
+            変換するバージョン.
+        suffix_ranks : sequence(int)
+            suffixes の各サフィックスの順位.
+
+        Returns
+        -------
+        list(bytes)
+            行ごとの比較用のキー. 無効な行は有効な行より大きい.
+    """
+    # サフィックスがない行のコードは -1 であるため, 末尾の順位 (どのサフィックスよりも大きい) を参照する.
+    ranks = list(suffix_ranks) + [2 ** 64 - 1]
+    return list(map(
+        _PACKED_KEY_STRUCT.pack,
+        columns.invalid,
+        columns.major,
+        columns.minor,
+        columns.patch,
+        map(ranks.__getitem__, columns.suffix_codes)))
+
+
+class VersionConstraint(object):
+    """
+        バージョンの制約.
+
+        制約を満たすバージョンの集合を, 比較用のキー (pack_compare_key) の半開区間の和集合として保持する.
+        区間の境界を昇順に並べて保持するため, バージョンが制約を満たすか否かは二分探索で判定できる.
+        インスタンスは parse_constraint で生成する.
+    """
+
+    __slots__ = ("_bounds",)
+
+    def __init__(self: "VersionConstraint", bounds: typing.Iterable[bytes]=()) -> None:
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            bounds : iterable(bytes)
+                昇順に並べた区間の境界. 偶数番目は区間の下限 (含む), 奇数番目は上限 (含まない).
+                要素数が奇数の場合, 最後の区間は上限を持たない.
+        """
+        self._bounds = tuple(bounds)
+
+    def __repr__(self: "VersionConstraint") -> str:
+        return "{}({!r})".format(self.__class__.__name__, self._bounds)
+
+    def __eq__(self: "VersionConstraint", other: typing.Any) -> bool:
+        if not isinstance(other, VersionConstraint):
+            return NotImplemented
+        return self._bounds == other._bounds
+
+    def __hash__(self: "VersionConstraint") -> int:
+        return hash(self._bounds)
+
+    def __contains__(self: "VersionConstraint", version: typing.Union["ApplicationVersion", str]) -> bool:
+        """
+            バージョンが制約を満たすか判定する.
+
+            Arguments
+            ---------
+            version : ApplicationVersion|str
+                バージョン, またはバージョン文字列.
+
+            Returns
+            -------
+            bool
+                制約を満たす場合は True.
+        """
+        if isinstance(version, str):
+            version = from_string(version)
+        return bisect.bisect_right(self._bounds, version._packed_key) % 2 == 1
+
+    def __and__(self: "VersionConstraint", other: "VersionConstraint") -> "VersionConstraint":
+        return self.intersection(other)
+
+    def __or__(self: "VersionConstraint", other: "VersionConstraint") -> "VersionConstraint":
+        return self.union(other)
+
+    def contains_key(self: "VersionConstraint", packed_key: bytes) -> bool:
+        """
+            比較用のキーが表すバージョンが制約を満たすか判定する.
+
+            Arguments
+            ---------
+            packed_key : bytes
+                pack_compare_key が返す比較用のキー.
+
+            Returns
+            -------
+            bool
+                制約を満たす場合は True.
+        """
+        return bisect.bisect_right(self._bounds, packed_key) % 2 == 1
+
+    def is_empty(self: "VersionConstraint") -> bool:
+        """
+            制約を満たすバージョンが存在しないか判定する.
+
+            Returns
+            -------
+            bool
+                存在しない場合は True.
+        """
+        return not self._bounds
+
+    def intersection(self: "VersionConstraint", other: "VersionConstraint") -> "VersionConstraint":
+        """
+            両方の制約を満たす制約を返す.
+
+            Arguments
+            ---------
+            other : VersionConstraint
+                制約.
+
+            Returns
+            -------
+            VersionConstraint
+                新しい制約.
+        """
+        return VersionConstraint(_combine_bounds(self._bounds, other._bounds, operator.and_))
+
+    def union(self: "VersionConstraint", other: "VersionConstraint") -> "VersionConstraint":
+        """
+            いずれかの制約を満たす制約を返す.
+
+            Arguments
+            ---------
+            other : VersionConstraint
+                制約.
+
+            Returns
+            -------
+            VersionConstraint
+                新しい制約.
+        """
+        return VersionConstraint(_combine_bounds(self._bounds, other._bounds, operator.or_))
+
+    def ranges(self: "VersionConstraint", packed_keys: typing.Sequence[bytes]) -> typing.Iterator[range]:
+        """
+            昇順に並べた比較用のキーのうち, 制約を満たすキーのインデックスの範囲を返す.
+
+            区間ごとに二分探索するため, キーの数ではなく区間の数に比例する時間で求まる.
+
+            Arguments
+            ---------
+            packed_keys : sequence(bytes)
+                昇順に並べた比較用のキー.
+
+            Yields
+            ------
+            range
+                制約を満たすキーのインデックスの範囲. 空の範囲は返さない.
+        """
+        yield from _to_ranges(self._bounds, lambda bound: bisect.bisect_left(packed_keys, bound), len(packed_keys))
+
+    def filter(
+            self: "VersionConstraint",
+            versions: typing.Sequence["ApplicationVersion"]
+            ) -> typing.List["ApplicationVersion"]:
+        """
+            昇順に並べたバージョンのうち, 制約を満たすバージョンを返す.
+
+            バージョンを 1 つずつ比較せず, 区間ごとに二分探索して切り出す.
+
+            Arguments
+            ---------
+            versions : sequence(ApplicationVersion)
+                昇順に並べたバージョン.
+
+            Returns
+            -------
+            list(ApplicationVersion)
+                制約を満たすバージョン. 順序は versions と同じ.
+        """
+        key = utils.comparable.sort_key(ApplicationVersion)
+        filtered = []
+        for indices in _to_ranges(
+                self._bounds,
+                lambda bound: bisect.bisect_left(versions, bound, key=key),
+                len(versions)):
+            filtered.extend(versions[indices.start:indices.stop])
+        return filtered
+
+
+def parse_constraint(constraint_string: str) -> VersionConstraint:
+    """
+        バージョンの制約をパースする.
+
+        制約は比較演算子とバージョン文字列からなる条件を "," (かつ) と "||" (または) で結合する.
+        比較演算子は ==, =, !=, >=, <=, >, < のいずれか. 省略した場合は == と同じ.
+        "*" は任意のバージョンを表す.
+
+            >=1.2.0,<2.0.0-SNAPSHOT || ==3.0.0
+
+        Arguments
+        ---------
+        constraint_string : str
+            バージョンの制約.
+
+        Returns
+        -------
+        VersionConstraint
+            制約.
+
+        Raises
+        ------
+        InvalidConstraint
+            無効な制約の場合.
+    """
+    constraint = VersionConstraint()
+    for clause in constraint_string.split("||"):
+        clause_constraint = VersionConstraint((b"",))
+        for term in clause.split(","):
+            clause_constraint &= _parse_constraint_term(term.strip(), constraint_string)
+        constraint |= clause_constraint
+    return constraint
+
+
+def _parse_constraint_term(term: str, constraint_string: str) -> VersionConstraint:
+    """
+        バージョンの制約の条件を 1 つパースする.
+
+        Arguments
+        ---------
+        term : str
+            条件.
+        constraint_string : str
+            条件を含む制約. 例外のメッセージに含める.
+
+        Returns
+        -------
+        VersionConstraint
+            条件を満たすバージョンの制約.
+
+        Raises
+        ------
+        InvalidConstraint
+            無効な条件の場合.
+    """
+    if term == "*":
+        return VersionConstraint((b"",))
+
+    symbol, version_string = _CONSTRAINT_TERM_PATTERN.fullmatch(term).groups()
+    try:
+        key = from_string(version_string)._packed_key
+    except InvalidVersion:
+        raise InvalidConstraint(constraint_string, term) from None
+
+    # 比較用のキーは他のキーの前方一致になりうる (1.2.3-A と 1.2.3-AB) が, サフィックスは英数字で 0x00 を含まない.
+    # そのため key + b"\x00" は他のバージョンのキーにならず, key の直後の境界として扱える.
+    next_key = key + b"\x00"
+    if symbol in (None, "==", "="):
+        return VersionConstraint((key, next_key))
+    if symbol == "!=":
+        return VersionConstraint((b"", key, next_key))
+    if symbol == ">=":
+        return VersionConstraint((key,))
+    if symbol == ">":
+        return VersionConstraint((next_key,))
+    if symbol == "<=":
+        return VersionConstraint((b"", next_key))
+    return VersionConstraint((b"", key))
+
+
+def _combine_bounds(
+        bounds: typing.Tuple[bytes, ...],
+        other_bounds: typing.Tuple[bytes, ...],
+        combine: typing.Callable[[bool, bool], bool]
+        ) -> typing.List[bytes]:
+    """
+        2 つの区間の境界を合わせる.
+
+        Arguments
+        ---------
+        bounds, other_bounds : tuple(bytes)
+            区間の境界.
+        combine : callable
+            それぞれの区間に含まれるか否かから, 結果の区間に含まれるか否かを求める関数.
+
+        Returns
+        -------
+        list(bytes)
+            結果の区間の境界.
+    """
+    combined = []
+    inside = False
+    for bound in sorted(set(bounds).union(other_bounds)):
+        contained = combine(
+            bisect.bisect_right(bounds, bound) % 2 == 1,
+            bisect.bisect_right(other_bounds, bound) % 2 == 1)
+        if contained != inside:
+            combined.append(bound)
+            inside = contained
+    return combined
+
+
+def _to_ranges(
+        bounds: typing.Tuple[bytes, ...],
+        find_index: typing.Callable[[bytes], int],
+        length: int
+        ) -> typing.Iterator[range]:
+    """
+        区間ごとに, 区間に含まれる要素のインデックスの範囲を返す.
+
+        Arguments
+        ---------
+        bounds : tuple(bytes)
+            区間の境界.
+        find_index : callable
+            境界を挿入する位置を二分探索する関数.
+        length : int
+            要素数. 上限を持たない区間の終わり.
+
+        Yields
+        ------
+        range
+            区間に含まれる要素のインデックスの範囲. 空の範囲は返さない.
+    """
+    indices = [find_index(bound) for bound in bounds]
+    if len(indices) % 2 == 1:
+        indices.append(length)
+    for start, stop in zip(indices[0::2], indices[1::2]):
+        if start < stop:
+            yield range(start, stop)
+
+
+class VersionIndex(object):
+    """
+        昇順に並べたバージョンの集まり.
+
+        比較用のキー (pack_compare_key) の昇順のリストと, 同じ順序のバージョンのリストを保持し, 二分探索で検索する.
+        追加したバージョンはすぐには並べず, 次に検索する時にまとめて挿入するため,
+        続けて追加する場合は 1 つずつ挿入するより速い.
+        同じバージョンを複数回追加した場合は, 追加した回数だけ保持する.
+    """
+
+    __slots__ = ("_keys", "_versions", "_pending")
+
+    def __init__(
+            self: "VersionIndex",
+            versions: typing.Iterable["ApplicationVersion"]=()
+            ) -> None:
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            versions : iterable(ApplicationVersion)
+                保持するバージョン. 順序は問わない.
+        """
+        self._keys = []
+        self._versions = []
+        self._pending = list(versions)
+
+    def __len__(self: "VersionIndex") -> int:
+        return len(self._versions) + len(self._pending)
+
+    def __iter__(self: "VersionIndex") -> typing.Iterator["ApplicationVersion"]:
+        self._merge()
+        return iter(self._versions)
+
+    def __reversed__(self: "VersionIndex") -> typing.Iterator["ApplicationVersion"]:
+        self._merge()
+        return reversed(self._versions)
+
+    def __contains__(self: "VersionIndex", version: typing.Union["ApplicationVersion", str]) -> bool:
+        self._merge()
+        key = _to_packed_key(version)
+        index = bisect.bisect_left(self._keys, key)
+        return index < len(self._keys) and self._keys[index] == key
+
+    def add(self: "VersionIndex", version: "ApplicationVersion") -> None:
+        """
+            バージョンを追加する.
+
+            Arguments
+            ---------
+            version : ApplicationVersion
+                追加するバージョン.
+        """
+        self._pending.append(version)
+
+    def update(self: "VersionIndex", versions: typing.Iterable["ApplicationVersion"]) -> None:
+        """
+            複数のバージョンを追加する.
+
+            Arguments
+            ---------
+            versions : iterable(ApplicationVersion)
+                追加するバージョン. 順序は問わない.
+        """
+        self._pending.extend(versions)
+
+    def floor(
+            self: "VersionIndex",
+            version: typing.Union["ApplicationVersion", str]
+            ) -> typing.Optional["ApplicationVersion"]:
+        """
+            version 以下の最大のバージョンを返す.
+
+            Arguments
+            ---------
+            version : ApplicationVersion|str
+                バージョン, またはバージョン文字列.
+
+            Returns
+            -------
+            ApplicationVersion|None
+                バージョン. 存在しない場合は None.
+        """
+        self._merge()
+        index = bisect.bisect_right(self._keys, _to_packed_key(version))
+        return self._versions[index - 1] if index > 0 else None
+
+    def ceiling(
+            self: "VersionIndex",
+            version: typing.Union["ApplicationVersion", str]
+            ) -> typing.Optional["ApplicationVersion"]:
+        """
+            version 以上の最小のバージョンを返す.
+
+            Arguments
+            ---------
+            version : ApplicationVersion|str
+                バージョン, またはバージョン文字列.
+
+            Returns
+            -------
+            ApplicationVersion|None
+                バージョン. 存在しない場合は None.
+        """
+        self._merge()
+        index = bisect.bisect_left(self._keys, _to_packed_key(version))
+        return self._versions[index] if index < len(self._versions) else None
+
+    def lower(
+            self: "VersionIndex",
+            version: typing.Union["ApplicationVersion", str]
+            ) -> typing.Optional["ApplicationVersion"]:
+        """
+            version より小さい最大のバージョンを返す.
+
+            Arguments
+            ---------
+            version : ApplicationVersion|str
+                バージョン, またはバージョン文字列.
+
+            Returns
+            -------
+            ApplicationVersion|None
+                バージョン. 存在しない場合は None.
+        """
+        self._merge()
+        index = bisect.bisect_left(self._keys, _to_packed_key(version))
+        return self._versions[index - 1] if index > 0 else None
+
+    def higher(
+            self: "VersionIndex",
+            version: typing.Union["ApplicationVersion", str]
+            ) -> typing.Optional["ApplicationVersion"]:
+        """
+            version より大きい最小のバージョンを返す.
+
+            Arguments
+            ---------
+            version : ApplicationVersion|str
+                バージョン, またはバージョン文字列.
+
+            Returns
+            -------
+            ApplicationVersion|None
+                バージョン. 存在しない場合は None.
+        """
+        self._merge()
+        index = bisect.bisect_right(self._keys, _to_packed_key(version))
+        return self._versions[index] if index < len(self._versions) else None
+
+    def range(
+            self: "VersionIndex",
+            start: typing.Union["ApplicationVersion", str, None]=None,
+            stop: typing.Union["ApplicationVersion", str, None]=None
+            ) -> typing.List["ApplicationVersion"]:
+        """
+            start 以上, stop 未満のバージョンを返す.
+
+            Arguments
+            ---------
+            start : ApplicationVersion|str|None
+                範囲の下限 (含む). None の場合は下限を設けない.
+            stop : ApplicationVersion|str|None
+                範囲の上限 (含まない). None の場合は上限を設けない.
+
+            Returns
+            -------
+            list(ApplicationVersion)
+                昇順に並べたバージョン.
+        """
+        self._merge()
+        start_index = 0 if start is None else bisect.bisect_left(self._keys, _to_packed_key(start))
+        stop_index = len(self._keys) if stop is None else bisect.bisect_left(self._keys, _to_packed_key(stop))
+        return self._versions[start_index:stop_index]
+
+    def select(self: "VersionIndex", constraint: VersionConstraint) -> typing.List["ApplicationVersion"]:
+        """
+            制約を満たすバージョンを返す.
+
+            Arguments
+            ---------
+            constraint : VersionConstraint
+                バージョンの制約.
+
+            Returns
+            -------
+            list(ApplicationVersion)
+                昇順に並べたバージョン.
+        """
+        self._merge()
+        selected = []
+        for indices in constraint.ranges(self._keys):
+            selected.extend(self._versions[indices.start:indices.stop])
+        return selected
+
+    def group(
+            self: "VersionIndex",
+            major: int,
+            minor: typing.Optional[int]=None
+            ) -> typing.List["ApplicationVersion"]:
+        """
+            メジャーバージョン (とマイナーバージョン) が同じバージョンを返す.
+
+            Arguments
+            ---------
+            major : int
+                メジャーバージョン.
+            minor : int|None
+                マイナーバージョン. None の場合はメジャーバージョンだけで絞り込む.
+
+            Returns
+            -------
+            list(ApplicationVersion)
+                昇順に並べたバージョン.
+
+            Raises
+            ------
+            ValueError
+                major または minor が負の場合.
+        """
+        self._merge()
+        start, stop = self._find_group(major, minor)
+        return self._versions[start:stop]
+
+    def groups(
+            self: "VersionIndex",
+            *,
+            minor: bool=False
+            ) -> typing.Iterator[typing.Tuple[typing.Any, typing.List["ApplicationVersion"]]]:
+        """
+            メジャーバージョン (またはメジャーバージョンとマイナーバージョン) ごとにバージョンを返す.
+
+            グループの境界を二分探索で求めるため, バージョンを 1 つずつ比較しない.
+
+            Arguments
+            ---------
+            minor : bool
+                True の場合はマイナーバージョンごとに分ける.
+
+            Yields
+            ------
+            group, versions : tuple(int|tuple(int, int), list(ApplicationVersion))
+                メジャーバージョン (minor が True の場合はメジャーバージョンとマイナーバージョン) と,
+                昇順に並べたバージョン.
+        """
+        self._merge()
+        index = 0
+        while index < len(self._versions):
+            version = self._versions[index]
+            if minor:
+                group = (version.major, version.minor)
+                stop = bisect.bisect_left(self._keys, _pack_numbers(version.major, version.minor + 1), index)
+            else:
+                group = version.major
+                stop = bisect.bisect_left(self._keys, _pack_numbers(version.major + 1), index)
+            yield group, self._versions[index:stop]
+            index = stop
+
+    def latest(
+            self: "VersionIndex",
+            major: typing.Optional[int]=None,
+            minor: typing.Optional[int]=None,
+            *,
+            release: bool=False
+            ) -> typing.Optional["ApplicationVersion"]:
+        """
+            最新のバージョンを返す.
+
+            Arguments
+            ---------
+            major : int|None
+                メジャーバージョン. None の場合はすべてのバージョンから探す.
+            minor : int|None
+                マイナーバージョン. None の場合はメジャーバージョンだけで絞り込む.
+            release : bool
+                True の場合はサフィックスがないバージョンから探す.
+                末尾からパッチバージョンごとに二分探索で読み飛ばすため,
+                最新のリリースバージョンより後にあるパッチバージョンの種類の数に比例する回数だけ二分探索する.
+
+            Returns
+            -------
+            ApplicationVersion|None
+                バージョン. 存在しない場合は None.
+
+            Raises
+            ------
+            ValueError
+                major を指定せずに minor を指定した場合, または major か minor が負の場合.
+        """
+        self._merge()
+        if major is None:
+            if minor is not None:
+                raise ValueError("minor is specified without major", minor)
+            start, stop = 0, len(self._versions)
+        else:
+            start, stop = self._find_group(major, minor)
+
+        index = stop - 1
+        while index >= start:
+            version = self._versions[index]
+            if not release or version._suffix is None:
+                return version
+            # 同じ番号のリリースバージョンはサフィックス付きのバージョンより後に並ぶため,
+            # 末尾がサフィックス付きの場合は, その番号のバージョンをまとめて読み飛ばす.
+            numbers = _pack_numbers(version._major, version._minor, version._patch)
+            index = bisect.bisect_left(self._keys, numbers, start, index) - 1
+        return None
+
+    def _find_group(self: "VersionIndex", major: int, minor: typing.Optional[int]) -> typing.Tuple[int, int]:
+        """
+            メジャーバージョン (とマイナーバージョン) が同じバージョンのインデックスの範囲を求める.
+
+            Returns
+            -------
+            start, stop : tuple(int, int)
+                インデックスの範囲.
+
+            Raises
+            ------
+            ValueError
+                major または minor が負の場合.
+        """
+        # 負の番号は比較用のキーに変換できず, バージョンにも存在しない.
+        if major < 0:
+            raise ValueError("major must not be negative", major)
+        if minor is not None and minor < 0:
+            raise ValueError("minor must not be negative", minor)
+        if minor is None:
+            lower, upper = _pack_numbers(major), _pack_numbers(major + 1)
+        else:
+            lower, upper = _pack_numbers(major, minor), _pack_numbers(major, minor + 1)
+        start = bisect.bisect_left(self._keys, lower)
+        return start, bisect.bisect_left(self._keys, upper, start)
+
+    def _merge(self: "VersionIndex") -> None:
+        """
+            追加したバージョンを並べて挿入する.
+
+            list.insert は要素をずらすだけで済むため, 少ない場合は 1 つずつ二分探索して挿入する.
+            多い場合は追加したバージョンだけをソートし, 挿入する位置の間を切り出して新しいリストを作る.
+            いずれも保持しているバージョンの比較用のキーを再計算しない.
+        """
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+
+        keys = self._keys
+        versions = self._versions
+        if len(pending) <= _INDEX_INSORT_LIMIT:
+            for version in pending:
+                key = version._packed_key
+                index = bisect.bisect_right(keys, key)
+                keys.insert(index, key)
+                versions.insert(index, version)
+            return
+
+        sort_key = utils.comparable.sort_key(ApplicationVersion)
+        pending.sort(key=sort_key)
+        if not keys:
+            self._keys = list(map(sort_key, pending))
+            self._versions = pending
+            return
+
+        merged_keys = []
+        merged_versions = []
+        start = 0
+        for version in pending:
+            key = version._packed_key
+            stop = bisect.bisect_right(keys, key, start)
+            merged_keys += keys[start:stop]
+            merged_keys.append(key)
+            merged_versions += versions[start:stop]
+            merged_versions.append(version)
+            start = stop
+        merged_keys += keys[start:]
+        merged_versions += versions[start:]
+        self._keys = merged_keys
+        self._versions = merged_versions
+
+
+def _to_packed_key(version: typing.Union["ApplicationVersion", str]) -> bytes:
+    """
+        バージョン, またはバージョン文字列を比較用のキーに変換する.
+    """
+    if isinstance(version, str):
+        version = from_string(version)
+    return version._packed_key
+
+
+def _pack_numbers(*numbers: int) -> bytes:
+    """
+        番号を pack_compare_key と同じ形式で連結する.
+
+        番号が等しいバージョンの比較用のキーは, すべて戻り値で始まる.
+        また, 番号が大きいバージョンの比較用のキーより小さい.
+    """
+    packed = bytearray()
+    for number in numbers:
+        length = (number.bit_length() + 7) // 8
+        packed.append(length)
+        packed += number.to_bytes(length, "big")
+    return bytes(packed)
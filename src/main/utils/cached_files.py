@@ -0,0 +1,123 @@
+"""
+    ファイルから読み込んだ値を, ファイルが更新されるまでキャッシュする機能を提供する.
+
+    長時間動作するプロセスで, 同じファイルを繰り返し読み込む場合に使う.
+    ファイルの更新は os.stat で確認し, 確認する間隔を制限するため, 多くの呼び出しはシステムコールを伴わない.
+    リクエストごとに呼び出すことを想定し, utils.files のように import に時間がかかるモジュールに依存しない.
+
+    Examples
+    --------
+
+        version = load_cached("VERSION", utils.application_version.from_file)
+"""
+
+import collections
+import os
+import threading
+import time
+import typing
+
+
+_T = typing.TypeVar("_T")
+
+CHECK_INTERVAL = 1.0
+"""ファイルの更新を確認する間隔の既定値 (秒)."""
+
+_CachedFile = collections.namedtuple("_CachedFile", ["value", "signature", "checked_at"])
+"""
+    キャッシュした値.
+
+    Attributes
+    ----------
+    value : object
+        ファイルから読み込んだ値.
+    signature : tuple(int, int, int, int)
+        値を読み込む前のファイルの mtime (ナノ秒), inode, デバイス, サイズ.
+    checked_at : float
+        最後にファイルの更新を確認した時刻 (time.monotonic).
+"""
+
+_cached_files = {}
+"""(ファイルの絶対パス, 読み込む関数) と _CachedFile の dict. 要素は置き換えるだけで, 変更しない."""
+
+_cached_files_lock = threading.Lock()
+
+
+def load_cached(
+        file_path: str,
+        load: typing.Callable[[str], _T],
+        *,
+        check_interval: float=CHECK_INTERVAL
+        ) -> _T:
+    """
+        ファイルから読み込んだ値を返す. ファイルが更新されていない場合はキャッシュした値を返す.
+
+        前回の確認から check_interval 秒以内はファイルを確認せずにキャッシュした値を返す.
+        それ以降は mtime, inode, デバイス, サイズを確認し, いずれかが変わっている場合だけ読み込み直す.
+        一時ファイルに書き込んでから置き換える場合 (utils.files.write_file_atomically) は inode が変わるため,
+        mtime の分解能より短い間隔で更新されても検出できる.
+
+        スレッドセーフ. キャッシュした値を返す場合はロックを取得しない.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        load : callable
+            ファイルのパスを受け取り, 値を返す関数.
+        check_interval : float
+            ファイルの更新を確認する間隔 (秒). 0 の場合は毎回確認する.
+
+        Returns
+        -------
+        value : object
+            load が返した値.
+
+        Raises
+        ------
+        OSError
+            ファイルの情報を取得できない, または読み込めない場合.
+            load が発生させた例外はそのまま発生し, キャッシュしない.
+    """
+    key = (os.path.abspath(file_path), load)
+    now = time.monotonic()
+
+    cached_file = _cached_files.get(key)
+    if cached_file is not None and now - cached_file.checked_at < check_interval:
+        return cached_file.value
+
+    with _cached_files_lock:
+        # ロックを待つ間に他のスレッドが確認した可能性がある.
+        cached_file = _cached_files.get(key)
+        if cached_file is not None and now - cached_file.checked_at < check_interval:
+            return cached_file.value
+
+        # 読み込んだ後に更新された場合は, 次に確認した時に読み込み直す.
+        signature = _get_signature(file_path)
+        if cached_file is not None and cached_file.signature == signature:
+            value = cached_file.value
+        else:
+            value = load(file_path)
+        _cached_files[key] = _CachedFile(value, signature, now)
+        return value
+
+
+def clear_cache() -> None:
+    """
+        キャッシュした値をすべて破棄する.
+    """
+    with _cached_files_lock:
+        _cached_files.clear()
+
+
+def _get_signature(file_path: str) -> typing.Tuple[int, int, int, int]:
+    """
+        ファイルの更新を検出するための, ファイルの情報を返す.
+
+        Returns
+        -------
+        signature : tuple(int, int, int, int)
+            mtime (ナノ秒), inode, デバイス, サイズ.
+    """
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_ino, stat.st_dev, stat.st_size)
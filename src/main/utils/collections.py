@@ -1,5 +1,21 @@
+import heapq
+import math
+import os
+import pickle
+from functools import partial
 from functools import reduce
+from itertools import islice
 from itertools import zip_longest
+from operator import itemgetter
+from tempfile import TemporaryDirectory
+from tempfile import mkstemp
+
+
+DEFAULT_BUFFER_SIZE = 1000000
+
+_MAX_MERGE_WIDTH = 256
+
+_MAX_SPILL_BATCH_SIZE = 1024
 
 
 def flatten(*values):
@@ -19,8 +35,133 @@ def frequencies(values):
     return reduce(reducer, values, {})
 
 
+def merge_frequencies(counts, other_counts):
+    for value, count in other_counts.items():
+        counts[value] = counts.get(value, 0) + count
+    return counts
+
+
 def chunked(values, size, padding=None):
     if size < 1:
         raise ValueError("Invalid size", size)
     return zip_longest(*[iter(values)] * size, fillvalue=padding)
 
+
+def external_sort(
+        values,
+        key=None,
+        reverse=False,
+        *,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        max_workers=1,
+        temp_dir=None):
+    """
+        メモリに収まらない値をソートする.
+
+        values を buffer_size と max_workers から求めた要素数ずつ islice (2 つ目以降は map_chunks) で切り出したランをメモリ上でソートして
+        一時ファイルに書き出し, それらを heapq.merge でマージしながら生成する. sorted と同じく安定ソートである.
+
+        Arguments
+        ---------
+        values : iterable
+            ソートする値. pickle 可能である必要がある.
+        key : callable|None
+            sorted の key と同じ. max_workers が 2 以上の場合は pickle 可能である必要がある.
+        reverse : bool
+            sorted の reverse と同じ.
+        buffer_size : int
+            同時にメモリ上に保持する要素数の上限.
+        max_workers : int
+            ランをソートするプロセスの数.
+        temp_dir : str|None
+            一時ファイルを作成するディレクトリのパス. None の場合はシステムの既定値.
+
+        Yields
+        ------
+        value : object
+            ソートされた値.
+    """
+    from utils.parallel import map_chunks
+
+    # 読み込み中のランと, ソート中のランがそれぞれメモリ上に保持される.
+    run_size = buffer_size // (max_workers + 1)
+    if run_size < 1:
+        raise ValueError("Invalid buffer_size", buffer_size)
+
+    iterator = iter(values)
+    first_run = list(islice(iterator, run_size))
+    if len(first_run) < run_size:
+        yield from sorted(first_run, key=key, reverse=reverse)
+        return
+
+    # マージ中は, 各ランから読み込んだバッチと書き出し中のバッチが 1 つずつメモリ上に保持される.
+    merge_width = max(2, min(_MAX_MERGE_WIDTH, math.isqrt(buffer_size)))
+    batch_size = max(1, min(_MAX_SPILL_BATCH_SIZE, buffer_size // (merge_width + 1)))
+
+    with TemporaryDirectory(dir=temp_dir) as directory:
+        spill_run = partial(_spill_run, key=key, reverse=reverse, directory=directory, batch_size=batch_size)
+        run_paths = [spill_run(first_run)]
+        del first_run
+        run_paths.extend(map_chunks(
+            spill_run,
+            iterator,
+            chunk_size=run_size,
+            max_workers=max_workers,
+            max_in_flight=max_workers,
+            use_threads=max_workers == 1))
+
+        merge_key = None if key is None else itemgetter(0)
+        while len(run_paths) > merge_width:
+            # 同時に開くファイルの数とメモリ上に保持する要素数を抑えるため, 隣り合うランを順にまとめる.
+            run_paths = [
+                _spill_records(
+                    directory, _merge_runs(run_paths[i:i + merge_width], merge_key, reverse), batch_size)
+                for i in range(0, len(run_paths), merge_width)
+            ]
+
+        records = _merge_runs(run_paths, merge_key, reverse)
+        if key is None:
+            yield from records
+        else:
+            yield from map(itemgetter(1), records)
+
+
+def _spill_run(run, *, key, reverse, directory, batch_size):
+    if key is None:
+        records = sorted(run, reverse=reverse)
+    else:
+        records = [(key(value), value) for value in run]
+        records.sort(key=itemgetter(0), reverse=reverse)
+    return _spill_records(directory, records, batch_size)
+
+
+def _spill_records(directory, records, batch_size):
+    records = iter(records)
+    descriptor, file_path = mkstemp(suffix=".run", dir=directory)
+    with open(descriptor, "wb") as file:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return file_path
+            pickle.dump(batch, file, protocol=pickle.HIGHEST_PROTOCOL)
+            # 次のバッチを集める間, 書き出したバッチを保持しない.
+            del batch
+
+
+def _read_run(file_path):
+    try:
+        with open(file_path, "rb") as file:
+            while True:
+                try:
+                    batch = pickle.load(file)
+                except EOFError:
+                    return
+                yield from batch
+                # 次のバッチを読み込む間, 生成し終えたバッチを保持しない.
+                del batch
+    finally:
+        os.remove(file_path)
+
+
+def _merge_runs(run_paths, key, reverse):
+    return heapq.merge(*map(_read_run, run_paths), key=key, reverse=reverse)
@@ -1,45 +1,174 @@
+import operator
+
+
+_OPERATORS = {
+    "__eq__": "==",
+    "__ne__": "!=",
+    "__lt__": "<",
+    "__le__": "<=",
+    "__gt__": ">",
+    "__ge__": ">=",
+}
+
+_METHOD_COMPARE_TEMPLATE = """
+def {name}(self, other):
+    return self.compare(other) {operator} 0
+"""
+"""compare メソッドを呼び出す比較演算子のテンプレート. サブクラスでオーバーライドした compare を呼び出す."""
+
+_FUNCTION_COMPARE_TEMPLATE = """
+def {name}(self, other):
+    return compare(self, other) {operator} 0
+"""
+"""デコレータで指定した関数を直接呼び出す比較演算子のテンプレート."""
+
+_KEY_TEMPLATE = """
+def {name}(self, other):
+    if not isinstance(other, target_class):
+        return NotImplemented
+    return self.{key}{call} {operator} other.{key}{call}
+"""
+"""key の値を直接比較する比較演算子のテンプレート."""
+
+_KEY_HASH_TEMPLATE = """
+def __hash__(self):
+    return hash(self.{key}{call})
+"""
 
 
 class Comparable(type):
     """
         大小比較する compare メソッドから比較演算子を自動生成するメタクラス.
+
+        key を指定した場合は, compare メソッドではなく key が返す値を比較する.
+
+            class Version(metaclass=Comparable, key="sort_key"):
+                ...
     """
 
-    def __new__(self, name, bases, namespace, **kwargs):
-        Comparable.define_compare_methods(namespace)
-        return super(Comparable, self).__new__(self, name, bases, namespace, **kwargs)
+    def __new__(self, name, bases, namespace, key=None, **kwargs):
+        if key is None:
+            key = next((base.__compare_key__ for base in bases if hasattr(base, "__compare_key__")), None)
+        if key is None:
+            Comparable.define_compare_methods(namespace)
+        target_class = super(Comparable, self).__new__(self, name, bases, namespace, **kwargs)
+        if key is not None:
+            _define_key_methods(target_class, key)
+        return target_class
 
     @staticmethod
     def define_compare_methods(namespace):
-        namespace["__eq__"] = lambda self, other: self.compare(other) == 0
-        namespace["__ne__"] = lambda self, other: self.compare(other) != 0
-        namespace["__lt__"] = lambda self, other: self.compare(other) < 0
-        namespace["__le__"] = lambda self, other: self.compare(other) <= 0
-        namespace["__gt__"] = lambda self, other: self.compare(other) > 0
-        namespace["__ge__"] = lambda self, other: self.compare(other) >= 0
+        qualname = namespace.get("__qualname__", "")
+        namespace.update(_generate_methods(qualname, _METHOD_COMPARE_TEMPLATE, {}))
 
 
-def comparable(target="compare"):
+def comparable(target="compare", *, key=None):
     """
         大小比較するメソッドから比較演算子を自動生成するデコレータ.
+
+        key に属性またはメソッドの名前を指定した場合は, その値を比較する比較演算子と __hash__ を生成する.
+        key の値は比較のたびに取得するため, 事前に計算しておく.
+
+            @comparable(key="_sort_key")
+            class Version(object):
+                ...
     """
 
-    def define_compare_methods(target_class, compare):
-        target_class.__eq__ = lambda self, other: compare(self, other) == 0
-        target_class.__ne__ = lambda self, other: compare(self, other) != 0
-        target_class.__lt__ = lambda self, other: compare(self, other) < 0
-        target_class.__le__ = lambda self, other: compare(self, other) <= 0
-        target_class.__gt__ = lambda self, other: compare(self, other) > 0
-        target_class.__ge__ = lambda self, other: compare(self, other) >= 0
+    def define_compare_methods(target_class, template, variables):
+        for name, method in _generate_methods(target_class.__qualname__, template, variables).items():
+            setattr(target_class, name, method)
 
-    if isinstance(target, str):
+    if key is not None:
+        def wrapper(target_class):
+            _define_key_methods(target_class, key)
+            return target_class
+        return wrapper
+    elif isinstance(target, str):
         def wrapper(target_class):
             compare = target_class.__dict__[target]
-            define_compare_methods(target_class, compare)
+            define_compare_methods(target_class, _FUNCTION_COMPARE_TEMPLATE, {"compare": compare})
             return target_class
         return wrapper
     else:
-        compare = lambda self, other: self.compare(other)
-        define_compare_methods(target, compare)
+        define_compare_methods(target, _METHOD_COMPARE_TEMPLATE, {})
         return target
 
+
+def sort_key(target_class):
+    """
+        key を指定して比較演算子を生成したクラスのインスタンスから, key の値を取得する関数を返す.
+
+        sorted(versions, key=sort_key(Version)) のように使うと, 比較演算子を呼び出さずにソートできる.
+    """
+    try:
+        key = target_class.__compare_key__
+    except AttributeError:
+        raise TypeError("Comparison key is not declared", target_class)
+    if _is_key_method(target_class, key):
+        return operator.methodcaller(key)
+    else:
+        return operator.attrgetter(key)
+
+
+def _define_key_methods(target_class, key):
+    if not key.isidentifier():
+        raise ValueError("Invalid comparison key", key)
+
+    fields = {"key": key, "call": "()" if _is_key_method(target_class, key) else ""}
+    methods = _generate_methods(
+        target_class.__qualname__,
+        _KEY_TEMPLATE,
+        {"target_class": target_class},
+        **fields)
+    methods["__hash__"] = _generate_method(
+        target_class.__qualname__,
+        "__hash__",
+        _KEY_HASH_TEMPLATE.format(**fields),
+        {})
+    for name, method in methods.items():
+        setattr(target_class, name, method)
+    target_class.__compare_key__ = key
+
+
+def _is_key_method(target_class, key):
+    # 属性 (スロットやプロパティを含む) は呼び出し不可能, メソッドは呼び出し可能.
+    # インスタンスの属性はクラスに存在しない.
+    return callable(getattr(target_class, key, None))
+
+
+def _generate_methods(qualname, template, variables, **fields):
+    """
+        テンプレートから比較演算子を生成する.
+
+        クラスごとにソースコードを生成してコンパイルするため, 比較演算子は compare や key を
+        ラムダ式などを経由せずに直接呼び出す, または参照する.
+
+        Arguments
+        ---------
+        qualname : str
+            比較演算子を定義するクラスの __qualname__.
+        template : str
+            比較演算子のソースコードのテンプレート. {name} と {operator} を置き換える.
+        variables : dict
+            比較演算子から参照する変数.
+        fields : dict
+            テンプレートで置き換える値.
+
+        Returns
+        -------
+        methods : dict(str, function)
+            比較演算子の名前と比較演算子.
+    """
+    methods = {}
+    for name, symbol in _OPERATORS.items():
+        source = template.format(name=name, operator=symbol, **fields)
+        methods[name] = _generate_method(qualname, name, source, variables)
+    return methods
+
+
+def _generate_method(qualname, name, source, variables):
+    namespace = dict(variables)
+    exec(compile(source, "<comparable {}.{}>".format(qualname, name), "exec"), namespace)
+    method = namespace[name]
+    method.__qualname__ = "{}.{}".format(qualname, name) if qualname else name
+    return method
@@ -1,8 +1,74 @@
 import os
+import collections
 import functools
+import threading
+import time
 
 
-def generate_paths(root_path):
+DEFAULT_MAX_QUEUE_SIZE = 64
+"""並列にスキャンする場合に, 消費されずに保持するディレクトリの数の既定値."""
+
+_DONE = object()
+"""ワーカースレッドの終了を表す値."""
+
+_FILE_INDEX_FORMAT_VERSION = 2
+"""FileIndex が保存するファイルの形式のバージョン."""
+
+RACY_INTERVAL_NS = 2 * 10 ** 9
+"""
+    スキャン開始時刻からこの時間 (ナノ秒) 以内に更新されたディレクトリは,
+    同じ時刻のうちに再び更新される可能性があるため, 次回のスキャンでも読み込み直す.
+"""
+
+DEFAULT_BATCH_SIZE = 16
+"""非同期にスキャンする場合に, 1 回の依頼で読み込むディレクトリの数の既定値."""
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+"""ファイルをチャンクごとに読み込む場合のチャンクのサイズの既定値."""
+
+DEFAULT_BLOCK_SIZE = 4096
+"""重複するファイルを探す場合に, 先頭と末尾で比較するブロックのサイズの既定値."""
+
+DEFAULT_HASH_ALGORITHM = "blake2b"
+"""ファイルの内容のハッシュ値を求めるアルゴリズムの既定値."""
+
+_MMAP_THRESHOLD = 16 * 1024 * 1024
+"""このサイズ以上のファイルは mmap してハッシュ値を求める."""
+
+_READ_BUFFER_SIZE = 1024 * 1024
+"""ファイルを読み込むバッファのサイズ."""
+
+_thread_local = threading.local()
+"""スレッドごとの読み込み用のバッファを保持する."""
+
+DEFAULT_SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+"""ファイルの行を並列に処理する場合に, 1 つのワーカーが処理する範囲のサイズの既定値."""
+
+LineMatch = collections.namedtuple("LineMatch", ["offset", "line"])
+"""ファイル中の行. offset は行頭の位置 (バイト), line は改行を含まない行の内容 (bytes)."""
+
+DEFAULT_MIN_POLL_INTERVAL = 0.01
+"""ファイルの追記をポーリングする間隔の最小値 (秒) の既定値."""
+
+DEFAULT_MAX_POLL_INTERVAL = 1.0
+"""ファイルの追記をポーリングする間隔の最大値 (秒) の既定値."""
+
+FollowedLine = collections.namedtuple("FollowedLine", ["line", "end_offset"])
+"""
+    ファイルに追記された行. line は改行を含まない行の内容 (bytes),
+    end_offset は行末の改行の直後の位置 (バイト).
+"""
+
+FileIndexEntry = collections.namedtuple(
+    "FileIndexEntry", ["path", "inode", "size", "mtime_ns"])
+"""FileIndex に記録したファイルの情報."""
+
+FileIndexChanges = collections.namedtuple(
+    "FileIndexChanges", ["added", "modified", "removed"])
+"""FileIndex の前回のスキャンからの変更. 各要素は FileIndexEntry の list."""
+
+
+def generate_paths(root_path, *, include=None, exclude=None):
     """
         ファイル/ディレクトリのパスを生成する.
 
@@ -10,6 +76,10 @@ def generate_paths(root_path):
         ---------
         root_path : str
             スキャンを開始するディレクトリのパス.
+        include : PathPatterns|iterable(str)|None
+            結果に含めるパスのパターン. None の場合は全てのパスを含める.
+        exclude : PathPatterns|iterable(str)|None
+            除外するパスのパターン. 除外したディレクトリの配下はスキャンしない.
 
         Yields
         ------
@@ -19,10 +89,12 @@ def generate_paths(root_path):
     yield from _generate_paths(
         root_path,
         include_files=True,
-        include_directories=True)
+        include_directories=True,
+        include=include,
+        exclude=exclude)
 
 
-def generate_file_paths(root_path):
+def generate_file_paths(root_path, *, include=None, exclude=None):
     """
         ファイルのパスを生成する.
 
@@ -30,6 +102,8 @@ def generate_file_paths(root_path):
         ---------
         root_path : str
             スキャンを開始するディレクトリのパス.
+        include, exclude
+            generate_paths を参照.
 
         Yields
         ------
@@ -39,10 +113,12 @@ def generate_file_paths(root_path):
     yield from _generate_paths(
         root_path,
         include_files=True,
-        include_directories=False)
+        include_directories=False,
+        include=include,
+        exclude=exclude)
 
 
-def generate_directory_paths(root_path):
+def generate_directory_paths(root_path, *, include=None, exclude=None):
     """
         ディレクトリのパスを生成する.
 
@@ -50,6 +126,8 @@ def generate_directory_paths(root_path):
         ---------
         root_path : str
             スキャンを開始するディレクトリのパス.
+        include, exclude
+            generate_paths を参照.
 
         Yields
         ------
@@ -59,10 +137,18 @@ def generate_directory_paths(root_path):
     yield from _generate_paths(
         root_path,
         include_files=False,
-        include_directories=True)
+        include_directories=True,
+        include=include,
+        exclude=exclude)
 
 
-def _generate_paths(root_path, *, include_files=True, include_directories=True):
+def _generate_paths(
+        root_path,
+        *,
+        include_files=True,
+        include_directories=True,
+        include=None,
+        exclude=None):
     """
         ファイルやディレクトリのパスを生成する.
 
@@ -74,16 +160,2004 @@ def _generate_paths(root_path, *, include_files=True, include_directories=True):
             結果にファイルのパスを含める場合は True を指定する.
         include_directories : bool
             結果にディレクトリのパスを含める場合は True を指定する.
+        include, exclude
+            generate_paths を参照.
+
+        Yields
+        ------
+        path : str
+            ファイルまたはディレクトリのパス.
+    """
+    prune, select = _path_filters(
+        root_path, include_files, include_directories, include, exclude)
+
+    for entry in generate_entries(root_path, prune=prune):
+        if select(entry):
+            yield entry.path
+
+
+def _path_filters(root_path, include_files, include_directories, include, exclude):
+    """
+        スキャンするディレクトリと結果に含めるエントリを判定する関数を生成する.
+
+        Arguments
+        ---------
+        root_path, include_files, include_directories, include, exclude
+            _generate_paths を参照.
+
+        Returns
+        -------
+        prune : callable|None
+            配下をスキャンしないディレクトリの os.DirEntry に対して True を返す関数.
+        select : callable
+            結果に含める os.DirEntry に対して True を返す関数.
+    """
+    include = _to_path_patterns(include)
+    exclude = _to_path_patterns(exclude)
+    to_relative_path = functools.partial(_to_relative_path, len(os.path.join(root_path, "")))
+
+    prune = None
+    if exclude is not None:
+        prune = lambda entry: exclude.match(to_relative_path(entry.path), is_directory=True)
+
+    def select(entry):
+        is_directory = entry.is_dir()
+        if not (include_directories if is_directory else include_files):
+            return False
+        if include is None and exclude is None:
+            return True
+        relative_path = to_relative_path(entry.path)
+        if exclude is not None and exclude.match(relative_path, is_directory=is_directory):
+            return False
+        if include is not None and not include.match(relative_path, is_directory=is_directory):
+            return False
+        return True
+
+    return prune, select
+
+
+def _to_relative_path(prefix_length, path):
+    """
+        スキャンを開始したディレクトリからの相対パスに変換する.
+
+        Arguments
+        ---------
+        prefix_length : int
+            スキャンを開始したディレクトリのパス (末尾の区切り文字を含む) の長さ.
+        path : str
+            変換するパス.
+
+        Returns
+        -------
+        relative_path : str
+            "/" で区切られた相対パス.
+    """
+    relative_path = path[prefix_length:]
+    if os.sep != "/":
+        relative_path = relative_path.replace(os.sep, "/")
+    return relative_path
+
+
+def _to_path_patterns(patterns):
+    """
+        パターンを PathPatterns に変換する.
+
+        Arguments
+        ---------
+        patterns : PathPatterns|iterable(str)|None
+            変換するパターン.
+
+        Returns
+        -------
+        patterns : PathPatterns|None
+            変換したパターン. patterns が None の場合は None.
+    """
+    if patterns is None or isinstance(patterns, PathPatterns):
+        return patterns
+    return PathPatterns(patterns)
+
+
+class PathPatterns(object):
+    """
+        .gitignore と同じ形式のパターンの集合.
+
+        全てのパターンを 1 つの正規表現にまとめてコンパイルするため,
+        パスの数やパターンの数によらず 1 回の照合で判定できる.
+
+        パターンの形式
+        --------------
+        * 空行と "#" で始まる行は無視する.
+        * "!" で始まるパターンは, それより前のパターンで一致したパスを除外する.
+        * "/" で終わるパターンはディレクトリにのみ一致する.
+        * 先頭または途中に "/" を含むパターンはルートからの相対パスに一致する.
+          それ以外のパターンは任意の深さのファイル名/ディレクトリ名に一致する.
+        * "*" と "?" と "[...]" は "/" 以外の文字に一致する.
+        * "**/" と "/**" と "/**/" は 0 個以上のディレクトリに一致する.
+
+        Examples
+        --------
+
+            patterns = PathPatterns(["__pycache__/", "*.py[cod]", "!keep.pyc"])
+            patterns.match("__pycache__", is_directory=True) # => True
+            patterns.match("a/b.pyc")                        # => True
+            patterns.match("a/keep.pyc")                     # => False
+    """
+
+    __slots__ = ("_file_matcher", "_directory_matcher")
+
+    def __init__(self, patterns):
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            patterns : iterable(str)
+                パターン. .gitignore の各行と同じ形式.
+        """
+        compiled_patterns = list(filter(None, map(_compile_path_pattern, patterns)))
+        self._file_matcher = _PathMatcher(
+            [pattern for pattern in compiled_patterns if not pattern[2]])
+        self._directory_matcher = _PathMatcher(compiled_patterns)
+
+    def match(self, path, is_directory=False):
+        """
+            パスがパターンに一致するか判定する.
+
+            親ディレクトリが一致するかどうかは判定しない.
+
+            Arguments
+            ---------
+            path : str
+                ルートからの相対パス. "/" で区切る.
+            is_directory : bool
+                path がディレクトリの場合は True.
+
+            Returns
+            -------
+            bool
+                最後に一致したパターンが "!" で始まらない場合は True.
+        """
+        if is_directory:
+            return self._directory_matcher.match(path)
+        else:
+            return self._file_matcher.match(path)
+
+
+class _PathMatcher(object):
+    """
+        コンパイルしたパターンの集合.
+    """
+
+    __slots__ = ("_fullmatch", "_negated")
+
+    def __init__(self, compiled_patterns):
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            compiled_patterns : list(tuple(str, bool, bool))
+                正規表現, 否定するパターンかどうか, ディレクトリのみに一致するかどうか.
+        """
+        import re
+        # 後に記述したパターンが優先されるため, 逆順に並べて最初に一致したものを採用する.
+        compiled_patterns = compiled_patterns[::-1]
+        if compiled_patterns:
+            regex = "|".join("({})".format(pattern[0]) for pattern in compiled_patterns)
+            self._fullmatch = re.compile(regex, re.DOTALL).fullmatch
+        else:
+            self._fullmatch = lambda path: None
+        self._negated = (None, ) + tuple(pattern[1] for pattern in compiled_patterns)
+
+    def match(self, path):
+        """
+            パスがパターンに一致するか判定する.
+
+            Arguments
+            ---------
+            path : str
+                ルートからの相対パス.
+
+            Returns
+            -------
+            bool
+                最後に一致したパターンが否定するパターンではない場合は True.
+        """
+        matched = self._fullmatch(path)
+        return matched is not None and not self._negated[matched.lastindex]
+
+
+def _compile_path_pattern(pattern):
+    """
+        .gitignore 形式のパターンを正規表現に変換する.
+
+        Arguments
+        ---------
+        pattern : str
+            .gitignore 形式のパターン.
+
+        Returns
+        -------
+        compiled_pattern : tuple(str, bool, bool)|None
+            正規表現, 否定するパターンかどうか, ディレクトリのみに一致するかどうか.
+            空行やコメントの場合は None.
+    """
+    import re
+    pattern = pattern.rstrip("\n")
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+    if not pattern or pattern.startswith("#"):
+        return None
+
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+        pattern = pattern[1:]
+
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    regex = []
+    if not anchored:
+        regex.append("(?:.*/)?")
+
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == n and (i == 0 or pattern[i - 1] == "/"):
+            regex.append(".*")
+            i += 2
+        elif c == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif c == "?":
+            regex.append("[^/]")
+            i += 1
+        elif c == "[":
+            # "[!...]" と "[^...]" は否定. 直後の "]" は文字として扱う.
+            j = i + 1
+            negated_class = pattern[j:j + 1] in ("!", "^")
+            if negated_class:
+                j += 1
+            if pattern[j:j + 1] == "]":
+                j += 1
+            j = pattern.find("]", j)
+            if j < 0:
+                regex.append(re.escape(c))
+                i += 1
+                continue
+            content = pattern[i + 2 if negated_class else i + 1:j]
+            content = re.sub(r"([\\\[\]&~|^])", r"\\\1", content)
+            regex.append("[^/{}]".format(content) if negated_class else "[{}]".format(content))
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(c))
+            i += 1
+
+    return ("".join(regex), negated, directory_only)
+
+
+def generate_entries(
+        root_path,
+        *,
+        prune=None,
+        max_depth=None,
+        follow_symlinks=False,
+        onerror=None):
+    """
+        ファイル/ディレクトリの os.DirEntry を生成する.
+
+        os.DirEntry はディレクトリの読み込み時に得られたファイルの種類をキャッシュしており,
+        stat() の結果も初回の呼び出し時にキャッシュする.
+        そのため, 種類の判定やサイズ等の取得のために改めて stat する必要はない.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        prune : callable|None
+            ディレクトリの os.DirEntry を受け取り, その配下をスキャンしない場合に True を返す関数.
+            ディレクトリ自体は結果に含まれる.
+        max_depth : int|None
+            スキャンする深さの上限. root_path 直下の深さを 1 とする.
+            None の場合は制限しない.
+        follow_symlinks : bool
+            True の場合はディレクトリへのシンボリックリンクをたどる.
+            同じディレクトリを 2 回以上スキャンすることはない.
+        onerror : callable|None
+            ディレクトリを読み込めなかった場合に OSError を受け取る関数.
+            None の場合はエラーを無視する.
+
+        Yields
+        ------
+        entry : os.DirEntry
+            ファイルまたはディレクトリの os.DirEntry.
+
+        Raises
+        ------
+        ValueError
+            max_depth が 1 未満の場合.
+    """
+    if max_depth is not None and max_depth < 1:
+        raise ValueError("Invalid max_depth", max_depth)
+
+    scan_directory = functools.partial(
+        _scan_directory,
+        prune=prune,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        visited=_visited_directories(root_path, follow_symlinks),
+        onerror=onerror)
+
+    stack = [(root_path, 1)]
+    while stack:
+        directory_path, depth = stack.pop()
+        entries, subdirectory_paths = scan_directory(directory_path, depth)
+        yield from entries
+        stack.extend((path, depth + 1) for path in reversed(subdirectory_paths))
+
+
+def generate_entries_concurrently(
+        root_path,
+        *,
+        max_workers=None,
+        max_queue_size=DEFAULT_MAX_QUEUE_SIZE,
+        ordered=False,
+        prune=None,
+        max_depth=None,
+        follow_symlinks=False,
+        onerror=None):
+    """
+        複数のスレッドでディレクトリを読み込み, ファイル/ディレクトリの os.DirEntry を生成する.
+
+        ネットワークファイルシステム等, ディレクトリの読み込みの待ち時間が大きい場合に
+        generate_entries より高速にスキャンできる.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        max_workers : int|None
+            ディレクトリを読み込むスレッドの数. None の場合は CPU 数の 4 倍 (最大 32).
+        max_queue_size : int
+            読み込んだが消費されていないディレクトリの数の上限.
+            上限に達するとディレクトリの読み込みを待機する.
+        ordered : bool
+            True の場合はディレクトリ内のエントリを名前順に生成し,
+            ディレクトリを深さ優先の順序で生成する. 結果の順序はスキャンごとに変わらない.
+            False の場合は読み込みが完了した順に生成する.
+        prune, max_depth, follow_symlinks, onerror
+            generate_entries を参照.
+            prune と onerror は複数のスレッドから呼び出される.
+
+        Yields
+        ------
+        entry : os.DirEntry
+            ファイルまたはディレクトリの os.DirEntry.
+
+        Raises
+        ------
+        ValueError
+            max_workers, max_queue_size, max_depth が 1 未満の場合.
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    if max_workers < 1:
+        raise ValueError("Invalid max_workers", max_workers)
+    if max_queue_size < 1:
+        raise ValueError("Invalid max_queue_size", max_queue_size)
+    if max_depth is not None and max_depth < 1:
+        raise ValueError("Invalid max_depth", max_depth)
+
+    scan_directory = functools.partial(
+        _scan_directory,
+        prune=prune,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        visited=_visited_directories(root_path, follow_symlinks),
+        onerror=onerror)
+
+    if ordered:
+        yield from _generate_entries_in_order(
+            root_path, scan_directory, max_workers, max_queue_size)
+    else:
+        yield from _generate_entries_as_scanned(
+            root_path, scan_directory, max_workers, max_queue_size)
+
+
+def _generate_entries_in_order(root_path, scan_directory, max_workers, max_queue_size):
+    """
+        スレッドプールでディレクトリを先読みし, 決まった順序で os.DirEntry を生成する.
+
+        次に生成するディレクトリから順に, 最大 max_queue_size 個のディレクトリを先読みする.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        scan_directory : callable
+            ディレクトリのパスと深さを受け取り, _scan_directory の結果を返す関数.
+        max_workers : int
+            ディレクトリを読み込むスレッドの数.
+        max_queue_size : int
+            先読みするディレクトリの数の上限.
+
+        Yields
+        ------
+        entry : os.DirEntry
+            ファイルまたはディレクトリの os.DirEntry.
+    """
+    import concurrent.futures
+    get_name = lambda entry: entry.name
+
+    # 各要素は [ディレクトリのパス, 深さ, 先読みの Future または None].
+    stack = [[root_path, 1, None]]
+    prefetched = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        try:
+            while stack:
+                directory_path, depth, future = stack.pop()
+                if future is None:
+                    future = executor.submit(scan_directory, directory_path, depth)
+                else:
+                    prefetched -= 1
+
+                entries, subdirectory_paths = future.result()
+                entries.sort(key=get_name)
+                subdirectory_paths.sort(reverse=True)
+                yield from entries
+                stack.extend([path, depth + 1, None] for path in subdirectory_paths)
+
+                for task in reversed(stack):
+                    if prefetched >= max_queue_size:
+                        break
+                    if task[2] is None:
+                        task[2] = executor.submit(scan_directory, task[0], task[1])
+                        prefetched += 1
+        finally:
+            for _, _, future in stack:
+                if future is not None:
+                    future.cancel()
+
+
+def _generate_entries_as_scanned(root_path, scan_directory, max_workers, max_queue_size):
+    """
+        ワークスティーリングするスレッド群でディレクトリを読み込み, 読み込んだ順に os.DirEntry を生成する.
+
+        各スレッドは自身の deque の末尾からディレクトリを取り出して深さ優先に読み込み,
+        自身の deque が空になると他のスレッドの deque の先頭 (浅いディレクトリ) から奪う.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        scan_directory : callable
+            ディレクトリのパスと深さを受け取り, _scan_directory の結果を返す関数.
+        max_workers : int
+            ディレクトリを読み込むスレッドの数.
+        max_queue_size : int
+            読み込んだが消費されていないディレクトリの数の上限.
+
+        Yields
+        ------
+        entry : os.DirEntry
+            ファイルまたはディレクトリの os.DirEntry.
+    """
+    import queue
+    results = queue.Queue(max_queue_size)
+    stopped = threading.Event()
+    condition = threading.Condition()
+    deques = [collections.deque() for _ in range(max_workers)]
+    deques[0].append((root_path, 1))
+    # 読み込み待ちまたは読み込み中のディレクトリの数.
+    remaining = [1]
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def take(index):
+        while True:
+            task = _pop_or_steal(deques, index)
+            if task is not None:
+                return task
+            # deque への追加はロックを取得して行うので, ここで待機しても通知を取りこぼさない.
+            with condition:
+                task = _pop_or_steal(deques, index)
+                if task is not None:
+                    return task
+                if remaining[0] == 0 or stopped.is_set():
+                    return None
+                condition.wait()
+
+    def work(index):
+        try:
+            while True:
+                task = take(index)
+                if task is None:
+                    return
+                directory_path, depth = task
+                entries, subdirectory_paths = scan_directory(directory_path, depth)
+                with condition:
+                    deques[index].extend((path, depth + 1) for path in subdirectory_paths)
+                    remaining[0] += len(subdirectory_paths) - 1
+                    if subdirectory_paths or remaining[0] == 0:
+                        condition.notify_all()
+                if entries:
+                    put(entries)
+        except BaseException as error:
+            put(error)
+        finally:
+            put(_DONE)
+
+    threads = [
+        threading.Thread(target=work, args=(index, ), daemon=True)
+        for index in range(max_workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        finished = 0
+        while finished < max_workers:
+            item = results.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield from item
+    finally:
+        stopped.set()
+        with condition:
+            condition.notify_all()
+        for thread in threads:
+            thread.join()
+
+
+def _pop_or_steal(deques, index):
+    """
+        自身の deque の末尾からタスクを取り出す. 空の場合は他の deque の先頭から奪う.
+
+        Arguments
+        ---------
+        deques : list(collections.deque)
+            スレッドごとのタスクの deque.
+        index : int
+            自身の deque のインデックス.
+
+        Returns
+        -------
+        task : tuple(str, int)|None
+            ディレクトリのパスと深さ. タスクがない場合は None.
+    """
+    try:
+        return deques[index].pop()
+    except IndexError:
+        pass
+    for offset in range(1, len(deques)):
+        try:
+            return deques[(index + offset) % len(deques)].popleft()
+        except IndexError:
+            pass
+    return None
+
+
+def _visited_directories(root_path, follow_symlinks):
+    """
+        スキャン済みのディレクトリを記録する dict を生成する.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        follow_symlinks : bool
+            シンボリックリンクをたどる場合は True.
+
+        Returns
+        -------
+        visited : dict|None
+            (st_dev, st_ino) をキーとする dict.
+            シンボリックリンクをたどらない場合はループしないため None.
+    """
+    if not follow_symlinks:
+        return None
+    try:
+        stat = os.stat(root_path)
+    except OSError:
+        return {}
+    return {(stat.st_dev, stat.st_ino): root_path}
+
+
+def _scan_directory(
+        directory_path,
+        depth,
+        *,
+        prune,
+        max_depth,
+        follow_symlinks,
+        visited,
+        onerror):
+    """
+        ディレクトリを読み込み, その配下のエントリと次にスキャンするディレクトリを返す.
+
+        Arguments
+        ---------
+        directory_path : str
+            読み込むディレクトリのパス.
+        depth : int
+            読み込むディレクトリ直下の深さ.
+        visited : dict|None
+            スキャン済みのディレクトリを記録する dict.
+        prune, max_depth, follow_symlinks, onerror
+            generate_entries を参照.
+
+        Returns
+        -------
+        entries : list(os.DirEntry)
+            ディレクトリ直下のエントリ.
+        subdirectory_paths : list(str)
+            次にスキャンするディレクトリのパス.
+    """
+    entries = []
+    subdirectory_paths = []
+    descend = max_depth is None or depth < max_depth
+
+    try:
+        with os.scandir(directory_path) as iterator:
+            for entry in iterator:
+                entries.append(entry)
+                if descend and _should_descend(entry, prune, follow_symlinks, visited):
+                    subdirectory_paths.append(entry.path)
+    except OSError as error:
+        if onerror is not None:
+            onerror(error)
+
+    return entries, subdirectory_paths
+
+
+def _should_descend(entry, prune, follow_symlinks, visited):
+    """
+        エントリの配下をスキャンするかどうかを判定する.
+
+        Arguments
+        ---------
+        entry : os.DirEntry
+            判定するエントリ.
+        prune, follow_symlinks
+            generate_entries を参照.
+        visited : dict|None
+            スキャン済みのディレクトリを記録する dict.
+
+        Returns
+        -------
+        bool
+            エントリの配下をスキャンする場合は True.
+    """
+    try:
+        if not entry.is_dir(follow_symlinks=follow_symlinks):
+            return False
+        if prune is not None and prune(entry):
+            return False
+        if visited is None:
+            return True
+        stat = entry.stat()
+    except OSError:
+        return False
+
+    # setdefault はアトミックなので, 複数のスレッドから呼び出されても 1 度しか True にならない.
+    path = entry.path
+    return visited.setdefault((stat.st_dev, stat.st_ino), path) is path
+
+
+async def generate_paths_async(
+        root_path,
+        *,
+        include=None,
+        exclude=None,
+        executor=None,
+        max_pending=DEFAULT_MAX_QUEUE_SIZE,
+        batch_size=DEFAULT_BATCH_SIZE):
+    """
+        ファイル/ディレクトリのパスを非同期に生成する.
+
+        ディレクトリの読み込みは executor で行うため, イベントループをブロックしない.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        include, exclude
+            generate_paths を参照.
+        executor : concurrent.futures.Executor|None
+            ディレクトリを読み込む Executor. None の場合はイベントループの既定の Executor.
+        max_pending : int
+            同時に読み込みを依頼するバッチの数の上限.
+        batch_size : int
+            1 回の依頼で読み込むディレクトリの数の上限.
 
         Yields
         ------
         path : str
             ファイルまたはディレクトリのパス.
     """
-    for directory_path, directory_names, file_names in os.walk(root_path):
-        join = functools.partial(os.path.join, directory_path)
-        if include_files:
-            yield from map(join, file_names)
-        if include_directories:
-            yield from map(join, directory_names)
+    async for path in _generate_paths_async(
+            root_path,
+            include_files=True,
+            include_directories=True,
+            include=include,
+            exclude=exclude,
+            executor=executor,
+            max_pending=max_pending,
+            batch_size=batch_size):
+        yield path
+
+
+async def generate_file_paths_async(
+        root_path,
+        *,
+        include=None,
+        exclude=None,
+        executor=None,
+        max_pending=DEFAULT_MAX_QUEUE_SIZE,
+        batch_size=DEFAULT_BATCH_SIZE):
+    """
+        ファイルのパスを非同期に生成する.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        include, exclude, executor, max_pending, batch_size
+            generate_paths_async を参照.
+
+        Yields
+        ------
+        file_path : str
+            ファイルのパス.
+    """
+    async for path in _generate_paths_async(
+            root_path,
+            include_files=True,
+            include_directories=False,
+            include=include,
+            exclude=exclude,
+            executor=executor,
+            max_pending=max_pending,
+            batch_size=batch_size):
+        yield path
+
+
+async def generate_directory_paths_async(
+        root_path,
+        *,
+        include=None,
+        exclude=None,
+        executor=None,
+        max_pending=DEFAULT_MAX_QUEUE_SIZE,
+        batch_size=DEFAULT_BATCH_SIZE):
+    """
+        ディレクトリのパスを非同期に生成する.
+
+        Arguments
+        ---------
+        root_path : str
+            スキャンを開始するディレクトリのパス.
+        include, exclude, executor, max_pending, batch_size
+            generate_paths_async を参照.
+
+        Yields
+        ------
+        directory_path : str
+            ディレクトリのパス.
+    """
+    async for path in _generate_paths_async(
+            root_path,
+            include_files=False,
+            include_directories=True,
+            include=include,
+            exclude=exclude,
+            executor=executor,
+            max_pending=max_pending,
+            batch_size=batch_size):
+        yield path
+
+
+async def _generate_paths_async(
+        root_path,
+        *,
+        include_files,
+        include_directories,
+        include,
+        exclude,
+        executor,
+        max_pending,
+        batch_size):
+    """
+        ファイルやディレクトリのパスを非同期に生成する.
+
+        Arguments
+        ---------
+        root_path, include_files, include_directories, include, exclude
+            _generate_paths を参照.
+        executor, max_pending, batch_size
+            generate_paths_async を参照.
+
+        Yields
+        ------
+        path : str
+            ファイルまたはディレクトリのパス.
 
+        Raises
+        ------
+        ValueError
+            max_pending, batch_size が 1 未満の場合.
+    """
+    import asyncio
+    if max_pending < 1:
+        raise ValueError("Invalid max_pending", max_pending)
+    if batch_size < 1:
+        raise ValueError("Invalid batch_size", batch_size)
+
+    prune, select = _path_filters(
+        root_path, include_files, include_directories, include, exclude)
+    scan_directories = functools.partial(_scan_directories, prune=prune)
+
+    loop = asyncio.get_running_loop()
+    waiting = collections.deque([root_path])
+    pending = set()
+    try:
+        while waiting or pending:
+            while waiting and len(pending) < max_pending:
+                # 待機中のディレクトリを空いている依頼の数で分け合う.
+                size = -(-len(waiting) // (max_pending - len(pending)))
+                batch = [waiting.popleft() for _ in range(min(size, batch_size))]
+                pending.add(loop.run_in_executor(executor, scan_directories, batch))
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                entries, subdirectory_paths = future.result()
+                waiting.extend(subdirectory_paths)
+                for entry in entries:
+                    if select(entry):
+                        yield entry.path
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _scan_directories(directory_paths, *, prune):
+    """
+        複数のディレクトリを読み込み, その配下のエントリと次にスキャンするディレクトリを返す.
+
+        Arguments
+        ---------
+        directory_paths : list(str)
+            読み込むディレクトリのパス.
+        prune : callable|None
+            generate_entries を参照.
+
+        Returns
+        -------
+        entries : list(os.DirEntry)
+            ディレクトリ直下のエントリ.
+        subdirectory_paths : list(str)
+            次にスキャンするディレクトリのパス.
+    """
+    entries = []
+    subdirectory_paths = []
+    for directory_path in directory_paths:
+        directory_entries, directory_subdirectory_paths = _scan_directory(
+            directory_path,
+            1,
+            prune=prune,
+            max_depth=None,
+            follow_symlinks=False,
+            visited=None,
+            onerror=None)
+        entries.extend(directory_entries)
+        subdirectory_paths.extend(directory_subdirectory_paths)
+    return entries, subdirectory_paths
+
+
+async def read_chunks_async(file_path, *, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """
+        ファイルを非同期にチャンクごとに読み込む.
+
+        次のチャンクは, 生成したチャンクが処理されている間に先読みする.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        chunk_size : int
+            チャンクのサイズ (バイト).
+        executor : concurrent.futures.Executor|None
+            ファイルを読み込む Executor. None の場合はイベントループの既定の Executor.
+
+        Yields
+        ------
+        chunk : bytes
+            ファイルの内容. 最後のチャンクは chunk_size より小さい場合がある.
+
+        Raises
+        ------
+        ValueError
+            chunk_size が 1 未満の場合.
+    """
+    import asyncio
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk_size", chunk_size)
+
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(executor, functools.partial(open, file_path, "rb", buffering=0))
+    read = functools.partial(loop.run_in_executor, executor, file.read, chunk_size)
+    future = None
+    try:
+        future = read()
+        while True:
+            chunk = await future
+            future = None
+            if not chunk:
+                return
+            future = read()
+            yield chunk
+    finally:
+        # 先読み中にファイルを閉じないように, 先読みの完了を待つ.
+        if future is not None:
+            await asyncio.gather(future, return_exceptions=True)
+        await loop.run_in_executor(executor, file.close)
+
+
+def grep_file(
+        file_path,
+        pattern,
+        *,
+        chunk_size=DEFAULT_SCAN_CHUNK_SIZE,
+        max_workers=None,
+        use_threads=False):
+    """
+        正規表現に一致する行をファイルから探す.
+
+        ファイルを mmap して行の境界で範囲に分割し, 範囲ごとに並列に正規表現で検索する.
+        正規表現は範囲全体に対して bytes のまま適用するため, 一致しない行は切り出しもデコードもしない.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        pattern : str|bytes|re.Pattern
+            正規表現. re.MULTILINE を指定してコンパイルするため, "^" と "$" は行頭と行末に一致する.
+            str の場合は UTF-8 でエンコードした bytes として扱う.
+        chunk_size : int
+            1 つの範囲のサイズの目安 (バイト).
+        max_workers : int|None
+            検索するプロセスの数. None の場合は CPU 数.
+        use_threads : bool
+            True の場合はプロセスではなくスレッドで検索する.
+
+        Yields
+        ------
+        line_match : LineMatch
+            一致した行. offset の順に生成する.
+    """
+    pattern = _to_bytes_pattern(pattern)
+    yield from _scan_file(
+        file_path,
+        functools.partial(_grep_ranges, file_path, pattern),
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+        use_threads=use_threads)
+
+
+def scan_lines(
+        file_path,
+        predicate,
+        *,
+        chunk_size=DEFAULT_SCAN_CHUNK_SIZE,
+        max_workers=None,
+        use_threads=False):
+    """
+        条件を満たす行をファイルから探す.
+
+        grep_file と同じくファイルを範囲に分割して並列に処理する.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        predicate : callable
+            行 (改行を含まない bytes) を受け取り, 条件を満たす場合に True を返す関数.
+            プロセスで実行する場合は pickle 可能である必要がある.
+        chunk_size, max_workers, use_threads
+            grep_file を参照.
+
+        Yields
+        ------
+        line_match : LineMatch
+            条件を満たす行. offset の順に生成する.
+    """
+    yield from _scan_file(
+        file_path,
+        functools.partial(_scan_ranges, file_path, predicate),
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+        use_threads=use_threads)
+
+
+def _scan_file(file_path, scan_ranges, *, chunk_size, max_workers, use_threads):
+    """
+        ファイルを行の境界で範囲に分割し, 範囲ごとに並列に処理する.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        scan_ranges : callable
+            範囲 (開始位置, 終了位置) の tuple を受け取り, LineMatch の list を返す関数.
+        chunk_size, max_workers, use_threads
+            grep_file を参照.
+
+        Yields
+        ------
+        line_match : LineMatch
+            scan_ranges が返した LineMatch. offset の順に生成する.
+    """
+    from utils.parallel import map_chunks
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk_size", chunk_size)
+
+    ranges = _split_lines(file_path, chunk_size)
+    if not ranges:
+        return
+
+    # 範囲が 1 つの場合は, ワーカーを起動するより直接処理する方が速い.
+    if len(ranges) == 1:
+        yield from scan_ranges(tuple(ranges))
+        return
+
+    for line_matches in map_chunks(
+            scan_ranges,
+            ranges,
+            chunk_size=1,
+            max_workers=max_workers,
+            use_threads=use_threads):
+        yield from line_matches
+
+
+def _split_lines(file_path, chunk_size):
+    """
+        ファイルを行の境界で範囲に分割する.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        chunk_size : int
+            1 つの範囲のサイズの目安 (バイト).
+
+        Returns
+        -------
+        ranges : list(tuple(int, int))
+            範囲の開始位置と終了位置. 終了位置は改行の直後またはファイルの末尾.
+    """
+    import mmap
+    ranges = []
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return ranges
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+                end = size if end < 0 else end + 1
+                ranges.append((start, end))
+                start = end
+    return ranges
+
+
+def _grep_ranges(file_path, pattern, ranges):
+    """
+        範囲ごとに正規表現に一致する行を探す.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        pattern : re.Pattern
+            bytes の正規表現.
+        ranges : tuple(tuple(int, int))
+            範囲の開始位置と終了位置.
+
+        Returns
+        -------
+        line_matches : list(LineMatch)
+            一致した行.
+    """
+    import mmap
+    line_matches = []
+    with open(file_path, "rb") as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for start, end in ranges:
+            position = start
+            while position < end:
+                matched = pattern.search(mapped, position, end)
+                # 改行の直後に一致した空の文字列は次の範囲の行 (ファイルの末尾の場合は存在しない行) に属する.
+                # 末尾に改行がない最後の行の行末だけは, 範囲の終了位置に一致してもこの範囲の行とする.
+                if matched is None or matched.start() >= end and mapped[end - 1:end] == b"\n":
+                    break
+                line_start = mapped.rfind(b"\n", start, matched.start())
+                line_start = start if line_start < 0 else line_start + 1
+                line_end = mapped.find(b"\n", matched.start(), end)
+                if line_end < 0:
+                    line_end = end
+                line_matches.append(LineMatch(line_start, mapped[line_start:line_end]))
+                position = line_end + 1
+    return line_matches
+
+
+def _scan_ranges(file_path, predicate, ranges):
+    """
+        範囲ごとに条件を満たす行を探す.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        predicate : callable
+            行を受け取り, 条件を満たす場合に True を返す関数.
+        ranges : tuple(tuple(int, int))
+            範囲の開始位置と終了位置.
+
+        Returns
+        -------
+        line_matches : list(LineMatch)
+            条件を満たす行.
+    """
+    import mmap
+    line_matches = []
+    with open(file_path, "rb") as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for start, end in ranges:
+            offset = start
+            lines = mapped[start:end].split(b"\n")
+            if lines[-1] == b"":
+                lines.pop()
+            for line in lines:
+                if predicate(line):
+                    line_matches.append(LineMatch(offset, line))
+                offset += len(line) + 1
+    return line_matches
+
+
+def _to_bytes_pattern(pattern):
+    """
+        正規表現を bytes の正規表現に変換する.
+
+        Arguments
+        ---------
+        pattern : str|bytes|re.Pattern
+            正規表現.
+
+        Returns
+        -------
+        pattern : re.Pattern
+            re.MULTILINE を指定した bytes の正規表現.
+    """
+    import re
+    if isinstance(pattern, re.Pattern):
+        flags = pattern.flags & ~re.UNICODE
+        pattern = pattern.pattern
+    else:
+        flags = 0
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    return re.compile(pattern, flags | re.MULTILINE)
+
+
+def follow_lines(
+        file_path,
+        *,
+        offset=0,
+        stop=None,
+        block_size=DEFAULT_CHUNK_SIZE,
+        min_interval=DEFAULT_MIN_POLL_INTERVAL,
+        max_interval=DEFAULT_MAX_POLL_INTERVAL,
+        use_inotify=True):
+    """
+        ファイルに追記された行を生成し続ける (tail -F).
+
+        ファイルの末尾に達すると, 追記されるまで inotify で待機する.
+        inotify を使えない場合は, 追記がない間は間隔を倍々に延ばしながらポーリングする.
+        ファイルがローテートされた (別のファイルに置き換えられた) 場合は新しいファイルを先頭から,
+        ファイルが切り詰められた場合は先頭から読み込み直す.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス. 存在しない場合は作成されるまで待機する.
+        offset : int
+            読み込みを開始する位置 (バイト). 前回生成した FollowedLine の end_offset を指定すると,
+            その続きから読み込む. ファイルのサイズより大きい場合は先頭から読み込む.
+        stop : threading.Event|None
+            セットされると生成を終了する Event.
+        block_size : int
+            1 回に読み込むサイズ (バイト).
+        min_interval : float
+            ポーリングの間隔の最小値 (秒).
+        max_interval : float
+            ポーリングの間隔の最大値 (秒). inotify で待機する場合も, この間隔で stop を確認する.
+        use_inotify : bool
+            False の場合は inotify を使わずにポーリングする.
+
+        Yields
+        ------
+        followed_line : FollowedLine
+            追記された行.
+    """
+    if stop is None:
+        stop = threading.Event()
+
+    waiter = None
+    if use_inotify:
+        waiter = _InotifyWaiter.create(file_path, max_interval)
+    if waiter is None:
+        waiter = _PollingWaiter(stop, min_interval, max_interval)
+
+    file = None
+    try:
+        while not stop.is_set():
+            if file is None:
+                file = _open_followed_file(file_path)
+                if file is None:
+                    waiter.wait()
+                    continue
+                position = line_offset = file.seek(offset)
+                pending = b""
+
+            data = file.read(block_size)
+            if data:
+                waiter.reset()
+                position += len(data)
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    line_offset += len(line) + 1
+                    yield FollowedLine(line, line_offset)
+                continue
+
+            if _is_rotated(file_path, file):
+                # ローテートされたファイルの最後の行は改行で終わらない場合がある.
+                if pending:
+                    yield FollowedLine(pending, position)
+                file.close()
+                file = None
+                offset = 0
+            elif os.fstat(file.fileno()).st_size < position:
+                position = line_offset = file.seek(0)
+                pending = b""
+            else:
+                waiter.wait()
+    finally:
+        if file is not None:
+            file.close()
+        waiter.close()
+
+
+def _open_followed_file(file_path):
+    """
+        追記を読み込むファイルを開く.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+
+        Returns
+        -------
+        file : io.FileIO|None
+            開いたファイル. ファイルが存在しない場合は None.
+    """
+    try:
+        return open(file_path, "rb", buffering=0)
+    except FileNotFoundError:
+        return None
+
+
+def _is_rotated(file_path, file):
+    """
+        ファイルがローテートされたか判定する.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        file : io.FileIO
+            開いているファイル.
+
+        Returns
+        -------
+        bool
+            file_path が file とは別のファイルに置き換えられた場合は True.
+            file_path が存在しない場合 (ローテート中) は False.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    opened_stat = os.fstat(file.fileno())
+    return (stat.st_dev, stat.st_ino) != (opened_stat.st_dev, opened_stat.st_ino)
+
+
+class _PollingWaiter(object):
+    """
+        追記がない間は間隔を倍々に延ばしながらポーリングする.
+    """
+
+    def __init__(self, stop, min_interval, max_interval):
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            stop : threading.Event
+                セットされると待機を中断する Event.
+            min_interval : float
+                ポーリングの間隔の最小値 (秒).
+            max_interval : float
+                ポーリングの間隔の最大値 (秒).
+        """
+        self._stop = stop
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min_interval
+
+    def wait(self):
+        """
+            次のポーリングまで待機する.
+        """
+        self._stop.wait(self._interval)
+        self._interval = min(self._interval * 2, self._max_interval)
+
+    def reset(self):
+        """
+            追記があったため, ポーリングの間隔を最小値に戻す.
+        """
+        self._interval = self._min_interval
+
+    def close(self):
+        """
+            何もしない.
+        """
+
+
+class _InotifyWaiter(object):
+    """
+        ファイルを含むディレクトリに変更があるまで inotify で待機する.
+
+        ローテートによる作成や名前の変更も検出するため, ファイルではなくディレクトリを監視する.
+    """
+
+    # <sys/inotify.h>
+    _IN_MODIFY = 0x002
+    _IN_ATTRIB = 0x004
+    _IN_CLOSE_WRITE = 0x008
+    _IN_MOVED_FROM = 0x040
+    _IN_MOVED_TO = 0x080
+    _IN_CREATE = 0x100
+    _IN_DELETE = 0x200
+    _IN_NONBLOCK = os.O_NONBLOCK
+    _IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+    @classmethod
+    def create(cls, file_path, timeout):
+        """
+            inotify で待機するインスタンスを生成する.
+
+            Arguments
+            ---------
+            file_path : str
+                追記を待機するファイルのパス.
+            timeout : float
+                1 回の待機の最大時間 (秒).
+
+            Returns
+            -------
+            waiter : _InotifyWaiter|None
+                生成したインスタンス. inotify を使えない場合は None.
+        """
+        import ctypes
+        import sys
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            descriptor = libc.inotify_init1(cls._IN_NONBLOCK | cls._IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if descriptor < 0:
+            return None
+
+        mask = (
+            cls._IN_MODIFY | cls._IN_ATTRIB | cls._IN_CLOSE_WRITE | cls._IN_MOVED_FROM
+            | cls._IN_MOVED_TO | cls._IN_CREATE | cls._IN_DELETE)
+        directory_path = os.path.dirname(os.path.abspath(file_path))
+        if libc.inotify_add_watch(descriptor, os.fsencode(directory_path), mask) < 0:
+            os.close(descriptor)
+            return None
+        return cls(descriptor, timeout)
+
+    def __init__(self, descriptor, timeout):
+        """
+            インスタンスを初期化する.
+
+            Arguments
+            ---------
+            descriptor : int
+                inotify のファイルディスクリプタ.
+            timeout : float
+                1 回の待機の最大時間 (秒).
+        """
+        self._descriptor = descriptor
+        self._timeout = timeout
+
+    def wait(self):
+        """
+            ディレクトリに変更があるか, タイムアウトするまで待機する.
+        """
+        import select
+        readable, _, _ = select.select([self._descriptor], [], [], self._timeout)
+        if not readable:
+            return
+        # 待機中に溜まったイベントは全て読み捨てる.
+        try:
+            while os.read(self._descriptor, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def reset(self):
+        """
+            何もしない.
+        """
+
+    def close(self):
+        """
+            inotify のファイルディスクリプタを閉じる.
+        """
+        os.close(self._descriptor)
+
+
+class FileIndex(object):
+    """
+        ディレクトリ配下のファイルの情報をファイルに保存し, 前回のスキャンからの変更を求める.
+
+        ディレクトリの mtime はエントリの追加/削除/名前の変更で更新されるため,
+        前回から mtime が変わっていないディレクトリは読み込み直さない.
+
+        Examples
+        --------
+
+            index = FileIndex("src/main", "target/cache/src-main.index")
+            changes = index.scan()
+            for entry in changes.added:
+                print(entry.path)
+    """
+
+    def __init__(self, root_path, index_path):
+        """
+            インスタンスを初期化する.
+            index_path が存在する場合は, 前回のスキャン結果を読み込む.
+
+            Arguments
+            ---------
+            root_path : str
+                スキャンするディレクトリのパス.
+            index_path : str
+                スキャン結果を保存するファイルのパス.
+        """
+        self._root_path = root_path
+        self._index_path = index_path
+        # ルートからの相対パス => (inode, size, mtime_ns)
+        self._files = {}
+        # ルートからの相対パス => (mtime_ns|None, ファイル名の tuple, ディレクトリ名の tuple)
+        self._directories = {}
+        self._load()
+
+    @property
+    def entries(self):
+        """
+            前回のスキャンで記録したファイルの情報.
+
+            Returns
+            -------
+            entries : list(FileIndexEntry)
+                ファイルの情報.
+        """
+        return [
+            self._to_entry(relative_path, record)
+            for relative_path, record in self._files.items()
+        ]
+
+    def scan(self, *, check_files=True):
+        """
+            ディレクトリをスキャンし, 前回のスキャンからの変更を求めて保存する.
+
+            Arguments
+            ---------
+            check_files : bool
+                True の場合は, mtime が変わっていないディレクトリのファイルも stat し,
+                内容の変更 (size, mtime_ns, inode の変更) を検出する.
+                False の場合はファイルの追加と削除のみを検出する.
+
+            Returns
+            -------
+            changes : FileIndexChanges
+                前回のスキャンからの変更.
+        """
+        started_ns = time.time_ns()
+        old_files = self._files
+        files = {}
+        directories = {}
+
+        stack = [""]
+        while stack:
+            relative_path = stack.pop()
+            directory_path = os.path.join(self._root_path, relative_path)
+            try:
+                mtime_ns = os.stat(directory_path).st_mtime_ns
+            except OSError:
+                continue
+
+            old_directory = self._directories.get(relative_path)
+            if old_directory is not None and old_directory[0] == mtime_ns:
+                _, file_names, directory_names = old_directory
+                for file_name in file_names:
+                    file_relative_path = os.path.join(relative_path, file_name)
+                    if check_files:
+                        record = _stat_file(os.path.join(directory_path, file_name))
+                    else:
+                        record = old_files.get(file_relative_path)
+                    if record is not None:
+                        files[file_relative_path] = record
+            else:
+                file_names, directory_names = self._scan_directory(
+                    directory_path, relative_path, files)
+                if mtime_ns >= started_ns - RACY_INTERVAL_NS:
+                    mtime_ns = None
+
+            directories[relative_path] = (mtime_ns, file_names, directory_names)
+            stack.extend(
+                os.path.join(relative_path, directory_name)
+                for directory_name in directory_names)
+
+        added = []
+        modified = []
+        for relative_path, record in files.items():
+            old_record = old_files.get(relative_path)
+            if old_record is None:
+                added.append(self._to_entry(relative_path, record))
+            elif old_record != record:
+                modified.append(self._to_entry(relative_path, record))
+        removed = [
+            self._to_entry(relative_path, record)
+            for relative_path, record in old_files.items()
+            if relative_path not in files
+        ]
+
+        self._files = files
+        self._directories = directories
+        self._save()
+        return FileIndexChanges(added, modified, removed)
+
+    def _scan_directory(self, directory_path, relative_path, files):
+        """
+            ディレクトリを読み込み, 直下のファイルを記録する.
+
+            Arguments
+            ---------
+            directory_path : str
+                読み込むディレクトリのパス.
+            relative_path : str
+                読み込むディレクトリのルートからの相対パス.
+            files : dict
+                ファイルを記録する dict.
+
+            Returns
+            -------
+            file_names : tuple(str)
+                ディレクトリ直下のファイル名.
+            directory_names : tuple(str)
+                ディレクトリ直下のディレクトリ名.
+        """
+        file_names = []
+        directory_names = []
+        try:
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directory_names.append(entry.name)
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    file_names.append(entry.name)
+                    files[os.path.join(relative_path, entry.name)] = (
+                        stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        return tuple(file_names), tuple(directory_names)
+
+    def _to_entry(self, relative_path, record):
+        """
+            記録したファイルの情報を FileIndexEntry に変換する.
+
+            Arguments
+            ---------
+            relative_path : str
+                ファイルのルートからの相対パス.
+            record : tuple(int, int, int)
+                inode, size, mtime_ns.
+
+            Returns
+            -------
+            entry : FileIndexEntry
+                ファイルの情報.
+        """
+        return FileIndexEntry(os.path.join(self._root_path, relative_path), *record)
+
+    def _load(self):
+        """
+            保存したスキャン結果を読み込む.
+            ファイルが存在しない場合や読み込めない場合は, 何も記録していない状態とする.
+
+            スキャン結果は JSON で保存するため, 信頼できないファイルを読み込んでもコードは実行されない.
+        """
+        import json
+        try:
+            with open(self._index_path, "rb") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(content, dict):
+            return
+        if content.get("version") != _FILE_INDEX_FORMAT_VERSION:
+            return
+        if content.get("root_path") != os.path.abspath(self._root_path):
+            return
+        files = content.get("files")
+        directories = content.get("directories")
+        if not (isinstance(files, dict) and isinstance(directories, dict)):
+            return
+
+        # JSON では tuple が list になるため, 形式を確認しながら tuple に戻す.
+        for relative_path, record in files.items():
+            if not (isinstance(record, list) and len(record) == 3
+                    and all(isinstance(value, int) for value in record)):
+                return
+            files[relative_path] = tuple(record)
+        for relative_path, record in directories.items():
+            if not (isinstance(record, list) and len(record) == 3
+                    and (record[0] is None or isinstance(record[0], int))
+                    and all(
+                        isinstance(names, list) and all(isinstance(name, str) for name in names)
+                        for names in record[1:])):
+                return
+            directories[relative_path] = (record[0], tuple(record[1]), tuple(record[2]))
+        self._files = files
+        self._directories = directories
+
+    def _save(self):
+        """
+            スキャン結果を保存する.
+        """
+        import json
+        content = {
+            "version": _FILE_INDEX_FORMAT_VERSION,
+            "root_path": os.path.abspath(self._root_path),
+            "files": self._files,
+            "directories": self._directories,
+        }
+        write_file_atomically(self._index_path, json.dumps(content, separators=(",", ":")))
+
+
+def _stat_file(file_path):
+    """
+        ファイルを stat する.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+
+        Returns
+        -------
+        record : tuple(int, int, int)|None
+            inode, size, mtime_ns. ファイルが存在しない場合は None.
+    """
+    try:
+        stat = os.stat(file_path, follow_symlinks=False)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def write_file_atomically(file_path, content):
+    """
+        ファイルに書き込む.
+
+        同じディレクトリの一時ファイルに書き込んでから置き換えるため,
+        他のプロセスが書き込み途中の内容を読み込むことはない.
+        既存のファイルのパーミッションは維持し, 新しいファイルは open と同じく umask を適用したパーミッションとする.
+
+        Arguments
+        ---------
+        file_path : str
+            書き込むファイルのパス.
+        content : str|bytes
+            書き込む内容.
+    """
+    directory_path = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory_path, exist_ok=True)
+    mode = "wb" if isinstance(content, bytes) else "w"
+
+    try:
+        permissions = os.stat(file_path).st_mode & 0o7777
+    except FileNotFoundError:
+        permissions = None
+
+    descriptor, temporary_path = _create_temporary_file(directory_path, os.path.basename(file_path))
+    try:
+        if permissions is not None:
+            os.fchmod(descriptor, permissions)
+        file = open(descriptor, mode)
+    except BaseException:
+        os.close(descriptor)
+        os.remove(temporary_path)
+        raise
+
+    try:
+        with file:
+            file.write(content)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def _create_temporary_file(directory_path, file_name):
+    """
+        ファイルを置き換えるための一時ファイルを作成する.
+
+        tempfile.mkstemp はパーミッションを 0o600 とするため, open と同じく 0o666 に umask を適用して作成する.
+        umask を取得するために os.umask で変更すると, 他のスレッドが作成するファイルに影響する.
+
+        Arguments
+        ---------
+        directory_path : str
+            一時ファイルを作成するディレクトリのパス.
+        file_name : str
+            置き換えるファイルの名前.
+
+        Returns
+        -------
+        descriptor : int
+            書き込み用に開いた一時ファイルのファイル記述子.
+        temporary_path : str
+            一時ファイルのパス.
+    """
+    while True:
+        temporary_path = os.path.join(directory_path, ".{}.{}".format(file_name, os.urandom(8).hex()))
+        try:
+            return os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temporary_path
+        except FileExistsError:
+            continue
+
+
+def find_duplicate_files(file_paths, *, block_size=DEFAULT_BLOCK_SIZE, max_workers=None):
+    """
+        内容が同じファイルを探す.
+
+        以下の順に候補を絞り込むため, サイズが他のファイルと異なるファイルは読み込まない.
+
+            1. サイズが同じファイルをまとめる.
+            2. 先頭と末尾のブロックのハッシュ値が同じファイルをまとめる.
+            3. 内容全体のハッシュ値が同じファイルをまとめる.
+
+        Arguments
+        ---------
+        file_paths : iterable(str)
+            ファイルのパス. 例えば generate_file_paths の結果.
+        block_size : int
+            先頭と末尾のブロックのサイズ (バイト).
+        max_workers : int|None
+            ファイルを読み込むスレッドの数. None の場合は ThreadPoolExecutor の既定値.
+
+        Returns
+        -------
+        duplicates : list(list(str))
+            内容が同じファイルのパスの list の list.
+            同じファイル (ハードリンクを含む) を 2 回以上含むことはない.
+
+        Raises
+        ------
+        ValueError
+            block_size が 1 未満の場合.
+    """
+    import concurrent.futures
+    if block_size < 1:
+        raise ValueError("Invalid block_size", block_size)
+
+    size_groups = collections.defaultdict(list)
+    seen = set()
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        key = (stat.st_dev, stat.st_ino)
+        if key not in seen:
+            seen.add(key)
+            size_groups[stat.st_size].append(file_path)
+
+    candidates = [
+        (size, file_paths)
+        for size, file_paths in size_groups.items()
+        if len(file_paths) > 1
+    ]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        hash_edges = functools.partial(_hash_file_edges, block_size=block_size)
+        edge_groups = _group_by_hash(executor, hash_edges, [file_paths for _, file_paths in candidates])
+
+        # 先頭と末尾のブロックが内容全体を含む場合は, 既に内容全体を比較している.
+        duplicates = []
+        full_candidates = []
+        for (size, _), groups in zip(candidates, edge_groups):
+            if size > block_size * 2:
+                full_candidates.extend(groups)
+            else:
+                duplicates.extend(groups)
+
+        for groups in _group_by_hash(executor, hash_file, full_candidates):
+            duplicates.extend(groups)
+    return duplicates
+
+
+def hash_file(file_path, *, algorithm=DEFAULT_HASH_ALGORITHM):
+    """
+        ファイルの内容のハッシュ値を求める.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        algorithm : str
+            hashlib.new に指定するハッシュアルゴリズムの名前.
+
+        Returns
+        -------
+        digest : bytes
+            ハッシュ値.
+    """
+    import hashlib
+    import mmap
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb", buffering=0) as file:
+        size = os.fstat(file.fileno()).st_size
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            buffer = _read_buffer()
+            view = memoryview(buffer)
+            while True:
+                length = file.readinto(buffer)
+                if not length:
+                    break
+                digest.update(view[:length])
+    return digest.digest()
+
+
+def _hash_file_edges(file_path, *, block_size, algorithm=DEFAULT_HASH_ALGORITHM):
+    """
+        ファイルの先頭と末尾のブロックのハッシュ値を求める.
+
+        Arguments
+        ---------
+        file_path : str
+            ファイルのパス.
+        block_size : int
+            ブロックのサイズ (バイト).
+        algorithm : str
+            hashlib.new に指定するハッシュアルゴリズムの名前.
+
+        Returns
+        -------
+        digest : bytes
+            ハッシュ値. ファイルが block_size の 2 倍以下の場合は内容全体のハッシュ値.
+    """
+    import hashlib
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb", buffering=0) as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= block_size * 2:
+            digest.update(file.read())
+        else:
+            digest.update(file.read(block_size))
+            file.seek(-block_size, os.SEEK_END)
+            digest.update(file.read(block_size))
+    return digest.digest()
+
+
+def _group_by_hash(executor, hash_function, file_path_groups):
+    """
+        グループごとに, ハッシュ値が同じファイルをまとめる.
+
+        すべてのグループのハッシュ値を求める処理を依頼してから結果を待つため,
+        小さなグループが多い場合もワーカーが遊ばない.
+
+        Arguments
+        ---------
+        executor : concurrent.futures.Executor
+            ハッシュ値を求める Executor.
+        hash_function : callable
+            ファイルのパスを受け取り, ハッシュ値を返す関数.
+        file_path_groups : list(list(str))
+            ファイルのパスの list の list. 異なる list のファイルはまとめない.
+
+        Returns
+        -------
+        groups : list(list(list(str)))
+            file_path_groups の要素ごとの, ハッシュ値が同じファイルのパスの list の list.
+            2 つ以上のパスを含むもののみ.
+    """
+    futures = [
+        [executor.submit(hash_function, file_path) for file_path in file_paths]
+        for file_paths in file_path_groups
+    ]
+
+    results = []
+    for file_paths, group_futures in zip(file_path_groups, futures):
+        groups = collections.defaultdict(list)
+        for file_path, future in zip(file_paths, group_futures):
+            try:
+                groups[future.result()].append(file_path)
+            except OSError:
+                pass
+        results.append([file_paths for file_paths in groups.values() if len(file_paths) > 1])
+    return results
+
+
+def _read_buffer():
+    """
+        スレッドごとに再利用する読み込み用のバッファを返す.
+
+        Returns
+        -------
+        buffer : bytearray
+            読み込み用のバッファ.
+    """
+    buffer = getattr(_thread_local, "read_buffer", None)
+    if buffer is None:
+        buffer = _thread_local.read_buffer = bytearray(_READ_BUFFER_SIZE)
+    return buffer
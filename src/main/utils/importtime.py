@@ -0,0 +1,246 @@
+"""
+    python -X importtime の結果を集計する機能を提供する.
+
+    Examples
+    --------
+
+        roots = profile_imports("myapp.hello.main")
+        for line in format_import_times(roots, min_cumulative_us=1000):
+            print(line)
+"""
+
+import collections
+import re
+import subprocess
+import sys
+
+
+ImportTime = collections.namedtuple("ImportTime", ["name", "self_us", "cumulative_us", "children"])
+"""
+    モジュールの import にかかった時間.
+
+    Attributes
+    ----------
+    name : str
+        モジュールの名前.
+    self_us : int
+        モジュール自身の import にかかった時間 (マイクロ秒).
+    cumulative_us : int
+        モジュールが import したモジュールを含む, import にかかった時間 (マイクロ秒).
+    children : list(ImportTime)
+        モジュールが import したモジュール.
+"""
+
+_IMPORT_TIME_PATTERN = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \| ( *)(\S+)\s*$")
+
+
+def profile_imports(module_name, *, python=sys.executable, env=None):
+    """
+        新しいプロセスでモジュールを import し, import にかかった時間を計測する.
+
+        Arguments
+        ---------
+        module_name : str
+            import するモジュールの名前.
+        python : str
+            Python の実行ファイルのパス.
+        env : dict|None
+            プロセスの環境変数. None の場合は現在のプロセスの環境変数.
+
+        Returns
+        -------
+        roots : list(ImportTime)
+            import したモジュールのうち, 他のモジュールから import されていないもの.
+            インタプリタの起動時に import したモジュールも含む.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            import に失敗した場合.
+    """
+    process = subprocess.run(
+        [python, "-X", "importtime", "-c", "import {}".format(module_name)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True)
+    return parse_import_times(process.stderr.splitlines())
+
+
+def profile_modules(module_names, *, python=sys.executable, env=None):
+    """
+        モジュールごとに新しいプロセスで import し, import にかかった時間を計測する.
+
+        インタプリタの起動時に既に import されているモジュールは python -X importtime の出力に現れないため,
+        計測できなかったモジュールとして区別する.
+
+        Arguments
+        ---------
+        module_names : iterable(str)
+            import するモジュールの名前.
+        python : str
+            Python の実行ファイルのパス.
+        env : dict|None
+            プロセスの環境変数. None の場合は現在のプロセスの環境変数.
+
+        Returns
+        -------
+        import_times : list(ImportTime)
+            計測できたモジュールの import にかかった時間. module_names の順.
+        not_measured : list(str)
+            計測できなかったモジュールの名前. module_names の順.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            import に失敗した場合.
+    """
+    import_times = []
+    not_measured = []
+    for module_name in module_names:
+        import_time = find_import_time(profile_imports(module_name, python=python, env=env), module_name)
+        if import_time is None:
+            not_measured.append(module_name)
+        else:
+            import_times.append(import_time)
+    return import_times, not_measured
+
+
+def parse_import_times(lines):
+    """
+        python -X importtime の出力を解析する.
+
+        出力は import が完了した順 (子が親より先) に並び, 深さは名前の字下げで表される.
+
+        Arguments
+        ---------
+        lines : iterable(str)
+            python -X importtime の出力の各行. 他の出力が混ざっていてもよい.
+
+        Returns
+        -------
+        roots : list(ImportTime)
+            他のモジュールから import されていないモジュール. import が完了した順.
+    """
+    # 深さごとに, 親が確定していないモジュールを保持する.
+    pending = collections.defaultdict(list)
+
+    for line in lines:
+        match = _IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = len(indent) // 2
+        children = pending.pop(depth + 1, [])
+        pending[depth].append(ImportTime(name, int(self_us), int(cumulative_us), children))
+
+    return pending[0]
+
+
+def find_import_time(roots, module_name):
+    """
+        モジュールの import にかかった時間を探す.
+
+        Arguments
+        ---------
+        roots : list(ImportTime)
+            parse_import_times の結果.
+        module_name : str
+            探すモジュールの名前.
+
+        Returns
+        -------
+        import_time : ImportTime|None
+            モジュールの import にかかった時間. 見つからない場合は None.
+    """
+    nodes = list(roots)
+    while nodes:
+        node = nodes.pop()
+        if node.name == module_name:
+            return node
+        nodes.extend(node.children)
+    return None
+
+
+def find_exceeded_budgets(import_times, budgets, *, default_budget=None):
+    """
+        import にかかった時間が上限を超えたモジュールを探す.
+
+        Arguments
+        ---------
+        import_times : iterable(ImportTime)
+            上限と比較するモジュールの import にかかった時間.
+        budgets : dict(str, float)
+            モジュールの名前と, 累積時間の上限 (ミリ秒).
+        default_budget : float|None
+            budgets に含まれないモジュールの累積時間の上限 (ミリ秒).
+            None の場合, budgets に含まれないモジュールは比較しない.
+
+        Returns
+        -------
+        exceeded : list(tuple(ImportTime, float))
+            上限を超えたモジュールの import にかかった時間と, その上限 (ミリ秒).
+    """
+    exceeded = []
+    for import_time in import_times:
+        budget = budgets.get(import_time.name, default_budget)
+        if budget is not None and import_time.cumulative_us > budget * 1000:
+            exceeded.append((import_time, budget))
+    return exceeded
+
+
+def format_import_times(roots, *, min_cumulative_us=0, max_depth=None):
+    """
+        import にかかった時間を, 累積時間の降順に並べた木として整形する.
+
+        Arguments
+        ---------
+        roots : list(ImportTime)
+            parse_import_times の結果.
+        min_cumulative_us : int
+            表示する累積時間の下限 (マイクロ秒). これより短いモジュールは配下を含めて表示しない.
+        max_depth : int|None
+            表示する深さの上限. None の場合は制限しない.
+
+        Yields
+        ------
+        line : str
+            累積時間 (ミリ秒), モジュール自身の時間 (ミリ秒), 字下げしたモジュールの名前.
+    """
+    stack = [(node, 0) for node in _sort_import_times(roots, min_cumulative_us, reverse=True)]
+    while stack:
+        node, depth = stack.pop()
+        yield "{:>10.1f} ms {:>10.1f} ms  {}{}".format(
+            node.cumulative_us / 1000,
+            node.self_us / 1000,
+            "  " * depth,
+            node.name)
+        if max_depth is None or depth < max_depth:
+            stack.extend(
+                (child, depth + 1)
+                for child in _sort_import_times(node.children, min_cumulative_us, reverse=True))
+
+
+def _sort_import_times(nodes, min_cumulative_us, *, reverse=False):
+    """
+        累積時間が下限以上のモジュールを, 累積時間の降順に並べる.
+
+        Arguments
+        ---------
+        nodes : list(ImportTime)
+            並べるモジュール.
+        min_cumulative_us : int
+            累積時間の下限 (マイクロ秒).
+        reverse : bool
+            True の場合は昇順に並べる. スタックに積む場合に使う.
+
+        Returns
+        -------
+        nodes : list(ImportTime)
+            並べたモジュール.
+    """
+    return sorted(
+        (node for node in nodes if node.cumulative_us >= min_cumulative_us),
+        key=lambda node: node.cumulative_us,
+        reverse=not reverse)
@@ -0,0 +1,325 @@
+"""
+    invoke のタスクを遅延して読み込む機能を提供する.
+
+    タスクの名前, 引数, docstring はモジュールを import せずに構文木から読み取り,
+    マニフェストにキャッシュする. モジュールはタスクを実行する時に初めて import する.
+
+    Examples
+    --------
+
+        # tasks.py
+        namespace = load_collection("src/tasks", manifest_path="target/cache/tasks-manifest.json")
+"""
+
+import ast
+import inspect
+import os
+import time
+from importlib import import_module
+
+from invoke import Collection
+from invoke import Task
+
+from utils.modules import load_scan_cache
+from utils.modules import save_scan_cache
+from utils.modules import scan_modules
+
+
+_MANIFEST_FORMAT_VERSION = 3
+
+_LITERAL_TYPES = (type(None), bool, int, float, str)
+"""マニフェストに記録できるタスクの引数の既定値の型."""
+
+_LITERAL_OPTIONS = (
+    "name",
+    "aliases",
+    "positional",
+    "optional",
+    "default",
+    "auto_shortflags",
+    "help",
+    "autoprint",
+    "iterable",
+    "incrementable",
+)
+"""マニフェストに記録できる @task の引数. pre, post はタスクを参照するため記録できない."""
+
+
+def load_collection(scan_dir, *, manifest_path=None):
+    """
+        ディレクトリ配下のモジュールのタスクを遅延して読み込むコレクションを作成する.
+
+        モジュールごとにサブコレクションを作成する. サブコレクションの名前はモジュールの名前の末尾.
+        構文木からタスクを読み取れないモジュール (pre を指定する, ns を動的に組み立てる等) は,
+        従来どおり import してコレクションを作成する.
+
+        Arguments
+        ---------
+        scan_dir : str
+            タスクのモジュールを探すディレクトリのパス.
+            モジュールは scan_dir を sys.path に含めた状態で import する.
+        manifest_path : str|None
+            マニフェストをキャッシュするファイルのパス.
+            ディレクトリとモジュールのファイルの mtime が変わっていない場合は, キャッシュを使う.
+
+        Returns
+        -------
+        collection : invoke.Collection
+            タスクのコレクション.
+    """
+    manifest = None
+    if manifest_path is not None:
+        manifest = load_scan_cache(manifest_path, _MANIFEST_FORMAT_VERSION, scan_dir)
+    if manifest is None:
+        manifest = _scan_manifest(scan_dir, manifest_path)
+
+    collection = Collection()
+    for module_name, module in sorted(manifest.items()):
+        if module["tasks"] is None:
+            collection.add_collection(Collection.from_module(import_module(module_name)))
+        else:
+            collection.add_collection(_to_collection(module_name, module))
+    return collection
+
+
+def scan_tasks(file_path):
+    """
+        モジュールを import せずに, 構文木からタスクを読み取る.
+
+        Arguments
+        ---------
+        file_path : str
+            モジュールのファイルのパス.
+
+        Returns
+        -------
+        module : dict
+            "doc" にモジュールの docstring, "name" にコレクションの名前,
+            "tasks" にタスクの一覧を持つ dict.
+            コレクションの名前は ns = Collection("name", task, ...) で指定した名前. 指定しない場合は None.
+            タスクは "function", "doc", "parameters", "options" を持つ dict.
+            構文木から読み取れない場合, "tasks" は None.
+    """
+    with open(file_path, "rb") as file:
+        tree = ast.parse(file.read(), file_path)
+
+    module = {"doc": ast.get_docstring(tree, clean=False), "name": None, "tasks": []}
+    try:
+        namespace = None
+        for node in tree.body:
+            if _is_namespace_assignment(node):
+                namespace = node.value
+            elif isinstance(node, ast.FunctionDef):
+                task = _scan_task(node)
+                if task is not None:
+                    module["tasks"].append(task)
+        if namespace is not None:
+            module["name"], module["tasks"] = _scan_namespace(namespace, module["tasks"])
+    except ValueError:
+        module["tasks"] = None
+    return module
+
+
+def _scan_task(node):
+    """
+        関数定義の構文木からタスクを読み取る.
+
+        Arguments
+        ---------
+        node : ast.FunctionDef
+            関数定義.
+
+        Returns
+        -------
+        task : dict|None
+            タスク. @task で修飾されていない場合は None.
+
+        Raises
+        ------
+        ValueError
+            @task の引数や, 関数の引数の既定値をマニフェストに記録できない場合.
+    """
+    decorators = [
+        decorator for decorator in node.decorator_list
+        if _is_task_decorator(decorator.func if isinstance(decorator, ast.Call) else decorator)
+    ]
+    if not decorators:
+        return None
+    if len(node.decorator_list) != 1:
+        raise ValueError("Multiple decorators", node.name)
+
+    options = {}
+    if isinstance(decorators[0], ast.Call):
+        if decorators[0].args:
+            raise ValueError("Pre tasks are given", node.name)
+        for keyword in decorators[0].keywords:
+            if keyword.arg not in _LITERAL_OPTIONS:
+                raise ValueError("Unsupported option", node.name, keyword.arg)
+            options[keyword.arg] = ast.literal_eval(keyword.value)
+
+    arguments = node.args
+    if arguments.posonlyargs or arguments.vararg or arguments.kwonlyargs or arguments.kwarg:
+        raise ValueError("Unsupported parameters", node.name)
+
+    parameters = [{"name": argument.arg} for argument in arguments.args]
+    for parameter, default in zip(parameters[len(parameters) - len(arguments.defaults):], arguments.defaults):
+        value = ast.literal_eval(default)
+        if not isinstance(value, _LITERAL_TYPES):
+            raise ValueError("Unsupported default value", node.name, parameter["name"])
+        parameter["default"] = value
+
+    return {
+        "function": node.name,
+        "doc": ast.get_docstring(node, clean=False),
+        "parameters": parameters,
+        "options": options,
+    }
+
+
+def _scan_namespace(node, tasks):
+    """
+        名前空間を定義する式の構文木から, コレクションの名前とタスクを読み取る.
+
+        Collection("name", task, ...) の形式だけを読み取る.
+
+        Arguments
+        ---------
+        node : ast.expr
+            ns または namespace に代入する式.
+        tasks : list(dict)
+            モジュールで定義したタスク.
+
+        Returns
+        -------
+        name : str
+            コレクションの名前.
+        tasks : list(dict)
+            コレクションに含めるタスク.
+
+        Raises
+        ------
+        ValueError
+            上記以外の形式の場合.
+    """
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "Collection"):
+        raise ValueError("Unsupported namespace")
+    if node.keywords or not node.args:
+        raise ValueError("Unsupported namespace")
+
+    name = ast.literal_eval(node.args[0])
+    if not isinstance(name, str):
+        raise ValueError("Unsupported namespace name", name)
+
+    tasks_by_function = {task["function"]: task for task in tasks}
+    try:
+        return name, [tasks_by_function[argument.id] for argument in node.args[1:]]
+    except (AttributeError, KeyError):
+        raise ValueError("Unsupported namespace tasks")
+
+
+def _is_task_decorator(node):
+    if isinstance(node, ast.Name):
+        return node.id == "task"
+    if isinstance(node, ast.Attribute):
+        return node.attr == "task" and isinstance(node.value, ast.Name) and node.value.id == "invoke"
+    return False
+
+
+def _is_namespace_assignment(node):
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, ast.AnnAssign):
+        targets = [node.target]
+    else:
+        return False
+    return any(isinstance(target, ast.Name) and target.id in ("ns", "namespace") for target in targets)
+
+
+def _to_collection(module_name, module):
+    """
+        マニフェストに記録したモジュールからコレクションを作成する.
+
+        Arguments
+        ---------
+        module_name : str
+            モジュールの名前.
+        module : dict
+            マニフェストに記録したモジュール.
+
+        Returns
+        -------
+        collection : invoke.Collection
+            モジュールのタスクを遅延して読み込むコレクション.
+    """
+    collection = Collection(module["name"] or module_name.rpartition(".")[2])
+    collection.__doc__ = module["doc"]
+    for task in module["tasks"]:
+        collection.add_task(_to_task(module_name, task))
+    return collection
+
+
+def _to_task(module_name, task):
+    """
+        マニフェストに記録したタスクから, 実行時にモジュールを import するタスクを作成する.
+
+        Arguments
+        ---------
+        module_name : str
+            タスクを定義したモジュールの名前.
+        task : dict
+            マニフェストに記録したタスク.
+
+        Returns
+        -------
+        task : invoke.Task
+            タスク. 引数と docstring は元のタスクと同じ.
+    """
+    function_name = task["function"]
+
+    def body(context, *args, **kwargs):
+        module = import_module(module_name)
+        return getattr(module, function_name).body(context, *args, **kwargs)
+
+    body.__name__ = function_name
+    body.__qualname__ = function_name
+    body.__module__ = module_name
+    body.__doc__ = task["doc"]
+    body.__signature__ = inspect.Signature([
+        inspect.Parameter(
+            parameter["name"],
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default=parameter.get("default", inspect.Parameter.empty))
+        for parameter in task["parameters"]
+    ])
+    return Task(body, **task["options"])
+
+
+def _scan_manifest(scan_dir, manifest_path):
+    """
+        ディレクトリ配下のモジュールからタスクを読み取り, マニフェストを作成する.
+
+        Arguments
+        ---------
+        scan_dir : str
+            タスクのモジュールを探すディレクトリのパス.
+        manifest_path : str|None
+            マニフェストをキャッシュするファイルのパス. None の場合はキャッシュしない.
+
+        Returns
+        -------
+        manifest : dict(str, dict)
+            モジュールの名前と, scan_tasks で読み取ったモジュールの dict.
+    """
+    started_ns = time.time_ns()
+
+    module_names, mtimes = scan_modules(scan_dir)
+    manifest = {}
+    for module_name in module_names:
+        file_path = os.path.join(scan_dir, *module_name.split(".")) + ".py"
+        mtimes[file_path] = os.stat(file_path).st_mtime_ns
+        manifest[module_name] = scan_tasks(file_path)
+
+    if manifest_path is not None:
+        save_scan_cache(manifest_path, _MANIFEST_FORMAT_VERSION, scan_dir, manifest, mtimes, started_ns)
+
+    return manifest
@@ -1,29 +1,256 @@
+import importlib.util
+import json
 import os
 import re
-from functools import partial
+import sys
+import time
 from importlib import import_module
 
-from utils.files import generate_file_paths
+from utils import files
 
 
 MODULE_FILE_PATH_PATTERN = re.compile(r"^([^/]+/)*[a-zA-Z0-9][a-zA-Z0-9_]*\.py$")
 
+_CACHE_FORMAT_VERSION = 2
 
-def find_modules(scan_dir):
-    file_paths = generate_file_paths(scan_dir)
 
-    to_relative_path = partial(os.path.relpath, start=scan_dir)
-    file_paths = map(to_relative_path, file_paths)
+def lazy_import(name):
+    """
+        モジュールを遅延して import する.
 
-    is_module_file_path = MODULE_FILE_PATH_PATTERN.match
-    file_paths = filter(is_module_file_path, file_paths)
+        モジュールを探すだけで実行せず, 属性に初めてアクセスした時に実行する.
+        import に時間がかかり, 一部の処理でしか使わないモジュールに使う.
 
-    to_module_name = lambda file_path: file_path.rstrip(".py").replace("/", ".")
-    module_names = map(to_module_name, file_paths)
+        Examples
+        --------
+
+            yaml = lazy_import("yaml")
+
+            def load(file):
+                # ここで初めて yaml を実行する.
+                return yaml.safe_load(file)
+
+        Arguments
+        ---------
+        name : str
+            モジュールの名前. Ex. "mysql.connector"
+
+        Returns
+        -------
+        module : module
+            モジュール. 既に import されている場合はそのモジュール.
+
+        Raises
+        ------
+        ModuleNotFoundError
+            モジュールが見つからない場合.
+    """
+    try:
+        return sys.modules[name]
+    except KeyError:
+        pass
+
+    # 親のパッケージは import される.
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError("No module named {!r}".format(name), name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # import 文と同じく, 親のパッケージの属性に設定する.
+    parent_name, _, child_name = name.rpartition(".")
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+
+    return module
+
+
+def find_modules(scan_dir, *, cache_path=None):
+    """
+        ディレクトリ配下のモジュールの名前を探す.
+
+        scan_dir 直下のモジュールとパッケージ (__init__.py を含むディレクトリ) を探し,
+        パッケージの配下を再帰的に探す. パッケージではないディレクトリの配下は探さない.
+
+        Arguments
+        ---------
+        scan_dir : str
+            探すディレクトリのパス.
+        cache_path : str|None
+            結果をキャッシュするファイルのパス.
+            探したディレクトリの mtime が変わっていない場合は, キャッシュした結果を返す.
+
+        Returns
+        -------
+        module_names : list(str)
+            モジュールの名前. パッケージの __init__ は含まない.
+    """
+    if cache_path is not None:
+        module_names = load_scan_cache(cache_path, _CACHE_FORMAT_VERSION, scan_dir)
+        if module_names is not None:
+            return module_names
+
+    started_ns = time.time_ns()
+    module_names, directory_mtimes = scan_modules(scan_dir)
+    if cache_path is not None:
+        save_scan_cache(cache_path, _CACHE_FORMAT_VERSION, scan_dir, module_names, directory_mtimes, started_ns)
 
     return module_names
 
 
-def import_modules(scan_dir):
-    return list(map(import_module, find_modules(scan_dir)))
+def import_modules(scan_dir, *, cache_path=None):
+    return list(map(import_module, find_modules(scan_dir, cache_path=cache_path)))
+
+
+def to_module_name(file_path):
+    """
+        モジュールのファイルのパスをモジュールの名前に変換する.
+
+        Arguments
+        ---------
+        file_path : str
+            モジュールのファイルの, 探したディレクトリからの相対パス.
+            Ex. "utils/modules.py"
+
+        Returns
+        -------
+        module_name : str
+            モジュールの名前.
+            Ex. "utils.modules"
+    """
+    root, _ = os.path.splitext(file_path)
+    return root.replace(os.sep, ".")
+
+
+def scan_modules(scan_dir):
+    """
+        ディレクトリ配下のモジュールの名前を, キャッシュを使わずに探す.
+
+        Arguments
+        ---------
+        scan_dir : str
+            探すディレクトリのパス.
+
+        Returns
+        -------
+        module_names : list(str)
+            モジュールの名前.
+        directory_mtimes : dict(str, int)
+            読み込んだディレクトリとその直下のディレクトリのパスと mtime_ns.
+    """
+    module_names = []
+    directory_mtimes = {scan_dir: os.stat(scan_dir).st_mtime_ns}
+
+    for entry in files.generate_entries(scan_dir, prune=_is_not_package):
+        if entry.is_dir():
+            # パッケージでないディレクトリも, __init__.py が作成されたことを検出するために記録する.
+            # __pycache__ 等のパッケージになりえないディレクトリは記録しない.
+            if entry.name.isidentifier() and entry.name != "__pycache__":
+                directory_mtimes[entry.path] = entry.stat().st_mtime_ns
+            continue
+        file_path = os.path.relpath(entry.path, scan_dir)
+        if MODULE_FILE_PATH_PATTERN.match(file_path):
+            module_names.append(to_module_name(file_path))
+
+    return module_names, directory_mtimes
+
+
+def _is_not_package(entry):
+    """
+        ディレクトリがパッケージではないか判定する.
+
+        Arguments
+        ---------
+        entry : os.DirEntry
+            ディレクトリの os.DirEntry.
+
+        Returns
+        -------
+        bool
+            __init__.py を含まない場合は True.
+    """
+    return not os.path.isfile(os.path.join(entry.path, "__init__.py"))
+
+
+def load_scan_cache(cache_path, format_version, scan_dir):
+    """
+        ディレクトリを探した結果のキャッシュを読み込む.
+
+        キャッシュに記録したファイルとディレクトリの mtime がすべて変わっていない場合だけ有効とする.
+
+        Arguments
+        ---------
+        cache_path : str
+            キャッシュしたファイルのパス.
+        format_version : int
+            キャッシュの形式のバージョン. 保存した時と異なる場合は無効とする.
+        scan_dir : str
+            探したディレクトリのパス.
+
+        Returns
+        -------
+        content : object|None
+            save_scan_cache で保存した内容. キャッシュが存在しないか, 無効な場合は None.
+    """
+    try:
+        with open(cache_path, "r") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict):
+        return None
+    if cache.get("version") != format_version:
+        return None
+    if cache.get("scan_dir") != os.path.abspath(scan_dir):
+        return None
+
+    for path, mtime in cache["mtimes"].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+
+    return cache["content"]
+
+
+def save_scan_cache(cache_path, format_version, scan_dir, content, mtimes, started_ns):
+    """
+        ディレクトリを探した結果をキャッシュする.
+
+        探している間に変更された可能性があるファイルやディレクトリがある場合は,
+        変更を検出できない可能性があるためキャッシュしない.
+
+        Arguments
+        ---------
+        cache_path : str
+            キャッシュするファイルのパス.
+        format_version : int
+            キャッシュの形式のバージョン.
+        scan_dir : str
+            探したディレクトリのパス.
+        content : object
+            キャッシュする内容. JSON に変換できる必要がある.
+        mtimes : dict(str, int)
+            content を求めるために読み込んだファイルとディレクトリのパスと mtime_ns.
+        started_ns : int
+            探し始めた時刻 (time.time_ns).
+    """
+    if any(mtime >= started_ns - files.RACY_INTERVAL_NS for mtime in mtimes.values()):
+        return
 
+    cache = {
+        "version": format_version,
+        "scan_dir": os.path.abspath(scan_dir),
+        "mtimes": {os.path.abspath(path): mtime for path, mtime in mtimes.items()},
+        "content": content,
+    }
+    try:
+        files.write_file_atomically(cache_path, json.dumps(cache))
+    except OSError:
+        pass
@@ -0,0 +1,216 @@
+"""
+    複数のプロセスまたはスレッドで map-reduce する機能を提供する.
+
+    Examples
+    --------
+
+        from utils.collections import frequencies
+        from utils.collections import merge_frequencies
+
+        # チャンクごとに頻度を数え, その結果をマージする.
+        counts = map_reduce(frequencies, merge_frequencies, values, initial={})
+
+        # I/O バウンドな mapper はスレッドで実行する.
+        sizes = map_reduce(read_sizes, operator.add, paths, use_threads=True)
+"""
+
+import collections
+import concurrent.futures
+import functools
+import itertools
+import os
+
+
+DEFAULT_CHUNK_SIZE = 1024
+"""1 チャンクあたりの要素数の既定値."""
+
+_NO_INITIAL = object()
+"""map_reduce に initial が指定されなかったことを表す値."""
+
+
+def map_chunks(
+        mapper,
+        values,
+        *,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_workers=None,
+        max_in_flight=None,
+        ordered=True,
+        use_threads=False):
+    """
+        values をチャンクに分割し, チャンクごとに mapper を並列に適用する.
+
+        Arguments
+        ---------
+        mapper : callable
+            チャンク (tuple) を受け取り, 部分的な結果を返す関数.
+            プロセスで実行する場合は pickle 可能である必要がある.
+        values : iterable
+            入力となる値.
+        chunk_size : int
+            1 チャンクあたりの要素数.
+        max_workers : int|None
+            ワーカーの数. None の場合は CPU 数.
+        max_in_flight : int|None
+            同時に実行中または結果待ちとするチャンク数の上限.
+            None の場合はワーカー数の 2 倍.
+            入力の読み込みはこの上限で止まるため, メモリ使用量が抑えられる.
+        ordered : bool
+            True の場合は入力の順序どおりに結果を生成する.
+            False の場合は完了した順に結果を生成する.
+        use_threads : bool
+            True の場合はプロセスではなくスレッドで mapper を実行する.
+            I/O バウンドな mapper や pickle できない mapper に向く.
+
+        Yields
+        ------
+        result : object
+            チャンクごとの mapper の結果.
+
+        Raises
+        ------
+        ValueError
+            chunk_size, max_workers, max_in_flight が 1 未満の場合.
+    """
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk_size", chunk_size)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError("Invalid max_workers", max_workers)
+    if max_in_flight is None:
+        max_in_flight = max_workers * 2
+    if max_in_flight < 1:
+        raise ValueError("Invalid max_in_flight", max_in_flight)
+
+    chunks = _generate_chunks(values, chunk_size)
+
+    if use_threads:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+
+    with executor:
+        futures = collections.deque()
+        try:
+            for chunk in chunks:
+                if len(futures) >= max_in_flight:
+                    yield from _wait_results(futures, ordered)
+                futures.append(executor.submit(mapper, chunk))
+            while futures:
+                yield from _wait_results(futures, ordered)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def map_reduce(
+        mapper,
+        reducer,
+        values,
+        *,
+        initial=_NO_INITIAL,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_workers=None,
+        max_in_flight=None,
+        ordered=False,
+        use_threads=False):
+    """
+        values をチャンクごとに並列に mapper で処理し, その結果を reducer で集約する.
+
+        Arguments
+        ---------
+        mapper : callable
+            チャンク (tuple) を受け取り, 部分的な結果を返す関数.
+        reducer : callable
+            2 つの部分的な結果を受け取り, それらを集約した結果を返す関数.
+            結合法則を満たす必要がある.
+            交換法則を満たさない場合は ordered に True を指定する.
+        values : iterable
+            入力となる値.
+        initial : object
+            集約の初期値. functools.reduce の initial と同じ.
+        chunk_size, max_workers, max_in_flight, use_threads
+            map_chunks を参照.
+        ordered : bool
+            True の場合は入力の順序どおりに部分的な結果を集約する.
+
+        Returns
+        -------
+        result : object
+            集約した結果.
+
+        Raises
+        ------
+        TypeError
+            values が空で initial が指定されていない場合.
+    """
+    results = map_chunks(
+        mapper,
+        values,
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+        max_in_flight=max_in_flight,
+        ordered=ordered,
+        use_threads=use_threads)
+
+    if initial is _NO_INITIAL:
+        return functools.reduce(reducer, results)
+    else:
+        return functools.reduce(reducer, results, initial)
+
+
+def _generate_chunks(values, chunk_size):
+    """
+        values を chunk_size 個ずつのチャンクに分割する.
+
+        Arguments
+        ---------
+        values : iterable
+            分割する値.
+        chunk_size : int
+            1 チャンクあたりの要素数.
+
+        Yields
+        ------
+        chunk : tuple
+            チャンク. 最後のチャンクは chunk_size 個より少ない場合がある.
+    """
+    # chunked が使う zip_longest は最初に返したタプルを再利用のために保持し続けるため,
+    # 実行中のチャンクとは別に 1 チャンク分の要素がメモリ上に残る. islice で分割してそれを避ける.
+    iterator = iter(values)
+    while True:
+        chunk = tuple(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _wait_results(futures, ordered):
+    """
+        実行中のチャンクの結果を待ち, 少なくとも 1 つの結果を生成する.
+
+        Arguments
+        ---------
+        futures : collections.deque
+            実行中のチャンクの Future. 完了したものは取り除かれる.
+        ordered : bool
+            True の場合は最も古いチャンクの結果を待つ.
+            False の場合は完了しているチャンクの結果をすべて生成する.
+
+        Yields
+        ------
+        result : object
+            チャンクごとの mapper の結果.
+    """
+    if ordered:
+        yield futures.popleft().result()
+        return
+
+    done, _ = concurrent.futures.wait(
+        futures,
+        return_when=concurrent.futures.FIRST_COMPLETED)
+    for future in done:
+        futures.remove(future)
+    for future in done:
+        yield future.result()
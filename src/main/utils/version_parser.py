@@ -0,0 +1,90 @@
+"""
+    バージョン文字列をパースする機能を提供する.
+
+    utils.application_version と utils.versioning が共有する.
+    バージョンの形式は以下のいずれか.
+
+        * <major>.<minor>.<patch> (Ex. "1.2.3")
+        * <major>.<minor>.<patch>-<suffix> (Ex. "1.2.3-SNAPSHOT")
+
+    Examples
+    --------
+
+        print(scan_version("1.2.3-SNAPSHOT"))  # => (1, 2, 3, "SNAPSHOT")
+        print(scan_version(b"1.2.3"))          # => (1, 2, 3, None)
+        print(scan_version("1.2"))             # => None
+"""
+
+import re
+import typing
+
+
+_VERSION_PATTERN = r"(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)(?:-([a-zA-Z0-9]+))?"
+"""バージョンの形式. メジャー, マイナー, パッチ, サフィックスをグループとする."""
+
+VERSION_STRING_PATTERN = re.compile(r"\A" + _VERSION_PATTERN + r"\Z", re.MULTILINE)
+"""バージョン文字列にマッチする正規表現. scan_version と同じ文字列にマッチする."""
+
+_VERSION_LINES_PATTERN = r"^(?:" + _VERSION_PATTERN + r"|.*?)\r?$"
+
+VERSION_LINES_PATTERNS = {
+    str: re.compile(_VERSION_LINES_PATTERN, re.MULTILINE),
+    bytes: re.compile(_VERSION_LINES_PATTERN.encode("ascii"), re.MULTILINE),
+}
+"""
+    改行区切りのバージョン文字列の各行にマッチする正規表現 (str と bytes それぞれ).
+    行末の CR は取り除く. 無効な行にもマッチし, その場合はすべてのグループが空になる.
+"""
+
+
+def scan_version(
+        version_string: typing.Union[str, bytes, bytearray, memoryview]
+        ) -> typing.Optional[typing.Tuple[int, int, int, typing.Optional[str]]]:
+    """
+        バージョン文字列をパースする.
+
+        正規表現を使わず, C で実装された str (bytes) のメソッドで 1 回ずつ走査する.
+        bytes と memoryview はデコードせずにパースするため, ファイルから読み込んだ内容をそのまま渡せる.
+
+        Arguments
+        ---------
+        version_string : str|bytes|bytearray|memoryview
+            バージョン文字列.
+
+        Returns
+        -------
+        tuple(int, int, int, str|None)|None
+            バージョンの構成要素. 無効な形式の場合は None.
+    """
+    if isinstance(version_string, memoryview):
+        version_string = version_string.tobytes()
+    if type(version_string) is str:
+        numbers, separator, suffix = version_string.partition("-")
+        dot, zero = ".", "0"
+    else:
+        numbers, separator, suffix = version_string.partition(b"-")
+        dot, zero = b".", b"0"
+
+    if separator:
+        # isalnum は str の場合 ASCII 以外の文字も受け付ける.
+        if not (suffix.isalnum() and suffix.isascii()):
+            return None
+        if type(suffix) is not str:
+            suffix = suffix.decode("ascii")
+    else:
+        suffix = None
+
+    # isdigit は str の場合 ASCII 以外の数字も受け付ける.
+    parts = numbers.split(dot)
+    if len(parts) != 3 or not numbers.isascii():
+        return None
+    major, minor, patch = parts
+    if not (major.isdigit() and minor.isdigit() and patch.isdigit()):
+        return None
+    # 先頭の 0 は 0 自身の場合だけ許す.
+    if (major[:1] == zero and len(major) > 1
+            or minor[:1] == zero and len(minor) > 1
+            or patch[:1] == zero and len(patch) > 1):
+        return None
+
+    return (int(major), int(minor), int(patch), suffix)
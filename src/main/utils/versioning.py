@@ -25,19 +25,27 @@
     suffix : str|None
         A suffix of version.
         Ex. 'SNAPSHOT'.
+
+    columns : utils.application_version.VersionColumns
+        Versions stored as columnar arrays.
+        See parse_version_strings.
 """
 
 
+import os
 import re
 import typing
+import utils.application_version
+import utils.cached_files
+import utils.files
+import utils.version_parser
 
 
-VERSION_STRING_PATTERN: re.Pattern = re.compile(
-    r'\A(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)(?:-([a-zA-Z0-9]+))?\Z',
-    re.MULTILINE)
+VERSION_STRING_PATTERN: re.Pattern = utils.version_parser.VERSION_STRING_PATTERN
 """
     re.Patern
         A regular expression that matches version string.
+        Parsing uses utils.version_parser.scan_version instead.
 """
 
 
@@ -62,9 +70,41 @@ def from_file(
         InvalidVersion
             A file contains invalid version string.
     """
-    with open(file_path) as file:
+    with open(file_path, 'rb') as file:
         version_string = file.read().strip()
-        return from_string(version_string)
+    return Version(*parse_version_string(version_string))
+
+
+def from_cached_file(
+        file_path: str,
+        *,
+        check_interval: float=utils.cached_files.CHECK_INTERVAL
+        ) -> 'Version':
+    """
+        Create Version from version file, reusing it until the file changes.
+
+        The file is re-read only when its mtime, inode or size changes,
+        and it is checked at most once per check_interval seconds.
+        This function is thread safe.
+
+        Arguments
+        ---------
+        file_path : str
+            A file path that contains version string.
+        check_interval : float
+            Seconds between checks of the file.
+
+        Returns
+        -------
+        version : Version
+            The same instance as long as the file is unchanged.
+
+        Raises
+        ------
+        InvalidVersion
+            A file contains invalid version string.
+    """
+    return utils.cached_files.load_cached(file_path, from_file, check_interval=check_interval)
 
 
 def from_string(
@@ -88,20 +128,20 @@ def from_string(
         InvalidVersion
             Raises when version_string is invalid.
     """
-    major, minor, patch, suffix = parse_version(version_string)
+    major, minor, patch, suffix = parse_version_string(version_string)
     return Version(major, minor, patch, suffix)
 
 
 def parse_version_string(
-        version_string: str
+        version_string: typing.Union[str, bytes, memoryview]
         ) -> typing.Tuple[int, int, int, typing.Optional[str]]:
     """
         Parse version string.
 
         Arguments
         ---------
-        version_string : str
-            Version string.
+        version_string : str|bytes|memoryview
+            Version string. bytes and memoryview are parsed without decoding.
 
         Returns
         -------
@@ -113,11 +153,10 @@ def parse_version_string(
         InvalidVersion
             Raises when invalid version string.
     """
-    matched = VERSION_STRING_PATTERN.match(version_string)
-    if matched:
-        return (int(matched[1]), int(matched[2]), int(matched[3]), matched[4])
-    else:
+    components = utils.version_parser.scan_version(version_string)
+    if components is None:
         raise InvalidVersion(version_string)
+    return components
 
 
 def build_version_string(
@@ -158,6 +197,32 @@ def build_version_string(
     return version_string
 
 
+def parse_version_strings(
+        version_strings: typing.Union[str, bytes, typing.Iterable[str]]
+        ) -> utils.application_version.VersionColumns:
+    """
+        Parse many version strings at once into columnar arrays.
+
+        Invalid lines do not raise, they are flagged in columns.invalid.
+
+        Arguments
+        ---------
+        version_strings : str|bytes|iterable(str)
+            A newline-delimited buffer, or version strings.
+
+        Returns
+        -------
+        columns : utils.application_version.VersionColumns
+            Versions in the same order as the input lines.
+    """
+    return utils.application_version.parse_version_strings(version_strings)
+
+
+argsort_version_columns = utils.application_version.argsort_version_columns
+
+compare_version_columns = utils.application_version.compare_version_columns
+
+
 class InvalidVersion(ValueError):
     """
         Raises when version is invalid.
@@ -266,17 +331,18 @@ class Version(object):
     def bump_to_release(
             self: 'Version'
             ) -> 'Version':
-        return self.bump_to_suffix(None)
+        return self.bump_suffix(None)
 
     def bump_to_snapshot(
             self: 'Version'
             ) -> 'Version':
-        return self.bump_to_suffix('SNAPSHOT')
+        return self.bump_suffix('SNAPSHOT')
 
     def save(
             self: 'Version',
             file_path: str
             ) -> None:
-        with open(file_path, 'w') as file:
-            file.write(str(self))
+        # Write to a temporary file and rename it, so readers never see a partial file.
+        # Resolve symlinks first so that a symlinked file is updated rather than replaced.
+        utils.files.write_file_atomically(os.path.realpath(file_path), str(self))
 
@@ -0,0 +1,19 @@
+from invoke import task
+
+from utils.modules import find_modules
+
+
+@task(name="run", iterable=["modules"], default=True)
+def run_benchmarks(context, modules):
+    """
+        ベンチマークを実行する.
+    """
+    if not modules:
+        modules = [
+            module for module in find_modules("src/benchmark")
+            if module.rpartition(".")[2].startswith("bench_")
+        ]
+
+    for module in modules:
+        print("# {}".format(module))
+        context.run("python -m src.benchmark.{}".format(module))
@@ -0,0 +1,50 @@
+import sys
+import sysconfig
+
+from invoke import task
+
+
+SOURCE_PATHS = ["tasks.py", "src/main", "src/tasks"]
+
+EXCLUDED_PATH_PATTERN = "/(test|tests|idlelib|lib2to3|tkinter|turtledemo)/"
+"""依存するモジュールのうち, コンパイルしないディレクトリのパターン."""
+
+
+@task(
+    name="bytecode",
+    default=True,
+    help={"dependencies": "標準ライブラリと site-packages もコンパイルする. PYTHONPYCACHEPREFIX が設定されている場合だけ有効."})
+def compile_bytecode(context, dependencies=True):
+    """
+        バイトコードを事前にコンパイルする.
+
+        src/main, src/tasks をすべてのコアで並列にコンパイルする.
+        PYTHONPYCACHEPREFIX が設定されている場合は, そのディレクトリに出力する.
+        コンテナではソースの mtime が変わりうるため, ソースのハッシュ値で検証する .pyc を出力する.
+
+        PYTHONPYCACHEPREFIX が設定されている場合, Python はインストール済みの __pycache__ を使わないため,
+        標準ライブラリと site-packages も同じディレクトリにコンパイルする.
+    """
+    paths = list(SOURCE_PATHS)
+    if dependencies and sys.pycache_prefix is not None:
+        paths.extend(_dependency_paths())
+
+    context.run("python -W ignore::SyntaxWarning -m compileall -q -j 0 --invalidation-mode checked-hash -x '{}' {}".format(
+        EXCLUDED_PATH_PATTERN,
+        " ".join(paths)))
+
+
+def _dependency_paths():
+    """
+        標準ライブラリと site-packages のディレクトリのパスを返す.
+
+        Returns
+        -------
+        paths : list(str)
+            ディレクトリのパス. 他のディレクトリの配下にあるディレクトリは含まない.
+    """
+    paths = []
+    for path in sorted({sysconfig.get_path(name) for name in ("stdlib", "purelib", "platlib")}):
+        if not any(path.startswith(parent + "/") for parent in paths):
+            paths.append(path)
+    return paths
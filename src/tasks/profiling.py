@@ -0,0 +1,60 @@
+import yaml
+from invoke import Collection
+from invoke import Exit
+from invoke import task
+
+from utils.importtime import find_exceeded_budgets
+from utils.importtime import format_import_times
+from utils.importtime import profile_modules
+from utils.modules import find_modules
+
+
+BUDGETS_FILE_PATH = "config/importtime.yml"
+
+ENTRY_POINTS = ["tasks"]
+"""src/main 以外の計測するモジュール."""
+
+
+@task(
+    name="imports",
+    iterable=["modules"],
+    default=True,
+    help={
+        "modules": "計測するモジュール. 省略した場合は tasks と src/main 配下のすべてのモジュール.",
+        "threshold": "表示する累積時間の下限 (ミリ秒).",
+        "depth": "表示する深さの上限.",
+    })
+def profile_module_imports(context, modules, threshold=1.0, depth=2):
+    """
+        モジュールの import にかかる時間を計測する.
+
+        モジュールごとに新しいプロセスで python -X importtime を実行し,
+        累積時間の降順に並べた木を表示する.
+        累積時間が config/importtime.yml の上限を超えたモジュールがある場合は失敗する.
+    """
+    if not modules:
+        modules = ENTRY_POINTS + find_modules("src/main")
+
+    import_times, not_measured = profile_modules(modules)
+    for line in format_import_times(import_times, min_cumulative_us=threshold * 1000, max_depth=depth):
+        print(line)
+    # インタプリタの起動時に既に import されているモジュールは計測できない.
+    for module in not_measured:
+        print("{}: not measured".format(module))
+
+    with open(BUDGETS_FILE_PATH, "r") as file:
+        config = yaml.safe_load(file)
+    exceeded = find_exceeded_budgets(
+        import_times,
+        config.get("budgets") or {},
+        default_budget=config.get("default"))
+    if exceeded:
+        raise Exit("\n".join(
+            "{} exceeded the import time budget: {:.1f} ms > {} ms".format(
+                import_time.name,
+                import_time.cumulative_us / 1000,
+                budget)
+            for import_time, budget in exceeded))
+
+
+ns = Collection("profile", profile_module_imports)
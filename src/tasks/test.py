@@ -1,8 +1,12 @@
 from invoke import task
 
 
-@task(name="unit", iterable=["files"], default=True)
-def run_unit_tests(context, files):
+@task(
+    name="unit",
+    iterable=["files"],
+    default=True,
+    help={"importtime": "import にかかる時間が上限を超えていないことも検査する."})
+def run_unit_tests(context, files, importtime=False):
     """
         単体テストを実行する.
     """
@@ -11,6 +15,9 @@ def run_unit_tests(context, files):
     else:
         context.run("python -m unittest discover -v -t . -s src/test")
 
+    if importtime:
+        context.run("invoke profile.imports")
+
 
 @task(name="coverage")
 def report_unit_test_coverage(context):
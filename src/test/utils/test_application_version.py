@@ -1,13 +1,32 @@
+import itertools
+import os
+import tempfile
+import threading
+import unittest.mock
 from unittest import TestCase
 
 from utils.application_version import ApplicationVersion
 from utils.application_version import VERSION_STRING_PATTERN
 from utils.application_version import InvalidVersion
 from utils.application_version import from_file
+from utils.application_version import from_cached_file
 from utils.application_version import from_string
 from utils.application_version import parse_version_string
 from utils.application_version import build_version_string
 from utils.application_version import to_compare_key
+from utils.application_version import clear_intern_cache
+from utils.application_version import from_components
+from utils.application_version import intern_cache_info
+from utils.application_version import pack_compare_key
+from utils.application_version import parse_version_strings
+from utils.application_version import argsort_version_columns
+from utils.application_version import compare_version_columns
+from utils.application_version import InvalidConstraint
+from utils.application_version import VersionConstraint
+from utils.application_version import parse_constraint
+from utils.application_version import VersionIndex
+from utils.cached_files import clear_cache
+from utils.comparable import sort_key
 
 
 class VersionStringPatternTestCase(TestCase):
@@ -87,6 +106,51 @@ class ApplicationVersionTestCase(TestCase):
         self.assertEqual("1.2.3-SNAPSHOT", str(version))
         self.assertEqual("1.2.3", str(new_version))
 
+    def test_bump_without_validation(self):
+        version = ApplicationVersion(1, 2, 3, "SNAPSHOT")
+        with unittest.mock.patch("utils.version_parser.scan_version") as scan_version_mock:
+            new_versions = [
+                version.bump_major(),
+                version.bump_minor(),
+                version.bump_patch(),
+                version.bump_to_release(),
+                version.bump_to_snapshot(),
+            ]
+        scan_version_mock.assert_not_called()
+        self.assertEqual(
+            ["2.0.0-SNAPSHOT", "1.3.0-SNAPSHOT", "1.2.4-SNAPSHOT", "1.2.3", "1.2.3-SNAPSHOT"],
+            [str(new_version) for new_version in new_versions])
+        self.assertEqual(ApplicationVersion(2, 0, 0, "SNAPSHOT"), new_versions[0])
+        self.assertEqual(hash(ApplicationVersion(1, 2, 3)), hash(new_versions[3]))
+
+    def test_bump_subclass(self):
+        class LimitedVersion(ApplicationVersion):
+            __slots__ = ("initialized", )
+
+            def __init__(self, major, minor, patch, suffix=None):
+                if major > 1:
+                    raise InvalidVersion("major must be 0 or 1", major)
+                super().__init__(major, minor, patch, suffix)
+                self.initialized = True
+
+        version = LimitedVersion(1, 2, 3, "SNAPSHOT")
+        for new_version in (version.bump_minor(), version.bump_patch(), version.bump_to_release()):
+            self.assertIsInstance(new_version, LimitedVersion)
+            self.assertTrue(new_version.initialized)
+        # サブクラスの __init__ の検証を省かない.
+        with self.assertRaises(InvalidVersion):
+            version.bump_major()
+
+    def test_bump_suffix_with_invalid_suffix(self):
+        with self.assertRaises(InvalidVersion):
+            ApplicationVersion(1, 2, 3).bump_suffix("-")
+
+    def test_str_cached(self):
+        version = ApplicationVersion(1, 2, 3, "SNAPSHOT")
+        self.assertIs(str(version), str(version))
+        bumped_version = version.bump_patch()
+        self.assertIs(str(bumped_version), str(bumped_version))
+
     def test_eq(self):
         self.assertEqual(True, ApplicationVersion(1, 2, 3) == ApplicationVersion(1, 2, 3))
         self.assertEqual(False, ApplicationVersion(1, 2, 3) == ApplicationVersion(1, 2, 4))
@@ -189,9 +253,88 @@ class ApplicationVersionTestCase(TestCase):
         self.assertEqual(False, ApplicationVersion(1, 2, 3, "SNAPSHOT") >= ApplicationVersion(1, 2, 4, "SNAPSHOT"))
         self.assertEqual(True, ApplicationVersion(1, 2, 4, "SNAPSHOT") >= ApplicationVersion(1, 2, 3, "SNAPSHOT"))
 
+    def test_compare(self):
+        self.assertEqual(-1, ApplicationVersion(1, 2, 3, "SNAPSHOT").compare(ApplicationVersion(1, 2, 3)))
+        self.assertEqual(0, ApplicationVersion(1, 2, 3).compare(ApplicationVersion(1, 2, 3)))
+        self.assertEqual(+1, ApplicationVersion(1, 2, 4).compare(ApplicationVersion(1, 2, 3)))
+
+    def test_hash(self):
+        self.assertEqual(hash(ApplicationVersion(1, 2, 3)), hash(ApplicationVersion(1, 2, 3)))
+        self.assertEqual(
+            {ApplicationVersion(1, 2, 3), ApplicationVersion(1, 2, 3, "SNAPSHOT")},
+            {ApplicationVersion(1, 2, 3, "SNAPSHOT"), ApplicationVersion(1, 2, 3), ApplicationVersion(1, 2, 3)})
+
+    def test_compare_with_other_type(self):
+        self.assertEqual(False, ApplicationVersion(1, 2, 3) == "1.2.3")
+        self.assertEqual(True, ApplicationVersion(1, 2, 3) != "1.2.3")
+        with self.assertRaises(TypeError):
+            ApplicationVersion(1, 2, 3) < "1.2.3"
+
+    def test_sort_key(self):
+        versions = [
+            ApplicationVersion(1, 2, 4),
+            ApplicationVersion(1, 2, 3),
+            ApplicationVersion(1, 2, 3, "SNAPSHOT"),
+            ApplicationVersion(1, 2, 3, "Alpha"),
+        ]
+        self.assertEqual(sorted(versions), sorted(versions, key=sort_key(ApplicationVersion)))
+        self.assertEqual(
+            ["1.2.3-Alpha", "1.2.3-SNAPSHOT", "1.2.3", "1.2.4"],
+            list(map(str, sorted(versions, key=sort_key(ApplicationVersion)))))
+
 
 class FromFileTestCase(TestCase):
-    pass
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temporary_directory.name, "VERSION")
+        clear_cache()
+
+    def tearDown(self):
+        clear_cache()
+        self.temporary_directory.cleanup()
+
+    def test_from_file(self):
+        ApplicationVersion(1, 2, 3, "SNAPSHOT").save(self.file_path)
+        self.assertEqual(ApplicationVersion(1, 2, 3, "SNAPSHOT"), from_file(self.file_path))
+
+    def test_save_atomically(self):
+        with unittest.mock.patch("utils.files.write_file_atomically") as write_mock:
+            ApplicationVersion(1, 2, 3).save(self.file_path)
+        write_mock.assert_called_once_with(os.path.realpath(self.file_path), "1.2.3")
+
+    def test_save_through_symlink(self):
+        target_path = os.path.join(self.temporary_directory.name, "VERSION.target")
+        ApplicationVersion(1, 2, 3).save(target_path)
+        os.symlink(target_path, self.file_path)
+
+        ApplicationVersion(1, 2, 4).save(self.file_path)
+
+        self.assertTrue(os.path.islink(self.file_path))
+        self.assertEqual(ApplicationVersion(1, 2, 4), from_file(target_path))
+
+    def test_save_with_umask(self):
+        umask = os.umask(0o077)
+        try:
+            ApplicationVersion(1, 2, 3).save(self.file_path)
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o600, os.stat(self.file_path).st_mode & 0o777)
+
+    def test_from_cached_file(self):
+        ApplicationVersion(1, 2, 3).save(self.file_path)
+        version = from_cached_file(self.file_path, check_interval=0)
+        self.assertEqual(ApplicationVersion(1, 2, 3), version)
+        self.assertIs(version, from_cached_file(self.file_path, check_interval=0))
+
+        version.bump_patch().save(self.file_path)
+        self.assertEqual(ApplicationVersion(1, 2, 4), from_cached_file(self.file_path, check_interval=0))
+
+    def test_from_cached_file_with_invalid_version(self):
+        with open(self.file_path, "w") as file:
+            file.write("invalid")
+        with self.assertRaises(InvalidVersion):
+            from_cached_file(self.file_path)
 
 
 
@@ -229,6 +372,79 @@ class FromFileTestCase(TestCase):
 #            ApplicationVersion.from_version_string("A.B.C")
 
 
+class InternTestCase(TestCase):
+
+    def setUp(self):
+        clear_intern_cache()
+
+    def tearDown(self):
+        clear_intern_cache()
+
+    def test_from_string(self):
+        version = from_string("1.2.3-SNAPSHOT")
+        self.assertEqual(ApplicationVersion(1, 2, 3, "SNAPSHOT"), version)
+        self.assertIs(version, from_string("1.2.3-SNAPSHOT"))
+        self.assertIsNot(version, from_string("1.2.3"))
+
+    def test_from_components(self):
+        version = from_components(1, 2, 3, "SNAPSHOT")
+        self.assertEqual(ApplicationVersion(1, 2, 3, "SNAPSHOT"), version)
+        self.assertIs(version, from_components(1, 2, 3, "SNAPSHOT"))
+        # from_string は from_components と同じインスタンスを返す.
+        self.assertIs(version, from_string("1.2.3-SNAPSHOT"))
+
+    def test_invalid_version(self):
+        for _ in range(2):
+            with self.assertRaises(InvalidVersion):
+                from_string("1.2")
+            with self.assertRaises(InvalidVersion):
+                from_components(1, 2, 3, "")
+        self.assertEqual(0, intern_cache_info()["strings"].currsize)
+
+    def test_invalid_type_after_cached(self):
+        version = from_components(1, 2, 3)
+        # 等しい値をキャッシュした後も, 型が異なる引数は検証する.
+        for major in (True, 1.0):
+            with self.assertRaises(InvalidVersion):
+                from_components(major, 2, 3)
+        self.assertIs(version, from_components(1, 2, 3))
+
+    def test_intern_cache_info(self):
+        self.assertEqual(0.0, intern_cache_info()["strings"].hit_rate)
+
+        for version_string in ("1.2.3", "1.2.3", "1.2.3", "1.2.4"):
+            from_string(version_string)
+
+        info = intern_cache_info()
+        self.assertEqual((2, 2, 2), (info["strings"].hits, info["strings"].misses, info["strings"].currsize))
+        self.assertEqual(0.5, info["strings"].hit_rate)
+        self.assertEqual((0, 2), (info["components"].hits, info["components"].misses))
+
+    def test_dict_key(self):
+        counts = {}
+        for version_string in ("1.2.3", "1.2.3", "1.2.4"):
+            version = from_string(version_string)
+            counts[version] = counts.get(version, 0) + 1
+        self.assertEqual({ApplicationVersion(1, 2, 3): 2, ApplicationVersion(1, 2, 4): 1}, counts)
+
+    def test_threads(self):
+        results = []
+
+        def parse():
+            results.append([from_string("1.2.{}".format(index % 10)) for index in range(1000)])
+
+        threads = [threading.Thread(target=parse) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(4, len(results))
+        for versions in results:
+            self.assertEqual([ApplicationVersion(1, 2, index % 10) for index in range(1000)], versions)
+        self.assertEqual(10, intern_cache_info()["strings"].currsize)
+
+
 class ParseVersionStringTestCase(TestCase):
 
     def test_with_suffix(self):
@@ -356,6 +572,314 @@ class ToCompareKeyTestCase(TestCase):
             to_compare_key(ApplicationVersion(1, 2, 3)))
 
 
+class PackCompareKeyTestCase(TestCase):
+
+    def test(self):
+        self.assertEqual(b"\x01\x01\x01\x02\x01\x03\x01", pack_compare_key(1, 2, 3))
+        self.assertEqual(b"\x00\x00\x02\x01\x00\x00Alpha", pack_compare_key(0, 0, 256, "Alpha"))
+
+    def test_order(self):
+        # to_compare_key と同じ順序になる.
+        numbers = (0, 1, 9, 255, 256, 65535, 65536, 10 ** 30)
+        suffixes = (None, "A", "AB", "Alpha", "B", "SNAPSHOT", "a", "0", "9z")
+        versions = [
+            ApplicationVersion(major, minor, 0, suffix)
+            for major, minor, suffix in itertools.product(numbers, numbers, suffixes)
+        ]
+        for version, other in itertools.product(versions[::7], versions):
+            self.assertEqual(
+                to_compare_key(version) < to_compare_key(other),
+                pack_compare_key(*version.components) < pack_compare_key(*other.components),
+                (version, other))
+            self.assertEqual(
+                to_compare_key(version) == to_compare_key(other),
+                pack_compare_key(*version.components) == pack_compare_key(*other.components),
+                (version, other))
+
+    def test_invalid_version_raised_when_too_large_version_passed(self):
+        pack_compare_key(2 ** 2040 - 1, 0, 0)
+        with self.assertRaises(InvalidVersion):
+            pack_compare_key(2 ** 2040, 0, 0)
+
+
+class ParseVersionStringsTestCase(TestCase):
+
+    def test(self):
+        columns = parse_version_strings("1.2.3\n4.5.6-SNAPSHOT\n7.8.9-Alpha\n")
+        self.assertEqual([1, 4, 7], list(columns.major))
+        self.assertEqual([2, 5, 8], list(columns.minor))
+        self.assertEqual([3, 6, 9], list(columns.patch))
+        self.assertEqual([-1, 1, 0], list(columns.suffix_codes))
+        self.assertEqual(("Alpha", "SNAPSHOT"), columns.suffixes)
+        self.assertEqual([0, 0, 0], list(columns.invalid))
+
+    def test_same_as_parse_version_string(self):
+        version_strings = [
+            "1.2.3", "0.0.0-A", "1.2", "01.2.3", "1.2.3-", "", " 1.2.3", "1.2.3-SNAPSHOT", "1.2.3\r", "1.2.3-A\r"]
+        columns = parse_version_strings(version_strings)
+        for index, version_string in enumerate(version_strings):
+            try:
+                major, minor, patch, suffix = parse_version_string(version_string)
+            except InvalidVersion:
+                self.assertEqual(1, columns.invalid[index], version_string)
+                continue
+            self.assertEqual(0, columns.invalid[index], version_string)
+            self.assertEqual(
+                (major, minor, patch, suffix),
+                (
+                    columns.major[index],
+                    columns.minor[index],
+                    columns.patch[index],
+                    columns.suffixes[columns.suffix_codes[index]] if columns.suffix_codes[index] >= 0 else None,
+                ))
+
+    def test_buffer(self):
+        expected = parse_version_strings(["1.2.3", "invalid", "", "1.2.3-SNAPSHOT"])
+        self.assertEqual(expected, parse_version_strings("1.2.3\ninvalid\n\n1.2.3-SNAPSHOT"))
+        self.assertEqual(expected, parse_version_strings("1.2.3\r\ninvalid\r\n\r\n1.2.3-SNAPSHOT\r\n"))
+        self.assertEqual(expected, parse_version_strings(b"1.2.3\ninvalid\n\n1.2.3-SNAPSHOT\n"))
+
+    def test_empty(self):
+        for version_strings in ("", b"", []):
+            columns = parse_version_strings(version_strings)
+            self.assertEqual(0, len(columns.invalid))
+            self.assertEqual((), columns.suffixes)
+        self.assertEqual([1], list(parse_version_strings([""]).invalid))
+
+    def test_invalid(self):
+        columns = parse_version_strings(["1.2.3-A\n4.5.6", str(2 ** 64) + ".0.0-B", "1.2.3-C"])
+        self.assertEqual([1, 1, 0], list(columns.invalid))
+        self.assertEqual([0, 0, 1], list(columns.major))
+        self.assertEqual([-1, -1, 0], list(columns.suffix_codes))
+        self.assertEqual(("C",), columns.suffixes)
+
+    def test_carriage_return_in_element(self):
+        # 行末の CR を取り除くのは改行区切りの場合だけで, 要素に含まれる CR は無効.
+        self.assertEqual([1, 0], list(parse_version_strings(["1.2.3\r", "1.2.4"]).invalid))
+        self.assertEqual([0, 1], list(parse_version_strings(["1.2.3", "1.2.4-A\r"]).invalid))
+
+
+class ArgsortVersionColumnsTestCase(TestCase):
+
+    def test(self):
+        version_strings = ["1.2.3", "1.2.3-SNAPSHOT", "invalid", "0.10.0", "1.2.3-Alpha", "0.9.0", "1.2.3"]
+        indices = argsort_version_columns(parse_version_strings(version_strings))
+        self.assertEqual([5, 3, 4, 1, 0, 6, 2], list(indices))
+
+    def test_same_as_sorted(self):
+        versions = [
+            ApplicationVersion(major, minor, 0, suffix)
+            for major, minor, suffix in itertools.product((2, 0, 10), (1, 0), (None, "b", "A", "a"))
+        ]
+        indices = argsort_version_columns(parse_version_strings(map(str, versions)))
+        self.assertEqual(sorted(versions), [versions[index] for index in indices])
+
+
+class CompareVersionColumnsTestCase(TestCase):
+
+    def test(self):
+        columns = parse_version_strings(["1.2.3", "1.2.3-A", "1.2.3-C", "1.2.4", "invalid"])
+        other = parse_version_strings(["1.2.3", "1.2.3-B", "1.2.3-B", "1.2.3", "1.2.3"])
+        self.assertEqual([0, -1, 1, 1, 0], list(compare_version_columns(columns, other)))
+
+    def test_version(self):
+        columns = parse_version_strings(["1.2.3", "1.2.3-A", "1.2.3-C", "1.2.4", "invalid"])
+        self.assertEqual(
+            [1, -1, 1, 1, 0],
+            list(compare_version_columns(columns, ApplicationVersion(1, 2, 3, "B"))))
+
+    def test_value_error_raised_when_number_of_rows_is_different(self):
+        with self.assertRaises(ValueError):
+            compare_version_columns(parse_version_strings(["1.2.3"]), parse_version_strings([]))
+
+
+class ParseConstraintTestCase(TestCase):
+
+    VERSION_STRINGS = (
+        "0.9.0", "1.0.0-SNAPSHOT", "1.0.0", "1.0.1", "1.2.0-Alpha", "1.2.0", "1.9.9",
+        "2.0.0-A", "2.0.0-SNAPSHOT", "2.0.0", "3.0.0-SNAPSHOT", "3.0.0", "3.0.1",
+    )
+
+    def assertMatched(self, expected, constraint_string):
+        constraint = parse_constraint(constraint_string)
+        self.assertEqual(
+            expected,
+            [version_string for version_string in self.VERSION_STRINGS if version_string in constraint])
+
+    def test_operators(self):
+        self.assertMatched(["1.0.0"], "1.0.0")
+        self.assertMatched(["1.0.0"], "==1.0.0")
+        self.assertMatched(["1.0.0"], "= 1.0.0")
+        self.assertMatched([v for v in self.VERSION_STRINGS if v != "1.0.0"], "!=1.0.0")
+        self.assertMatched(["2.0.0", "3.0.0-SNAPSHOT", "3.0.0", "3.0.1"], ">=2.0.0")
+        self.assertMatched(["3.0.0-SNAPSHOT", "3.0.0", "3.0.1"], ">2.0.0")
+        self.assertMatched(["0.9.0", "1.0.0-SNAPSHOT"], "<1.0.0")
+        self.assertMatched(["0.9.0", "1.0.0-SNAPSHOT", "1.0.0"], "<=1.0.0")
+        self.assertMatched(list(self.VERSION_STRINGS), "*")
+
+    def test_and_or(self):
+        self.assertMatched(
+            ["1.2.0", "1.9.9", "2.0.0-A"],
+            ">=1.2.0, <2.0.0-SNAPSHOT")
+        self.assertMatched(
+            ["0.9.0", "1.2.0", "1.9.9", "2.0.0-A", "3.0.0"],
+            ">=1.2.0,<2.0.0-SNAPSHOT || 3.0.0 || <1.0.0-SNAPSHOT")
+        self.assertMatched([], ">2.0.0,<1.0.0")
+        self.assertTrue(parse_constraint(">2.0.0,<1.0.0").is_empty())
+
+    def test_same_as_comparison(self):
+        versions = [from_string(version_string) for version_string in self.VERSION_STRINGS]
+        for version, other in itertools.product(versions, versions):
+            self.assertEqual(version <= other, version in parse_constraint("<={}".format(other)))
+            self.assertEqual(version > other, version in parse_constraint(">{}".format(other)))
+            self.assertEqual(version != other, version in parse_constraint("!={}".format(other)))
+
+    def test_invalid_constraint_raised_when_constraint_is_invalid(self):
+        for constraint_string in (
+                "", ">=1.2", "~1.2.3", ">=1.2.3,", "1.2.3 ||", ">=1.2.3 <2.0.0", "1.0\n.0", ">=1.2.3-\nA"):
+            with self.assertRaises(InvalidConstraint, msg=constraint_string):
+                parse_constraint(constraint_string)
+
+    def test_suffix_prefix(self):
+        # 1.2.3-A の比較用のキーは 1.2.3-AB の比較用のキーの前方一致になる.
+        self.assertNotIn(from_string("1.2.3-AB"), parse_constraint("==1.2.3-A"))
+        self.assertIn(from_string("1.2.3-AB"), parse_constraint(">1.2.3-A"))
+        self.assertNotIn(from_string("1.2.3-AB"), parse_constraint("<=1.2.3-A"))
+
+
+class VersionConstraintTestCase(TestCase):
+
+    def test_intersection_and_union(self):
+        lower = parse_constraint(">=1.0.0")
+        upper = parse_constraint("<2.0.0")
+        self.assertEqual(parse_constraint(">=1.0.0,<2.0.0"), lower & upper)
+        self.assertEqual(parse_constraint(">=1.0.0 || <2.0.0"), lower | upper)
+        self.assertEqual(parse_constraint("*"), lower | upper)
+        self.assertTrue((parse_constraint("<1.0.0") & lower).is_empty())
+        self.assertTrue(VersionConstraint().is_empty())
+
+    def test_filter(self):
+        versions = sorted(from_string(version_string) for version_string in ParseConstraintTestCase.VERSION_STRINGS)
+        constraint = parse_constraint(">=1.2.0,<2.0.0-SNAPSHOT || >3.0.0-SNAPSHOT")
+        self.assertEqual(
+            [version for version in versions if version in constraint],
+            constraint.filter(versions))
+        self.assertEqual([], parse_constraint("1.5.0").filter(versions))
+        self.assertEqual(versions, parse_constraint("*").filter(versions))
+
+    def test_ranges(self):
+        packed_keys = [pack_compare_key(major, 0, 0) for major in range(10)]
+        constraint = parse_constraint("<2.0.0 || >=4.0.0,<=5.0.0 || >8.0.0")
+        self.assertEqual([range(0, 2), range(4, 6), range(9, 10)], list(constraint.ranges(packed_keys)))
+
+
+class VersionIndexTestCase(TestCase):
+
+    VERSION_STRINGS = (
+        "2.0.0", "1.2.3-SNAPSHOT", "0.9.0", "1.2.3", "1.10.0-SNAPSHOT", "1.2.4-SNAPSHOT", "256.0.0", "1.2.3",
+    )
+
+    def setUp(self):
+        self.index = VersionIndex(map(from_string, self.VERSION_STRINGS))
+
+    def assertVersions(self, expected, versions):
+        self.assertEqual(expected, [str(version) for version in versions])
+
+    def test_iter(self):
+        self.assertEqual(len(self.VERSION_STRINGS), len(self.index))
+        self.assertEqual(sorted(map(from_string, self.VERSION_STRINGS)), list(self.index))
+        self.assertEqual(sorted(map(from_string, self.VERSION_STRINGS), reverse=True), list(reversed(self.index)))
+        self.assertIn("1.2.3", self.index)
+        self.assertNotIn("1.2.3-A", self.index)
+
+    def test_add(self):
+        # 1 つずつ挿入する場合と, まとめて並べる場合のどちらも昇順になる.
+        for count in (1, 100):
+            versions = [ApplicationVersion(1, number % 7, number) for number in range(count)]
+            index = VersionIndex(map(from_string, self.VERSION_STRINGS))
+            self.assertEqual("2.0.0", str(index.floor("2.0.0")))
+            for version in versions:
+                index.add(version)
+            index.update(reversed(versions))
+            self.assertEqual(
+                sorted(list(map(from_string, self.VERSION_STRINGS)) + versions * 2),
+                list(index))
+
+    def test_floor_and_ceiling(self):
+        self.assertEqual("1.2.3", str(self.index.floor("1.2.3")))
+        self.assertEqual("1.2.3", str(self.index.floor("1.2.4-A")))
+        self.assertIsNone(self.index.floor("0.1.0"))
+        self.assertEqual("1.2.3", str(self.index.ceiling("1.2.3")))
+        self.assertEqual("1.2.3", str(self.index.ceiling("1.2.3-ZZZ")))
+        self.assertEqual("1.2.4-SNAPSHOT", str(self.index.ceiling("1.2.4-A")))
+        self.assertIsNone(self.index.ceiling("257.0.0"))
+
+    def test_lower_and_higher(self):
+        self.assertEqual("1.2.3-SNAPSHOT", str(self.index.lower("1.2.3")))
+        self.assertIsNone(self.index.lower("0.9.0"))
+        self.assertEqual("1.2.4-SNAPSHOT", str(self.index.higher("1.2.3")))
+        self.assertIsNone(self.index.higher("256.0.0"))
+
+    def test_range(self):
+        self.assertVersions(["1.2.3", "1.2.3", "1.2.4-SNAPSHOT"], self.index.range("1.2.3", "1.10.0-SNAPSHOT"))
+        self.assertVersions(["0.9.0"], self.index.range(stop="1.2.3-SNAPSHOT"))
+        self.assertVersions(["2.0.0", "256.0.0"], self.index.range(start="1.10.0"))
+        self.assertEqual(list(self.index), self.index.range())
+
+    def test_select(self):
+        self.assertVersions(
+            ["0.9.0", "1.2.4-SNAPSHOT", "1.10.0-SNAPSHOT", "2.0.0"],
+            self.index.select(parse_constraint(">1.2.3,<=2.0.0 || <1.0.0")))
+
+    def test_group(self):
+        self.assertVersions(
+            ["1.2.3-SNAPSHOT", "1.2.3", "1.2.3", "1.2.4-SNAPSHOT", "1.10.0-SNAPSHOT"],
+            self.index.group(1))
+        self.assertVersions(["1.10.0-SNAPSHOT"], self.index.group(1, 10))
+        self.assertVersions([], self.index.group(3))
+
+    def test_groups(self):
+        self.assertEqual(
+            [0, 1, 2, 256],
+            [major for major, _ in self.index.groups()])
+        self.assertEqual(
+            [((0, 9), 1), ((1, 2), 4), ((1, 10), 1), ((2, 0), 1), ((256, 0), 1)],
+            [(group, len(versions)) for group, versions in self.index.groups(minor=True)])
+
+    def test_latest(self):
+        self.assertEqual("256.0.0", str(self.index.latest()))
+        self.assertEqual("1.10.0-SNAPSHOT", str(self.index.latest(1)))
+        self.assertEqual("1.2.3", str(self.index.latest(1, release=True)))
+        self.assertEqual("1.2.4-SNAPSHOT", str(self.index.latest(1, 2)))
+        self.assertIsNone(self.index.latest(1, 10, release=True))
+        self.assertIsNone(self.index.latest(3))
+        self.assertIsNone(VersionIndex().latest())
+
+    def test_latest_release_after_update(self):
+        index = VersionIndex([from_string("1.0.0")])
+        self.assertEqual("1.0.0", str(index.latest(release=True)))
+
+        index.add(from_string("1.0.1-SNAPSHOT"))
+        index.update(from_string("1.0.{}-SNAPSHOT".format(patch)) for patch in range(2, 200))
+        self.assertEqual("1.0.199-SNAPSHOT", str(index.latest()))
+        self.assertEqual("1.0.0", str(index.latest(1, release=True)))
+
+        index.add(from_string("1.0.100"))
+        self.assertEqual("1.0.100", str(index.latest(1, 0, release=True)))
+
+    def test_value_error_raised_when_minor_is_specified_without_major(self):
+        with self.assertRaises(ValueError):
+            self.index.latest(minor=1)
+
+    def test_value_error_raised_when_number_is_negative(self):
+        for major, minor in [(-1, None), (-1, 0), (1, -1)]:
+            with self.subTest(major=major, minor=minor):
+                with self.assertRaises(ValueError):
+                    self.index.group(major, minor)
+                with self.assertRaises(ValueError):
+                    self.index.latest(major, minor)
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from utils.cached_files import clear_cache
+from utils.cached_files import load_cached
+
+
+class LoadCachedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temporary_directory.name, "file.txt")
+        self.loads = []
+        self.write_file("a")
+        clear_cache()
+
+    def tearDown(self):
+        clear_cache()
+        self.temporary_directory.cleanup()
+
+    def write_file(self, content, *, mtime_ns=10 ** 9):
+        # 一時ファイルに書き込んでから置き換える. mtime は変えない.
+        temporary_path = self.file_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            file.write(content)
+        os.utime(temporary_path, ns=(mtime_ns, mtime_ns))
+        os.replace(temporary_path, self.file_path)
+
+    def load(self, file_path):
+        with open(file_path) as file:
+            content = file.read()
+        self.loads.append(content)
+        return content
+
+    def test(self):
+        self.assertEqual("a", load_cached(self.file_path, self.load, check_interval=0))
+        self.assertEqual("a", load_cached(self.file_path, self.load, check_interval=0))
+        self.assertEqual(["a"], self.loads)
+
+    def test_modified(self):
+        load_cached(self.file_path, self.load, check_interval=0)
+        # mtime が同じでも inode が変わるため, 読み込み直す.
+        self.write_file("b")
+        self.assertEqual("b", load_cached(self.file_path, self.load, check_interval=0))
+        self.assertEqual(["a", "b"], self.loads)
+
+    def test_check_interval(self):
+        load_cached(self.file_path, self.load, check_interval=60)
+        self.write_file("b")
+        with unittest.mock.patch("utils.cached_files.os.stat") as stat_mock:
+            self.assertEqual("a", load_cached(self.file_path, self.load, check_interval=60))
+        stat_mock.assert_not_called()
+        self.assertEqual("b", load_cached(self.file_path, self.load, check_interval=0))
+
+    def test_load_error_not_cached(self):
+        def load(file_path):
+            raise ValueError(file_path)
+
+        with self.assertRaises(ValueError):
+            load_cached(self.file_path, load, check_interval=60)
+        self.assertEqual("a", load_cached(self.file_path, self.load, check_interval=60))
+
+    def test_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            load_cached(self.file_path + ".missing", self.load)
+
+    def test_threads(self):
+        barrier = threading.Barrier(8)
+        results = []
+
+        def run():
+            barrier.wait()
+            results.append(load_cached(self.file_path, self.load))
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(["a"] * 8, results)
+        self.assertEqual(["a"], self.loads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
+import random
 import unittest
+from operator import itemgetter
 
 from utils.collections import flatten
 from utils.collections import frequencies
+from utils.collections import merge_frequencies
 from utils.collections import chunked
+from utils.collections import external_sort
 
 
 class CollectionsTestCase(unittest.TestCase):
@@ -79,6 +83,14 @@ class CollectionsTestCase(unittest.TestCase):
             {"A": 1, "B": 2, "C": 1},
             frequencies(["A", "B", "B", "C"]))
 
+    def test_merge_frequencies(self):
+        self.assertDictEqual(
+            {},
+            merge_frequencies({}, {}))
+        self.assertDictEqual(
+            {"A": 1, "B": 3, "C": 1},
+            merge_frequencies({"A": 1, "B": 2}, {"B": 1, "C": 1}))
+
 
 class ChunkedTestCase(unittest.TestCase):
 
@@ -104,6 +116,86 @@ class ChunkedTestCase(unittest.TestCase):
         self.assertEqual([], list(chunked([], 3)))
 
 
+class CountedValue:
+    """
+        生存しているインスタンスの数と, その最大値を数える値.
+    """
+
+    count = 0
+    max_count = 0
+
+    def __init__(self, value):
+        self.value = value
+        CountedValue.count += 1
+        CountedValue.max_count = max(CountedValue.max_count, CountedValue.count)
+
+    def __del__(self):
+        CountedValue.count -= 1
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __reduce__(self):
+        # 読み込み直したインスタンスも数えるため, __init__ を呼び出す.
+        return (CountedValue, (self.value, ))
+
+
+class ExternalSortTestCase(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(0)
+        self.values = [generator.randrange(100) for _ in range(1000)]
+        self.records = [(value, index) for index, value in enumerate(self.values)]
+
+    def test_value_error_raised_when_invalid_buffer_size_passed(self):
+        with self.assertRaises(ValueError):
+            list(external_sort([], buffer_size=1))
+
+    def test_returns_iterable_but_not_list(self):
+        self.assertNotIsInstance(external_sort([]), list)
+
+    def test_in_memory(self):
+        self.assertEqual([], list(external_sort([])))
+        self.assertEqual(sorted(self.values), list(external_sort(self.values)))
+
+    def test_spilled(self):
+        self.assertEqual(
+            sorted(self.values),
+            list(external_sort(self.values, buffer_size=100)))
+        self.assertEqual(
+            sorted(self.values, reverse=True),
+            list(external_sort(self.values, reverse=True, buffer_size=100)))
+
+    def test_spilled_with_multiple_merge_passes(self):
+        self.assertEqual(
+            sorted(self.values),
+            list(external_sort(self.values, buffer_size=4)))
+
+    def test_buffer_size_bounds_values_in_memory(self):
+        CountedValue.count = CountedValue.max_count = 0
+        values = (CountedValue(value) for value in self.values)
+
+        sorted_values = [value.value for value in external_sort(values, buffer_size=50)]
+
+        self.assertEqual(sorted(self.values), sorted_values)
+        self.assertLessEqual(CountedValue.max_count, 50)
+
+    def test_stable(self):
+        key = itemgetter(0)
+        self.assertEqual(
+            sorted(self.records, key=key),
+            list(external_sort(self.records, key=key, buffer_size=100)))
+        self.assertEqual(
+            sorted(self.records, key=key, reverse=True),
+            list(external_sort(self.records, key=key, reverse=True, buffer_size=100)))
+
+    def test_parallel(self):
+        key = itemgetter(0)
+        self.assertEqual(
+            sorted(self.records, key=key),
+            list(external_sort(self.records, key=key, buffer_size=99, max_workers=2)))
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -2,6 +2,7 @@ import unittest
 
 from utils.comparable import comparable
 from utils.comparable import Comparable
+from utils.comparable import sort_key
 
 
 class ComparableTestCase(unittest.TestCase):
@@ -73,6 +74,117 @@ class ComparableTestCase(unittest.TestCase):
                 return self._value - other._value
         self._test_compare_methods(ComparableClass)
 
+    def test_metaclass_with_overridden_compare(self):
+        class BaseClass(object, metaclass=Comparable):
+            def __init__(self, value):
+                self._value = value
+            def compare(self, other):
+                return 0
+        class ComparableClass(BaseClass):
+            def compare(self, other):
+                return self._value - other._value
+        self._test_compare_methods(ComparableClass)
+
+    def test_decorator_without_args_and_with_overridden_compare(self):
+        @comparable
+        class BaseClass(object):
+            def __init__(self, value):
+                self._value = value
+            def compare(self, other):
+                return 0
+        class ComparableClass(BaseClass):
+            def compare(self, other):
+                return self._value - other._value
+        self._test_compare_methods(ComparableClass)
+
+    def test_generated_method_names(self):
+        @comparable(key="_value")
+        class ComparableClass(object):
+            def __init__(self, value):
+                self._value = value
+        self.assertEqual("__lt__", ComparableClass.__lt__.__name__)
+        self.assertTrue(ComparableClass.__lt__.__qualname__.endswith("ComparableClass.__lt__"))
+
+    def test_decorator_with_invalid_key(self):
+        with self.assertRaises(ValueError):
+            @comparable(key="value()")
+            class ComparableClass(object):
+                pass
+
+    def test_metaclass_with_key(self):
+        class ComparableClass(object, metaclass=Comparable, key="_value"):
+            __slots__ = ('_value', )
+            def __init__(self, value):
+                self._value = value
+        self._test_compare_methods(ComparableClass)
+        self._test_key_methods(ComparableClass)
+
+    def test_metaclass_with_inherited_key(self):
+        class BaseClass(object, metaclass=Comparable, key="sort_key"):
+            def __init__(self, value):
+                self._value = value
+            def sort_key(self):
+                return self._value
+        class ComparableClass(BaseClass):
+            pass
+        self._test_compare_methods(ComparableClass)
+        self._test_key_methods(ComparableClass)
+        self.assertEqual(True, BaseClass(1) == ComparableClass(1))
+        self.assertEqual(True, ComparableClass(1) < BaseClass(2))
+
+    def test_decorator_with_key_attribute(self):
+        @comparable(key="_value")
+        class ComparableClass(object):
+            __slots__ = ('_value', )
+            def __init__(self, value):
+                self._value = value
+        self._test_compare_methods(ComparableClass)
+        self._test_key_methods(ComparableClass)
+
+    def test_decorator_with_key_property(self):
+        @comparable(key="value")
+        class ComparableClass(object):
+            def __init__(self, value):
+                self._value = value
+            @property
+            def value(self):
+                return self._value
+        self._test_compare_methods(ComparableClass)
+        self._test_key_methods(ComparableClass)
+
+    def test_decorator_with_key_method(self):
+        @comparable(key="sort_key")
+        class ComparableClass(object):
+            def __init__(self, value):
+                self._value = value
+            def sort_key(self):
+                return (self._value, )
+        self._test_compare_methods(ComparableClass)
+        self._test_key_methods(ComparableClass)
+
+    def test_sort_key_without_key(self):
+        @comparable
+        class ComparableClass(object):
+            def compare(self, other):
+                return 0
+        with self.assertRaises(TypeError):
+            sort_key(ComparableClass)
+
+    def _test_key_methods(self, comparable_class):
+        self.assertEqual(hash(comparable_class(1)), hash(comparable_class(1)))
+        self.assertEqual(1, len({comparable_class(1), comparable_class(1)}))
+
+        self.assertEqual(False, comparable_class(1) == 1)
+        self.assertEqual(True, comparable_class(1) != 1)
+        self.assertIs(NotImplemented, comparable_class(1).__lt__(1))
+        with self.assertRaises(TypeError):
+            comparable_class(1) < 1
+
+        values = [comparable_class(value) for value in (3, 1, 2)]
+        self.assertEqual(
+            [1, 2, 3],
+            [value._value for value in sorted(values, key=sort_key(comparable_class))])
+
     def _test_compare_methods(self, comparable_class):
         self.assertEqual(False, comparable_class(0) == comparable_class(1))
         self.assertEqual(True, comparable_class(1) == comparable_class(1))
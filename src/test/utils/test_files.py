@@ -0,0 +1,699 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+import utils.files
+from utils.files import FileIndex
+from utils.files import FollowedLine
+from utils.files import LineMatch
+from utils.files import PathPatterns
+from utils.files import find_duplicate_files
+from utils.files import follow_lines
+from utils.files import generate_directory_paths
+from utils.files import generate_directory_paths_async
+from utils.files import generate_entries
+from utils.files import generate_entries_concurrently
+from utils.files import generate_file_paths
+from utils.files import generate_file_paths_async
+from utils.files import generate_paths
+from utils.files import generate_paths_async
+from utils.files import grep_file
+from utils.files import hash_file
+from utils.files import read_chunks_async
+from utils.files import scan_lines
+from utils.files import write_file_atomically
+
+
+class FilesTestCase(unittest.TestCase):
+    """
+        以下の構成のディレクトリに対してテストする.
+
+            a.txt
+            b/
+            b/c.txt
+            b/d/
+            b/d/e.txt
+            f -> b (シンボリックリンク)
+    """
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root_path = self.temporary_directory.name
+        self.write_file("a.txt", "a")
+        self.write_file("b/c.txt", "cc")
+        self.write_file("b/d/e.txt", "eee")
+        os.symlink(self.path("b"), self.path("f"))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def path(self, relative_path):
+        return os.path.join(self.root_path, relative_path)
+
+    def write_file(self, relative_path, content):
+        os.makedirs(os.path.dirname(self.path(relative_path)), exist_ok=True)
+        with open(self.path(relative_path), "w") as file:
+            file.write(content)
+
+    def relative_paths(self, paths):
+        return sorted(os.path.relpath(path, self.root_path) for path in paths)
+
+
+class GeneratePathsTestCase(FilesTestCase):
+
+    def test_generate_paths(self):
+        self.assertEqual(
+            ["a.txt", "b", "b/c.txt", "b/d", "b/d/e.txt", "f"],
+            self.relative_paths(generate_paths(self.root_path)))
+
+    def test_generate_file_paths(self):
+        self.assertEqual(
+            ["a.txt", "b/c.txt", "b/d/e.txt"],
+            self.relative_paths(generate_file_paths(self.root_path)))
+
+    def test_generate_directory_paths(self):
+        self.assertEqual(
+            ["b", "b/d", "f"],
+            self.relative_paths(generate_directory_paths(self.root_path)))
+
+    def test_include(self):
+        self.assertEqual(
+            ["b/c.txt"],
+            self.relative_paths(generate_file_paths(self.root_path, include=["b/*.txt"])))
+        self.assertEqual(
+            ["b/c.txt", "b/d/e.txt"],
+            self.relative_paths(generate_file_paths(self.root_path, include=["b/**/*.txt"])))
+
+    def test_exclude(self):
+        self.assertEqual(
+            ["a.txt", "f"],
+            self.relative_paths(generate_paths(self.root_path, exclude=["b/"])))
+        self.assertEqual(
+            ["a.txt", "b", "b/c.txt", "f"],
+            self.relative_paths(generate_paths(self.root_path, exclude=PathPatterns(["d"]))))
+        self.assertEqual(
+            ["a.txt", "b", "b/d", "f"],
+            self.relative_paths(generate_paths(self.root_path, exclude=["*.txt", "!/a.txt", "/b/d/*"])))
+
+    def test_excluded_directories_are_pruned(self):
+        matched_paths = []
+
+        class RecordingPathPatterns(PathPatterns):
+            def match(self, path, is_directory=False):
+                matched_paths.append(path)
+                return super().match(path, is_directory)
+
+        self.assertEqual(
+            ["a.txt", "b/c.txt"],
+            self.relative_paths(generate_file_paths(self.root_path, exclude=RecordingPathPatterns(["d/"]))))
+        self.assertNotIn("b/d/e.txt", matched_paths)
+
+
+class GeneratePathsAsyncTestCase(FilesTestCase):
+
+    def collect(self, generator):
+        async def collect():
+            return [path async for path in generator]
+        return self.relative_paths(asyncio.run(collect()))
+
+    def test_generate_paths_async(self):
+        for max_pending, batch_size in ((1, 1), (1, 16), (64, 1)):
+            self.assertEqual(
+                ["a.txt", "b", "b/c.txt", "b/d", "b/d/e.txt", "f"],
+                self.collect(generate_paths_async(
+                    self.root_path,
+                    max_pending=max_pending,
+                    batch_size=batch_size)))
+
+    def test_generate_file_paths_async(self):
+        self.assertEqual(
+            ["a.txt", "b/c.txt", "b/d/e.txt"],
+            self.collect(generate_file_paths_async(self.root_path)))
+        self.assertEqual(
+            ["a.txt", "b/c.txt"],
+            self.collect(generate_file_paths_async(self.root_path, exclude=["d/"])))
+
+    def test_generate_directory_paths_async(self):
+        self.assertEqual(
+            ["b", "b/d", "f"],
+            self.collect(generate_directory_paths_async(self.root_path)))
+
+    def test_value_error_raised_when_invalid_arguments_passed(self):
+        with self.assertRaises(ValueError):
+            self.collect(generate_paths_async(self.root_path, max_pending=0))
+        with self.assertRaises(ValueError):
+            self.collect(generate_paths_async(self.root_path, batch_size=0))
+
+
+class ReadChunksAsyncTestCase(FilesTestCase):
+
+    def read_chunks(self, relative_path, **kwargs):
+        async def read_chunks():
+            return [chunk async for chunk in read_chunks_async(self.path(relative_path), **kwargs)]
+        return asyncio.run(read_chunks())
+
+    def test(self):
+        self.write_file("g.txt", "0123456789")
+        self.assertEqual([b"0123456789"], self.read_chunks("g.txt"))
+        self.assertEqual([b"0123", b"4567", b"89"], self.read_chunks("g.txt", chunk_size=4))
+        self.assertEqual([b"01234", b"56789"], self.read_chunks("g.txt", chunk_size=5))
+
+    def test_empty_file(self):
+        self.write_file("g.txt", "")
+        self.assertEqual([], self.read_chunks("g.txt"))
+
+    def test_value_error_raised_when_invalid_chunk_size_passed(self):
+        with self.assertRaises(ValueError):
+            self.read_chunks("a.txt", chunk_size=0)
+
+
+class PathPatternsTestCase(unittest.TestCase):
+
+    def assertMatch(self, patterns, path, is_directory=False):
+        self.assertTrue(PathPatterns(patterns).match(path, is_directory), (patterns, path))
+
+    def assertNotMatch(self, patterns, path, is_directory=False):
+        self.assertFalse(PathPatterns(patterns).match(path, is_directory), (patterns, path))
+
+    def test_empty(self):
+        self.assertNotMatch([], "a")
+        self.assertNotMatch(["", "# comment"], "a")
+
+    def test_name(self):
+        self.assertMatch(["a"], "a")
+        self.assertMatch(["a"], "b/a")
+        self.assertMatch(["a"], "a", is_directory=True)
+        self.assertNotMatch(["a"], "ab")
+        self.assertNotMatch(["a"], "a/b")
+
+    def test_anchored(self):
+        self.assertMatch(["/a"], "a")
+        self.assertNotMatch(["/a"], "b/a")
+        self.assertMatch(["a/b"], "a/b")
+        self.assertNotMatch(["a/b"], "c/a/b")
+
+    def test_directory_only(self):
+        self.assertMatch(["a/"], "a", is_directory=True)
+        self.assertMatch(["a/"], "b/a", is_directory=True)
+        self.assertNotMatch(["a/"], "a")
+
+    def test_wildcards(self):
+        self.assertMatch(["*.py"], "a.py")
+        self.assertMatch(["*.py"], "a/b.py")
+        self.assertNotMatch(["*.py"], "a.pyc")
+        self.assertMatch(["a?c"], "abc")
+        self.assertNotMatch(["a?c"], "a/c")
+        self.assertMatch(["/*.py"], "a.py")
+        self.assertNotMatch(["/*.py"], "a/b.py")
+        self.assertMatch(["*.py[cod]"], "a.pyc")
+        self.assertNotMatch(["*.py[cod]"], "a.pyx")
+        self.assertMatch(["*.py[!cod]"], "a.pyx")
+        self.assertNotMatch(["*.py[!cod]"], "a.pyc")
+        self.assertMatch(["[]]"], "]")
+
+    def test_double_asterisks(self):
+        self.assertMatch(["**/a"], "a")
+        self.assertMatch(["**/a"], "b/c/a")
+        self.assertMatch(["a/**"], "a/b")
+        self.assertMatch(["a/**"], "a/b/c")
+        self.assertNotMatch(["a/**"], "a")
+        self.assertMatch(["a/**/b"], "a/b")
+        self.assertMatch(["a/**/b"], "a/x/y/b")
+        self.assertNotMatch(["a/**/b"], "x/a/b")
+
+    def test_negation(self):
+        self.assertNotMatch(["*.txt", "!a.txt"], "a.txt")
+        self.assertMatch(["*.txt", "!a.txt"], "b.txt")
+        self.assertMatch(["!a.txt", "*.txt"], "a.txt")
+        self.assertMatch(["\\!a"], "!a")
+        self.assertMatch(["\\#a"], "#a")
+
+
+class GenerateEntriesTestCase(FilesTestCase):
+
+    def generate_relative_paths(self, **kwargs):
+        entries = generate_entries(self.root_path, **kwargs)
+        return self.relative_paths(entry.path for entry in entries)
+
+    def test(self):
+        self.assertEqual(
+            ["a.txt", "b", "b/c.txt", "b/d", "b/d/e.txt", "f"],
+            self.generate_relative_paths())
+
+    def test_entries_have_stat(self):
+        sizes = {
+            entry.name: entry.stat().st_size
+            for entry in generate_entries(self.root_path)
+            if entry.is_file()
+        }
+        self.assertEqual({"a.txt": 1, "c.txt": 2, "e.txt": 3}, sizes)
+
+    def test_prune(self):
+        self.assertEqual(
+            ["a.txt", "b", "f"],
+            self.generate_relative_paths(prune=lambda entry: entry.name == "b"))
+
+    def test_max_depth(self):
+        self.assertEqual(
+            ["a.txt", "b", "f"],
+            self.generate_relative_paths(max_depth=1))
+        self.assertEqual(
+            ["a.txt", "b", "b/c.txt", "b/d", "f"],
+            self.generate_relative_paths(max_depth=2))
+        with self.assertRaises(ValueError):
+            self.generate_relative_paths(max_depth=0)
+
+    def test_follow_symlinks(self):
+        # b と f は同じディレクトリなので, いずれか一方だけをスキャンする.
+        relative_paths = self.generate_relative_paths(follow_symlinks=True)
+        self.assertIn(
+            relative_paths,
+            [
+                ["a.txt", "b", "b/c.txt", "b/d", "b/d/e.txt", "f"],
+                ["a.txt", "b", "f", "f/c.txt", "f/d", "f/d/e.txt"],
+            ])
+
+    def test_follow_symlinks_with_loop(self):
+        os.symlink(self.path("b"), self.path("b/d/g"))
+        relative_paths = self.generate_relative_paths(follow_symlinks=True)
+        self.assertEqual(7, len(relative_paths))
+
+    def test_onerror(self):
+        errors = []
+        list(generate_entries(self.path("missing"), onerror=errors.append))
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], FileNotFoundError)
+
+
+class GenerateEntriesConcurrentlyTestCase(FilesTestCase):
+
+    def test(self):
+        for max_workers in (1, 4):
+            for max_queue_size in (1, 64):
+                entries = generate_entries_concurrently(
+                    self.root_path,
+                    max_workers=max_workers,
+                    max_queue_size=max_queue_size)
+                self.assertEqual(
+                    ["a.txt", "b", "b/c.txt", "b/d", "b/d/e.txt", "f"],
+                    self.relative_paths(entry.path for entry in entries))
+
+    def test_ordered(self):
+        for max_workers in (1, 4):
+            for max_queue_size in (1, 64):
+                entries = generate_entries_concurrently(
+                    self.root_path,
+                    max_workers=max_workers,
+                    max_queue_size=max_queue_size,
+                    ordered=True)
+                self.assertEqual(
+                    ["a.txt", "b", "f", "c.txt", "d", "e.txt"],
+                    [entry.name for entry in entries])
+
+    def test_prune_and_max_depth(self):
+        entries = generate_entries_concurrently(
+            self.root_path,
+            prune=lambda entry: entry.name == "d",
+            max_depth=2)
+        self.assertEqual(
+            ["a.txt", "b", "b/c.txt", "b/d", "f"],
+            self.relative_paths(entry.path for entry in entries))
+
+    def test_error_raised_in_worker_is_propagated(self):
+        def prune(entry):
+            raise RuntimeError
+        with self.assertRaises(RuntimeError):
+            list(generate_entries_concurrently(self.root_path, prune=prune))
+
+    def test_close_before_exhausted(self):
+        entries = generate_entries_concurrently(self.root_path, max_queue_size=1)
+        next(entries)
+        entries.close()
+
+    def test_value_error_raised_when_invalid_arguments_passed(self):
+        with self.assertRaises(ValueError):
+            list(generate_entries_concurrently(self.root_path, max_workers=0))
+        with self.assertRaises(ValueError):
+            list(generate_entries_concurrently(self.root_path, max_queue_size=0))
+        with self.assertRaises(ValueError):
+            list(generate_entries_concurrently(self.root_path, max_depth=0))
+
+
+class FileIndexTestCase(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index_directory = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.index_directory.name, "index")
+        os.remove(self.path("f"))
+        # 前回のスキャンより前に更新されたことにする.
+        for relative_path in ("a.txt", "b/c.txt", "b/d/e.txt", "b/d", "b", ""):
+            os.utime(self.path(relative_path), ns=(10 ** 9, 10 ** 9))
+
+    def tearDown(self):
+        self.index_directory.cleanup()
+        super().tearDown()
+
+    def scan(self, **kwargs):
+        changes = FileIndex(self.root_path, self.index_path).scan(**kwargs)
+        return tuple(
+            self.relative_paths(entry.path for entry in entries)
+            for entries in changes)
+
+    def test_first_scan(self):
+        self.assertEqual(
+            (["a.txt", "b/c.txt", "b/d/e.txt"], [], []),
+            self.scan())
+        self.assertEqual(
+            ["a.txt", "b/c.txt", "b/d/e.txt"],
+            self.relative_paths(
+                entry.path for entry in FileIndex(self.root_path, self.index_path).entries))
+
+    def test_no_changes(self):
+        self.scan()
+        self.assertEqual(([], [], []), self.scan())
+
+    def test_added_and_removed(self):
+        self.scan()
+        os.remove(self.path("b/c.txt"))
+        self.write_file("b/d/g.txt", "g")
+        self.assertEqual((["b/d/g.txt"], [], ["b/c.txt"]), self.scan())
+        self.assertEqual(([], [], []), self.scan())
+
+    def test_modified(self):
+        self.scan()
+        self.write_file("b/d/e.txt", "modified")
+        self.assertEqual(([], ["b/d/e.txt"], []), self.scan())
+
+    def test_unchanged_directories_are_not_read(self):
+        self.scan()
+        # ディレクトリの mtime を戻すと, 追加したファイルは検出されない.
+        self.write_file("b/d/g.txt", "g")
+        os.utime(self.path("b/d"), ns=(10 ** 9, 10 ** 9))
+        self.assertEqual(([], [], []), self.scan())
+
+    def test_modified_not_detected_without_check_files(self):
+        self.scan()
+        self.write_file("b/d/e.txt", "modified")
+        self.assertEqual(([], [], []), self.scan(check_files=False))
+
+    def test_removed_directory(self):
+        self.scan()
+        os.remove(self.path("b/d/e.txt"))
+        os.rmdir(self.path("b/d"))
+        self.assertEqual(([], [], ["b/d/e.txt"]), self.scan())
+
+    def test_broken_index_file_is_ignored(self):
+        root_path = os.path.abspath(self.root_path)
+        contents = [
+            b"broken",
+            b"\xff",
+            # dict 以外の値.
+            json.dumps(["version", 2]),
+            json.dumps({"version": 2, "root_path": root_path}),
+            # 形式が異なる記録.
+            json.dumps({"version": 2, "root_path": root_path, "files": {"a.txt": 1}, "directories": {}}),
+            json.dumps({"version": 2, "root_path": root_path, "files": {}, "directories": {"": [None, "a", []]}}),
+            # 以前の形式 (pickle).
+            b"\x80\x04\x95",
+        ]
+        for content in contents:
+            with self.subTest(content=content):
+                write_file_atomically(self.index_path, content)
+                self.assertEqual(
+                    (["a.txt", "b/c.txt", "b/d/e.txt"], [], []),
+                    self.scan())
+
+
+class FindDuplicateFilesTestCase(FilesTestCase):
+
+    def find_duplicate_files(self, **kwargs):
+        duplicates = find_duplicate_files(generate_file_paths(self.root_path), **kwargs)
+        return sorted(self.relative_paths(file_paths) for file_paths in duplicates)
+
+    def test(self):
+        self.write_file("g/a.txt", "a")
+        self.write_file("g/h.txt", "x")
+        self.write_file("g/c.txt", "cc")
+        self.assertEqual(
+            [["a.txt", "g/a.txt"], ["b/c.txt", "g/c.txt"]],
+            self.find_duplicate_files())
+
+    def test_large_files(self):
+        self.write_file("g/1.txt", "a" * 100 + "b" + "a" * 100)
+        self.write_file("g/2.txt", "a" * 100 + "c" + "a" * 100)
+        self.write_file("g/3.txt", "a" * 100 + "b" + "a" * 100)
+        self.assertEqual(
+            [["g/1.txt", "g/3.txt"]],
+            self.find_duplicate_files(block_size=16))
+
+    def test_hard_links_are_not_duplicates(self):
+        os.link(self.path("a.txt"), self.path("g.txt"))
+        self.assertEqual([], self.find_duplicate_files())
+
+    def test_files_with_unique_size_are_not_read(self):
+        self.write_file("g.txt", "g")
+        read_paths = []
+        original = utils.files._hash_file_edges
+        def hash_file_edges(file_path, **kwargs):
+            read_paths.append(file_path)
+            return original(file_path, **kwargs)
+        with unittest.mock.patch("utils.files._hash_file_edges", hash_file_edges):
+            self.assertEqual([], self.find_duplicate_files())
+        self.assertEqual(["a.txt", "g.txt"], self.relative_paths(read_paths))
+
+    def test_sizes_are_hashed_concurrently(self):
+        self.write_file("g/1.txt", "gggg")
+        self.write_file("g/2.txt", "gggg")
+        self.write_file("g/3.txt", "hhhhh")
+        self.write_file("g/4.txt", "hhhhh")
+        # サイズごとに結果を待つ場合は, 2 つのファイルしか同時に読み込まれずにタイムアウトする.
+        barrier = threading.Barrier(4, timeout=5)
+        original = utils.files._hash_file_edges
+        def hash_file_edges(file_path, **kwargs):
+            barrier.wait()
+            return original(file_path, **kwargs)
+        with unittest.mock.patch("utils.files._hash_file_edges", hash_file_edges):
+            self.assertEqual(
+                [["g/1.txt", "g/2.txt"], ["g/3.txt", "g/4.txt"]],
+                self.find_duplicate_files(max_workers=4))
+
+    def test_value_error_raised_when_invalid_block_size_passed(self):
+        with self.assertRaises(ValueError):
+            find_duplicate_files([], block_size=0)
+
+
+class HashFileTestCase(FilesTestCase):
+
+    def test(self):
+        self.write_file("g.txt", "a")
+        self.assertEqual(hash_file(self.path("a.txt")), hash_file(self.path("g.txt")))
+        self.assertNotEqual(hash_file(self.path("a.txt")), hash_file(self.path("b/c.txt")))
+        self.assertEqual(
+            hash_file(self.path("a.txt"), algorithm="sha256"),
+            hash_file(self.path("g.txt"), algorithm="sha256"))
+
+
+class ScanLinesTestCase(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lines = ["line {}: {}".format(i, "error" if i % 7 == 0 else "ok") for i in range(100)]
+        self.write_file("g.log", "\n".join(self.lines))
+        self.expected = [
+            LineMatch(sum(len(line) + 1 for line in self.lines[:i]), line.encode())
+            for i, line in enumerate(self.lines)
+            if line.endswith("error")
+        ]
+
+    def test_grep_file(self):
+        for chunk_size in (1, 10, 100, 1 << 20):
+            for pattern in ("error", b"error$", re.compile("ERROR", re.IGNORECASE)):
+                self.assertEqual(
+                    self.expected,
+                    list(grep_file(self.path("g.log"), pattern, chunk_size=chunk_size, use_threads=True)))
+
+    def test_grep_file_with_trailing_newline(self):
+        self.write_file("g.log", "abc\ndef\n")
+        for chunk_size in (1, 3, 4, 1 << 20):
+            self.assertEqual(
+                [],
+                list(grep_file(self.path("g.log"), rb"^\s*$", chunk_size=chunk_size, use_threads=True)))
+            self.assertEqual(
+                [LineMatch(0, b"abc"), LineMatch(4, b"def")],
+                list(grep_file(self.path("g.log"), "$", chunk_size=chunk_size, use_threads=True)))
+
+    def test_grep_file_with_blank_lines(self):
+        content = "abc\n\nabcdefg\n\n\nxyz\n\n"
+        self.write_file("g.log", content)
+        expected = [
+            LineMatch(offset, b"")
+            for offset in range(len(content))
+            if content[offset] == "\n" and (offset == 0 or content[offset - 1] == "\n")
+        ]
+        self.assertEqual([4, 13, 14, 19], [line_match.offset for line_match in expected])
+        for chunk_size in (1, 2, 3, 4, 5, 8, 1 << 20):
+            for pattern in ("^$", rb"^\s*$"):
+                self.assertEqual(
+                    expected,
+                    list(grep_file(self.path("g.log"), pattern, chunk_size=chunk_size, use_threads=True)),
+                    msg=(chunk_size, pattern))
+
+    def test_grep_file_without_trailing_newline(self):
+        self.write_file("g.log", "abc\ndef")
+        for chunk_size in (1, 3, 4, 1 << 20):
+            self.assertEqual(
+                [LineMatch(0, b"abc"), LineMatch(4, b"def")],
+                list(grep_file(self.path("g.log"), "$", chunk_size=chunk_size, use_threads=True)))
+
+    def test_grep_file_with_processes(self):
+        self.assertEqual(
+            self.expected,
+            list(grep_file(self.path("g.log"), "^line [0-9]+: error", chunk_size=100, max_workers=2)))
+
+    def test_scan_lines(self):
+        for chunk_size in (1, 10, 100, 1 << 20):
+            self.assertEqual(
+                self.expected,
+                list(scan_lines(
+                    self.path("g.log"),
+                    lambda line: line.endswith(b"error"),
+                    chunk_size=chunk_size,
+                    use_threads=True)))
+
+    def test_empty_file(self):
+        self.write_file("h.log", "")
+        self.assertEqual([], list(grep_file(self.path("h.log"), "")))
+        self.assertEqual([], list(scan_lines(self.path("h.log"), bool)))
+
+    def test_empty_lines(self):
+        self.write_file("h.log", "\n\na\n\n")
+        self.assertEqual(
+            [LineMatch(0, b""), LineMatch(1, b""), LineMatch(2, b"a"), LineMatch(4, b"")],
+            list(grep_file(self.path("h.log"), "^")))
+        self.assertEqual(
+            [LineMatch(0, b""), LineMatch(1, b""), LineMatch(2, b"a"), LineMatch(4, b"")],
+            list(scan_lines(self.path("h.log"), lambda line: True, chunk_size=1, use_threads=True)))
+
+    def test_value_error_raised_when_invalid_chunk_size_passed(self):
+        with self.assertRaises(ValueError):
+            list(grep_file(self.path("g.log"), "error", chunk_size=0))
+
+
+class FollowLinesTestCase(FilesTestCase):
+    """
+        inotify で待機する場合とポーリングする場合のそれぞれについてテストする.
+    """
+
+    def append(self, relative_path, content):
+        with open(self.path(relative_path), "a") as file:
+            file.write(content)
+
+    def follow_lines(self, relative_path, use_inotify, **kwargs):
+        return follow_lines(
+            self.path(relative_path),
+            min_interval=0.001,
+            max_interval=0.01,
+            use_inotify=use_inotify,
+            **kwargs)
+
+    def test(self):
+        for use_inotify in (True, False):
+            lines = self.follow_lines(str(use_inotify), use_inotify)
+            self.append(str(use_inotify), "a\nb\n")
+            self.assertEqual(FollowedLine(b"a", 2), next(lines))
+            self.assertEqual(FollowedLine(b"b", 4), next(lines))
+            self.append(str(use_inotify), "c")
+            self.append(str(use_inotify), "d\n")
+            self.assertEqual(FollowedLine(b"cd", 7), next(lines))
+            lines.close()
+
+    def test_offset(self):
+        for use_inotify in (True, False):
+            self.write_file("g.log", "a\nb\n")
+            lines = self.follow_lines("g.log", use_inotify, offset=2)
+            self.assertEqual(FollowedLine(b"b", 4), next(lines))
+            lines.close()
+
+    def test_offset_larger_than_file_size(self):
+        for use_inotify in (True, False):
+            self.write_file("g.log", "a\n")
+            lines = self.follow_lines("g.log", use_inotify, offset=4)
+            self.assertEqual(FollowedLine(b"a", 2), next(lines))
+            lines.close()
+
+    def test_rotation(self):
+        for use_inotify in (True, False):
+            lines = self.follow_lines(str(use_inotify), use_inotify)
+            self.append(str(use_inotify), "a\nb")
+            self.assertEqual(FollowedLine(b"a", 2), next(lines))
+            os.rename(self.path(str(use_inotify)), self.path(str(use_inotify) + ".1"))
+            self.append(str(use_inotify), "c\n")
+            self.assertEqual(FollowedLine(b"b", 3), next(lines))
+            self.assertEqual(FollowedLine(b"c", 2), next(lines))
+            lines.close()
+
+    def test_truncation(self):
+        for use_inotify in (True, False):
+            self.write_file("g.log", "a\nb\n")
+            lines = self.follow_lines("g.log", use_inotify)
+            self.assertEqual(FollowedLine(b"a", 2), next(lines))
+            self.assertEqual(FollowedLine(b"b", 4), next(lines))
+            self.write_file("g.log", "c\n")
+            self.assertEqual(FollowedLine(b"c", 2), next(lines))
+            lines.close()
+
+    def test_stop(self):
+        for use_inotify in (True, False):
+            stop = threading.Event()
+            self.write_file("g.log", "a\n")
+            lines = self.follow_lines("g.log", use_inotify, stop=stop)
+            self.assertEqual(FollowedLine(b"a", 2), next(lines))
+            threading.Timer(0.05, stop.set).start()
+            self.assertEqual([], list(lines))
+
+
+class WriteFileAtomicallyTestCase(FilesTestCase):
+
+    def test(self):
+        write_file_atomically(self.path("g/h.txt"), "text")
+        with open(self.path("g/h.txt")) as file:
+            self.assertEqual("text", file.read())
+
+        write_file_atomically(self.path("g/h.txt"), b"bytes")
+        with open(self.path("g/h.txt"), "rb") as file:
+            self.assertEqual(b"bytes", file.read())
+
+        self.assertEqual(["h.txt"], os.listdir(self.path("g")))
+
+    def test_permissions_are_kept(self):
+        os.chmod(self.path("a.txt"), 0o640)
+        write_file_atomically(self.path("a.txt"), "text")
+        self.assertEqual(0o640, os.stat(self.path("a.txt")).st_mode & 0o777)
+
+    def test_umask_applied_to_new_file(self):
+        umask = os.umask(0o027)
+        try:
+            write_file_atomically(self.path("g.txt"), "text")
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o640, os.stat(self.path("g.txt")).st_mode & 0o777)
+
+    def test_temporary_file_removed_when_chmod_failed(self):
+        descriptors = os.listdir("/proc/self/fd")
+        with unittest.mock.patch("os.fchmod", side_effect=PermissionError):
+            with self.assertRaises(PermissionError):
+                write_file_atomically(self.path("a.txt"), "text")
+        self.assertEqual(descriptors, os.listdir("/proc/self/fd"))
+        self.assertEqual(["a.txt", "b", "f"], sorted(os.listdir(self.root_path)))
+        with open(self.path("a.txt")) as file:
+            self.assertEqual("a", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
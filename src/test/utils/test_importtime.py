@@ -0,0 +1,105 @@
+import unittest
+
+from utils.importtime import ImportTime
+from utils.importtime import find_exceeded_budgets
+from utils.importtime import find_import_time
+from utils.importtime import format_import_times
+from utils.importtime import parse_import_times
+from utils.importtime import profile_imports
+from utils.importtime import profile_modules
+
+
+OUTPUT = """
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       200 |        300 | _frozen_importlib_external
+import time:        10 |         10 |     _abc
+import time:        20 |         30 |   abc
+import time:      1000 |       1000 |   yaml
+import time:        50 |       1080 | app
+""".strip().splitlines()
+
+
+class ParseImportTimesTestCase(unittest.TestCase):
+
+    def test(self):
+        self.assertEqual(
+            [
+                ImportTime("_frozen_importlib_external", 200, 300, [
+                    ImportTime("_io", 100, 100, []),
+                ]),
+                ImportTime("app", 50, 1080, [
+                    ImportTime("abc", 20, 30, [
+                        ImportTime("_abc", 10, 10, []),
+                    ]),
+                    ImportTime("yaml", 1000, 1000, []),
+                ]),
+            ],
+            parse_import_times(OUTPUT))
+
+    def test_empty(self):
+        self.assertEqual([], parse_import_times([]))
+
+    def test_profile_imports(self):
+        import_time = find_import_time(profile_imports("json"), "json")
+        self.assertEqual("json", import_time.name)
+        self.assertIsNotNone(find_import_time(import_time.children, "json.decoder"))
+
+
+class ProfileModulesTestCase(unittest.TestCase):
+
+    def test(self):
+        import_times, not_measured = profile_modules(["json", "sys"])
+        self.assertEqual(["json"], [import_time.name for import_time in import_times])
+        # sys はインタプリタの起動時に import されるため, 計測できない.
+        self.assertEqual(["sys"], not_measured)
+
+
+class FindImportTimeTestCase(unittest.TestCase):
+
+    def test(self):
+        roots = parse_import_times(OUTPUT)
+        self.assertEqual(ImportTime("_abc", 10, 10, []), find_import_time(roots, "_abc"))
+        self.assertIsNone(find_import_time(roots, "box"))
+
+
+class FindExceededBudgetsTestCase(unittest.TestCase):
+
+    def test(self):
+        app, yaml = ImportTime("app", 50, 1080, []), ImportTime("yaml", 1000, 1000, [])
+        self.assertEqual([(app, 1)], find_exceeded_budgets([app, yaml], {"app": 1, "yaml": 1}))
+        self.assertEqual([], find_exceeded_budgets([app, yaml], {"app": 1.5}))
+        self.assertEqual(
+            [(app, 1), (yaml, 0.5)],
+            find_exceeded_budgets([app, yaml], {"app": 1}, default_budget=0.5))
+
+
+class FormatImportTimesTestCase(unittest.TestCase):
+
+    def test(self):
+        self.assertEqual(
+            [
+                "       1.1 ms        0.1 ms  app",
+                "       1.0 ms        1.0 ms    yaml",
+                "       0.0 ms        0.0 ms    abc",
+                "       0.0 ms        0.0 ms      _abc",
+                "       0.3 ms        0.2 ms  _frozen_importlib_external",
+                "       0.1 ms        0.1 ms    _io",
+            ],
+            list(format_import_times(parse_import_times(OUTPUT))))
+
+    def test_min_cumulative_us(self):
+        self.assertEqual(
+            ["app", "yaml", "_frozen_importlib_external"],
+            [
+                line.split()[-1]
+                for line in format_import_times(parse_import_times(OUTPUT), min_cumulative_us=300)
+            ])
+
+    def test_max_depth(self):
+        self.assertEqual(
+            ["app", "_frozen_importlib_external"],
+            [
+                line.split()[-1]
+                for line in format_import_times(parse_import_times(OUTPUT), max_depth=0)
+            ])
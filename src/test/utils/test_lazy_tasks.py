@@ -0,0 +1,185 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+import unittest.mock
+from importlib import import_module
+
+from invoke import Context
+
+from utils.lazy_tasks import load_collection
+from utils.lazy_tasks import scan_tasks
+
+
+class LazyTasksTestCase(unittest.TestCase):
+    """
+        以下の構成のディレクトリに対してテストする.
+
+            lazy_fixture_tasks.py
+            lazy_fixture_namespace.py
+            lazy_fixture_dynamic.py
+    """
+
+    MODULE_NAMES = ("lazy_fixture_tasks", "lazy_fixture_namespace", "lazy_fixture_dynamic")
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.scan_dir = os.path.join(self.temporary_directory.name, "tasks")
+        self.manifest_path = os.path.join(self.temporary_directory.name, "manifest.json")
+        self.write_file("lazy_fixture_tasks.py", '''
+            """
+                タスク.
+            """
+            from invoke import task
+
+            CALLS = []
+
+
+            @task(name="hello", default=True, iterable=["names"])
+            def say_hello(context, names, greeting="hello"):
+                """
+                    挨拶する.
+                """
+                CALLS.append((names, greeting))
+                return len(CALLS)
+
+
+            @task
+            def bye(context):
+                pass
+
+
+            def helper():
+                pass
+        ''')
+        self.write_file("lazy_fixture_namespace.py", '''
+            from invoke import Collection
+            from invoke import task
+
+
+            @task
+            def named(context):
+                pass
+
+
+            @task
+            def hidden(context):
+                pass
+
+
+            ns = Collection("renamed", named)
+        ''')
+        self.write_file("lazy_fixture_dynamic.py", '''
+            from invoke import Collection
+            from invoke import task
+
+
+            @task
+            def dynamic(context):
+                pass
+
+
+            ns = Collection.from_module(__import__(__name__), name="dynamic")
+        ''')
+        # キャッシュは作成直後のファイルを記録しないため, 過去に更新されたことにする.
+        for file_name in os.listdir(self.scan_dir) + ["."]:
+            os.utime(os.path.join(self.scan_dir, file_name), ns=(10 ** 9, 10 ** 9))
+        sys.path.insert(0, self.scan_dir)
+
+    def tearDown(self):
+        sys.path.remove(self.scan_dir)
+        for module_name in self.MODULE_NAMES:
+            sys.modules.pop(module_name, None)
+        self.temporary_directory.cleanup()
+
+    def write_file(self, file_name, content):
+        os.makedirs(self.scan_dir, exist_ok=True)
+        with open(os.path.join(self.scan_dir, file_name), "w") as file:
+            file.write(textwrap.dedent(content).lstrip())
+
+    def test_load_collection(self):
+        collection = load_collection(self.scan_dir)
+
+        self.assertEqual(
+            ["dynamic.dynamic", "lazy-fixture-tasks.bye", "lazy-fixture-tasks.hello", "renamed.named"],
+            sorted(collection.task_names))
+        # 名前空間を動的に組み立てるモジュールだけ import する.
+        self.assertIn("lazy_fixture_dynamic", sys.modules)
+        self.assertNotIn("lazy_fixture_namespace", sys.modules)
+        self.assertNotIn("lazy_fixture_tasks", sys.modules)
+
+        task = collection["lazy-fixture-tasks"]
+        self.assertEqual("hello", task.name)
+        self.assertIn("挨拶する.", task.__doc__)
+        self.assertEqual(["names"], task.iterable)
+
+        # 引数は import したタスクと同じになる.
+        to_arguments = lambda task: [
+            (argument.name, argument.kind, argument.default, argument.positional)
+            for argument in task.get_arguments()
+        ]
+        self.assertEqual(
+            to_arguments(import_module("lazy_fixture_tasks").say_hello),
+            to_arguments(task))
+
+    def test_call(self):
+        task = load_collection(self.scan_dir)["lazy-fixture-tasks.hello"]
+
+        self.assertEqual(1, task(Context(), ["a"], greeting="hi"))
+        self.assertEqual([(["a"], "hi")], sys.modules["lazy_fixture_tasks"].CALLS)
+
+    def test_manifest(self):
+        load_collection(self.scan_dir, manifest_path=self.manifest_path)
+        self.assertTrue(os.path.isfile(self.manifest_path))
+
+        with unittest.mock.patch("utils.lazy_tasks.scan_tasks") as scan_tasks_mock:
+            collection = load_collection(self.scan_dir, manifest_path=self.manifest_path)
+        scan_tasks_mock.assert_not_called()
+        self.assertIn("lazy-fixture-tasks.hello", collection.task_names)
+
+    def test_manifest_modified(self):
+        load_collection(self.scan_dir, manifest_path=self.manifest_path)
+        self.write_file("lazy_fixture_tasks.py", '''
+            from invoke import task
+
+
+            @task
+            def renamed(context):
+                pass
+        ''')
+        os.utime(os.path.join(self.scan_dir, "lazy_fixture_tasks.py"), ns=(2 * 10 ** 9, 2 * 10 ** 9))
+
+        collection = load_collection(self.scan_dir, manifest_path=self.manifest_path)
+        self.assertIn("lazy-fixture-tasks.renamed", collection.task_names)
+        self.assertNotIn("lazy-fixture-tasks.hello", collection.task_names)
+
+    def test_scan_tasks(self):
+        module = scan_tasks(os.path.join(self.scan_dir, "lazy_fixture_tasks.py"))
+        self.assertIn("タスク.", module["doc"])
+        self.assertEqual(["say_hello", "bye"], [task["function"] for task in module["tasks"]])
+        self.assertEqual(
+            {"name": "hello", "default": True, "iterable": ["names"]},
+            module["tasks"][0]["options"])
+
+    def test_scan_tasks_not_literal(self):
+        self.write_file("lazy_fixture_tasks.py", '''
+            from invoke import task
+
+
+            @task
+            def clean(context):
+                pass
+
+
+            @task(pre=[clean])
+            def build(context):
+                pass
+        ''')
+        self.assertIsNone(scan_tasks(os.path.join(self.scan_dir, "lazy_fixture_tasks.py"))["tasks"])
+        self.assertIsNone(scan_tasks(os.path.join(self.scan_dir, "lazy_fixture_dynamic.py"))["tasks"])
+
+    def test_scan_tasks_namespace(self):
+        module = scan_tasks(os.path.join(self.scan_dir, "lazy_fixture_namespace.py"))
+        self.assertEqual("renamed", module["name"])
+        self.assertEqual(["named"], [task["function"] for task in module["tasks"]])
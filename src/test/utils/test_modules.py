@@ -0,0 +1,163 @@
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+from utils.modules import find_modules
+from utils.modules import lazy_import
+from utils.modules import to_module_name
+
+
+class FindModulesTestCase(unittest.TestCase):
+    """
+        以下の構成のディレクトリに対してテストする.
+
+            happy.py
+            pkg/__init__.py
+            pkg/copy.py
+            pkg/sub/__init__.py
+            pkg/sub/entry.py
+            notpkg/module.py
+            _private.py
+            README.md
+    """
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.scan_dir = os.path.join(self.temporary_directory.name, "src")
+        self.cache_path = os.path.join(self.temporary_directory.name, "cache.json")
+        for file_path in (
+                "happy.py",
+                "pkg/__init__.py",
+                "pkg/copy.py",
+                "pkg/sub/__init__.py",
+                "pkg/sub/entry.py",
+                "notpkg/module.py",
+                "_private.py",
+                "README.md"):
+            self.write_file(file_path)
+        self.make_old()
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_file(self, file_path):
+        file_path = os.path.join(self.scan_dir, file_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        open(file_path, "w").close()
+
+    def make_old(self):
+        # キャッシュは作成直後のディレクトリを記録しないため, 過去に更新されたことにする.
+        for directory_path, _, _ in os.walk(self.scan_dir):
+            os.utime(directory_path, ns=(10 ** 9, 10 ** 9))
+
+    def test(self):
+        self.assertEqual(
+            ["happy", "pkg.copy", "pkg.sub.entry"],
+            sorted(find_modules(self.scan_dir)))
+
+    def test_cache(self):
+        self.assertEqual(
+            ["happy", "pkg.copy", "pkg.sub.entry"],
+            sorted(find_modules(self.scan_dir, cache_path=self.cache_path)))
+        with unittest.mock.patch("utils.modules.scan_modules") as scan_modules:
+            self.assertEqual(
+                ["happy", "pkg.copy", "pkg.sub.entry"],
+                sorted(find_modules(self.scan_dir, cache_path=self.cache_path)))
+            scan_modules.assert_not_called()
+
+    def test_cache_invalidated_when_module_added(self):
+        find_modules(self.scan_dir, cache_path=self.cache_path)
+        self.write_file("pkg/sub/added.py")
+        self.assertEqual(
+            ["happy", "pkg.copy", "pkg.sub.added", "pkg.sub.entry"],
+            sorted(find_modules(self.scan_dir, cache_path=self.cache_path)))
+
+    def test_cache_invalidated_when_package_created(self):
+        find_modules(self.scan_dir, cache_path=self.cache_path)
+        self.write_file("notpkg/__init__.py")
+        self.assertEqual(
+            ["happy", "notpkg.module", "pkg.copy", "pkg.sub.entry"],
+            sorted(find_modules(self.scan_dir, cache_path=self.cache_path)))
+
+    def test_cache_not_saved_when_directory_recently_modified(self):
+        self.write_file("pkg/added.py")
+        find_modules(self.scan_dir, cache_path=self.cache_path)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+
+class LazyImportTestCase(unittest.TestCase):
+    """
+        以下の構成のディレクトリに対してテストする.
+        各モジュールは実行されると "<モジュールのパス>.executed" を作成する.
+
+            lazy_fixture_module.py
+            lazy_fixture_package/__init__.py
+            lazy_fixture_package/sub.py
+    """
+
+    MODULE_NAMES = ("lazy_fixture_module", "lazy_fixture_package", "lazy_fixture_package.sub")
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root_path = self.temporary_directory.name
+        for file_path in (
+                "lazy_fixture_module.py",
+                "lazy_fixture_package/__init__.py",
+                "lazy_fixture_package/sub.py"):
+            file_path = os.path.join(self.root_path, file_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file:
+                file.write("VALUE = 1\nopen(__file__ + '.executed', 'w').close()\n")
+        sys.path.insert(0, self.root_path)
+
+    def tearDown(self):
+        sys.path.remove(self.root_path)
+        for module_name in self.MODULE_NAMES:
+            sys.modules.pop(module_name, None)
+        self.temporary_directory.cleanup()
+
+    def is_executed(self, file_path):
+        return os.path.exists(os.path.join(self.root_path, file_path + ".executed"))
+
+    def test(self):
+        module = lazy_import("lazy_fixture_module")
+        self.assertIs(module, sys.modules["lazy_fixture_module"])
+        self.assertFalse(self.is_executed("lazy_fixture_module.py"))
+
+        self.assertEqual(1, module.VALUE)
+        self.assertTrue(self.is_executed("lazy_fixture_module.py"))
+
+        import lazy_fixture_module
+        self.assertIs(module, lazy_fixture_module)
+
+    def test_submodule(self):
+        module = lazy_import("lazy_fixture_package.sub")
+        self.assertTrue(self.is_executed("lazy_fixture_package/__init__.py"))
+        self.assertFalse(self.is_executed("lazy_fixture_package/sub.py"))
+
+        import lazy_fixture_package.sub
+        self.assertIs(module, lazy_fixture_package.sub)
+        self.assertEqual(1, lazy_fixture_package.sub.VALUE)
+        self.assertTrue(self.is_executed("lazy_fixture_package/sub.py"))
+
+    def test_imported(self):
+        self.assertIs(unittest, lazy_import("unittest"))
+
+    def test_not_found(self):
+        with self.assertRaises(ModuleNotFoundError):
+            lazy_import("lazy_fixture_not_found")
+
+
+class ToModuleNameTestCase(unittest.TestCase):
+
+    def test(self):
+        self.assertEqual("modules", to_module_name("modules.py"))
+        self.assertEqual("utils.modules", to_module_name("utils/modules.py"))
+        self.assertEqual("happy", to_module_name("happy.py"))
+        self.assertEqual("utils.copy", to_module_name("utils/copy.py"))
+
+
+if __name__ == "__main__":
+    unittest.main()
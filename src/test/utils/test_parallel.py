@@ -0,0 +1,97 @@
+import operator
+import unittest
+import weakref
+
+from utils.collections import frequencies
+from utils.collections import merge_frequencies
+from utils.parallel import map_chunks
+from utils.parallel import map_reduce
+
+
+class MapChunksTestCase(unittest.TestCase):
+
+    def test_value_error_raised_when_invalid_arguments_passed(self):
+        with self.assertRaises(ValueError):
+            list(map_chunks(len, [], chunk_size=0))
+        with self.assertRaises(ValueError):
+            list(map_chunks(len, [], max_workers=0))
+        with self.assertRaises(ValueError):
+            list(map_chunks(len, [], max_in_flight=0))
+
+    def test_ordered(self):
+        for use_threads in (True, False):
+            self.assertEqual(
+                [],
+                list(map_chunks(tuple, [], chunk_size=2, use_threads=use_threads)))
+            self.assertEqual(
+                [(0, 1), (2, 3), (4, )],
+                list(map_chunks(tuple, range(5), chunk_size=2, use_threads=use_threads)))
+            self.assertEqual(
+                [3] * 33 + [1],
+                list(map_chunks(
+                    len,
+                    range(100),
+                    chunk_size=3,
+                    max_workers=2,
+                    max_in_flight=1,
+                    use_threads=use_threads)))
+
+    def test_unordered(self):
+        results = map_chunks(
+            tuple,
+            range(100),
+            chunk_size=7,
+            max_workers=4,
+            ordered=False,
+            use_threads=True)
+        self.assertEqual(list(range(100)), sorted(sum(results, ())))
+
+    def test_processed_chunks_released(self):
+        class Value:
+            pass
+
+        references = []
+
+        def generate_values():
+            for _ in range(12):
+                value = Value()
+                references.append(weakref.ref(value))
+                yield value
+
+        results = map_chunks(len, generate_values(), chunk_size=3, max_in_flight=1, use_threads=True)
+        for _ in results:
+            # 結果を生成したチャンクの要素は解放され, 実行中のチャンクの要素だけが残る.
+            self.assertLessEqual(sum(reference() is not None for reference in references), 3)
+
+
+class MapReduceTestCase(unittest.TestCase):
+
+    def test_frequencies(self):
+        values = ["A", "B", "B", "C"] * 250
+        for use_threads in (True, False):
+            self.assertDictEqual(
+                frequencies(values),
+                map_reduce(
+                    frequencies,
+                    merge_frequencies,
+                    values,
+                    initial={},
+                    chunk_size=64,
+                    use_threads=use_threads))
+
+    def test_ordered(self):
+        values = [str(value) for value in range(100)]
+        self.assertEqual(
+            "".join(values),
+            map_reduce("".join, operator.add, values, chunk_size=3, ordered=True))
+
+    def test_type_error_raised_when_empty_values_passed_without_initial(self):
+        with self.assertRaises(TypeError):
+            map_reduce(len, operator.add, [], use_threads=True)
+        self.assertEqual(
+            0,
+            map_reduce(len, operator.add, [], initial=0, use_threads=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from utils.version_parser import VERSION_LINES_PATTERNS
+from utils.version_parser import VERSION_STRING_PATTERN
+from utils.version_parser import scan_version
+
+
+class ScanVersionTestCase(unittest.TestCase):
+
+    VALID_VERSION_STRINGS = ("0.0.0", "1.2.3", "10.20.30", "1.2.3-SNAPSHOT", "1.2.3-0", "1.2.3-a1B2")
+
+    INVALID_VERSION_STRINGS = (
+        "", "1", "1.2", "1.2.3.4", "01.2.3", "1.02.3", "1.2.03", "1.2.3-", "1.2.3-a-b", "1.2.3-a.b",
+        "-1.2.3", "+1.2.3", " 1.2.3", "1.2.3 ", "1.2.3\n", "1..3", "a.b.c", "1.2.3-αβ", "１.2.3", "1.².3",
+    )
+
+    def test(self):
+        self.assertEqual((1, 2, 3, None), scan_version("1.2.3"))
+        self.assertEqual((1, 2, 3, "SNAPSHOT"), scan_version("1.2.3-SNAPSHOT"))
+        self.assertEqual((0, 10, 256, None), scan_version("0.10.256"))
+
+    def test_bytes(self):
+        self.assertEqual((1, 2, 3, "SNAPSHOT"), scan_version(b"1.2.3-SNAPSHOT"))
+        self.assertEqual((1, 2, 3, None), scan_version(bytearray(b"1.2.3")))
+        self.assertEqual((1, 2, 3, "A"), scan_version(memoryview(b"x1.2.3-A")[1:]))
+        self.assertIsNone(scan_version(b"1.2.3-"))
+
+    def test_same_as_pattern(self):
+        for version_string in self.VALID_VERSION_STRINGS + self.INVALID_VERSION_STRINGS:
+            matched = VERSION_STRING_PATTERN.match(version_string)
+            expected = None
+            if matched:
+                expected = (int(matched[1]), int(matched[2]), int(matched[3]), matched[4])
+            self.assertEqual(expected, scan_version(version_string), version_string)
+            if version_string.isascii():
+                self.assertEqual(expected, scan_version(version_string.encode("ascii")), version_string)
+
+    def test_same_as_lines_pattern(self):
+        version_strings = [
+            version_string
+            for version_string in self.VALID_VERSION_STRINGS + self.INVALID_VERSION_STRINGS
+            if "\n" not in version_string
+        ]
+        rows = VERSION_LINES_PATTERNS[str].findall("\n".join(version_strings))
+        self.assertEqual(len(version_strings), len(rows))
+        for version_string, (major, minor, patch, suffix) in zip(version_strings, rows):
+            expected = (int(major), int(minor), int(patch), suffix or None) if major else None
+            self.assertEqual(expected, scan_version(version_string), version_string)
+
+    def test_invalid(self):
+        for version_string in self.INVALID_VERSION_STRINGS:
+            self.assertIsNone(scan_version(version_string), version_string)
+
+
+if __name__ == "__main__":
+    unittest.main()
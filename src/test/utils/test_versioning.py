@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from utils.versioning import InvalidVersion
+from utils.versioning import Version
+from utils.versioning import from_cached_file
+from utils.versioning import from_file
+from utils.versioning import from_string
+from utils.versioning import parse_version_string
+
+
+class VersioningTestCase(unittest.TestCase):
+
+    def test_from_string(self):
+        version = from_string("1.2.3-SNAPSHOT")
+        self.assertEqual((1, 2, 3, "SNAPSHOT"), (version.major, version.minor, version.patch, version.suffix))
+        with self.assertRaises(InvalidVersion):
+            from_string("1.2")
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "VERSION")
+            Version(1, 2, 3).save(file_path)
+            self.assertEqual("1.2.3", str(from_file(file_path)))
+
+    def test_from_cached_file(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "VERSION")
+            Version(1, 2, 3).save(file_path)
+            version = from_cached_file(file_path, check_interval=0)
+            self.assertIs(version, from_cached_file(file_path, check_interval=0))
+            version.bump_minor().save(file_path)
+            self.assertEqual("1.3.0", str(from_cached_file(file_path, check_interval=0)))
+
+    def test_save_through_symlink(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "VERSION")
+            target_path = os.path.join(directory_path, "VERSION.target")
+            Version(1, 2, 3).save(target_path)
+            os.symlink(target_path, file_path)
+            Version(1, 2, 4).save(file_path)
+            self.assertTrue(os.path.islink(file_path))
+            self.assertEqual("1.2.4", str(from_file(target_path)))
+
+    def test_parse_version_string(self):
+        self.assertEqual((1, 2, 3, None), parse_version_string("1.2.3"))
+        self.assertEqual((1, 2, 3, "A"), parse_version_string(memoryview(b"1.2.3-A")))
+
+    def test_bump(self):
+        version = Version(1, 2, 3)
+        self.assertEqual("1.2.3-SNAPSHOT", str(version.bump_to_snapshot()))
+        self.assertEqual("1.2.3", str(version.bump_to_snapshot().bump_to_release()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,10 @@
 from os import path
 
-from invoke import Collection
+from utils.lazy_tasks import load_collection
 
-from utils.modules import import_modules
 
+ROOT_DIR = path.dirname(__file__)
 
-namespace = Collection(*import_modules(path.join(path.dirname(__file__), "src", "tasks")))
-
+namespace = load_collection(
+    path.join(ROOT_DIR, "src", "tasks"),
+    manifest_path=path.join(ROOT_DIR, "target", "cache", "tasks-manifest.json"))